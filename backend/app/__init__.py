@@ -3,11 +3,21 @@ import logging
 from flask import Flask, jsonify, request
 from .extensions import db, migrate, jwt, cors
 from .routes import register_blueprints
+from .cli import register_commands
 from .config import get_config
+from .services.shadow import init_shadow_mode
+from .services.evidence_cache import init_evidence_cache
+from .services.count_cache import init_count_cache
+from .services.response_cache import init_response_cache
+from .services.jobs import init_job_runner
+from .services.serialization import FastJSONProvider
 
 def create_app(config_class=None):
     app = Flask(__name__)
     
+    # Respuestas JSON con orjson si está disponible
+    app.json = FastJSONProvider(app)
+    
     # Cargar configuración según el ambiente
     if config_class is None:
         config_class = get_config()
@@ -74,6 +84,24 @@ def create_app(config_class=None):
     # Registrar blueprints
     register_blueprints(app)
     
+    # Comandos de línea de comandos (flask catalog ...)
+    register_commands(app)
+    
+    # Evaluación en sombra del motor candidato (si está configurada)
+    init_shadow_mode(app)
+    
+    # Caché de evidencia por paciente (invalidado por eventos de los logs)
+    init_evidence_cache(app)
+    
+    # Caché de conteos de los listados paginados (invalidado por escrituras)
+    init_count_cache(app)
+    
+    # Caché de respuestas de catálogos (invalidado por escrituras en sus blueprints)
+    init_response_cache(app)
+    
+    # Ejecutor de trabajos en segundo plano
+    init_job_runner(app)
+    
     # ==================== MANEJADORES DE ERRORES GLOBALES ====================
     # Los detalles de error se registran en consola, pero el frontend recibe mensajes genéricos
     
@@ -0,0 +1,50 @@
+"""
+Comandos de línea de comandos (`flask ...`)
+"""
+import os
+import click
+from flask.cli import AppGroup
+from app.services.catalog_import import CatalogImportError, import_catalog, merge_packs, read_pack_file
+
+catalog_cli = AppGroup('catalog', help='Catálogo médico.')
+
+
+def _read_path(path):
+    """Paquetes de un archivo, o de todos los .json/.csv de un directorio."""
+    if os.path.isdir(path):
+        names = sorted(n for n in os.listdir(path) if n.lower().endswith(('.json', '.csv')))
+        return [pack for name in names for pack in _read_path(os.path.join(path, name))]
+    with open(path, 'rb') as handle:
+        return [read_pack_file(path, handle.read())]
+
+
+@catalog_cli.command('import')
+@click.argument('paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--dry-run', is_flag=True, help='Solo validar el paquete, sin escribir.')
+def import_command(paths, dry_run):
+    """
+    Importa un paquete del catálogo en una sola transacción.
+
+    PATHS: archivos .json, archivos <sección>.csv (symptoms.csv,
+    disease_symptoms.csv, ...) o directorios que los contengan.
+    """
+    try:
+        pack = merge_packs(pack for path in paths for pack in _read_path(path))
+        summary = import_catalog(pack, dry_run=dry_run)
+    except CatalogImportError as e:
+        for error in e.errors:
+            location = ' '.join(str(part) for part in (error['section'], error['row'], error['field']) if part)
+            click.echo(f"  {location}: {error['message']}" if location else f"  {error['message']}", err=True)
+        if e.total > len(e.errors):
+            click.echo(f'  ... y {e.total - len(e.errors)} más', err=True)
+        raise click.ClickException(str(e))
+
+    for section, counts in summary.items():
+        restored = f", {counts['restored']} restaurados" if counts.get('restored') else ''
+        click.echo(f"{section}: {counts['inserted']} nuevos, {counts['updated']} actualizados{restored}")
+    click.echo('Paquete válido (sin cambios)' if dry_run else 'Catálogo importado')
+
+
+def register_commands(app):
+    """Registra los comandos de la aplicación"""
+    app.cli.add_command(catalog_cli)
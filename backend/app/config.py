@@ -91,6 +91,35 @@ class BaseConfig:
     # Configuración de Logging
     LOG_LEVEL = logging.INFO
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    # Evaluación en sombra de un motor de inferencia candidato
+    SHADOW_ENGINE = os.getenv("SHADOW_ENGINE")  # 'paquete.modulo:Clase'
+    SHADOW_SAMPLE_RATE = float(os.getenv("SHADOW_SAMPLE_RATE", "0"))
+    SHADOW_LOG_PATH = os.getenv("SHADOW_LOG_PATH", "shadow_eval.csv")
+    SHADOW_MAX_PENDING = int(os.getenv("SHADOW_MAX_PENDING", "100"))
+    
+    # Segundos entre revisiones de la huella del catálogo en la base de datos
+    # (cambios hechos por otros workers); 0 revisa en cada consulta
+    KB_VERSION_CHECK_INTERVAL = float(os.getenv("KB_VERSION_CHECK_INTERVAL", "5"))
+    
+    # Caché en proceso de evidencia por (paciente, visita); 0 lo desactiva
+    EVIDENCE_CACHE_SIZE = int(os.getenv("EVIDENCE_CACHE_SIZE", "1024"))
+    
+    # Caché de total_count de los listados: segundos de validez (0 lo desactiva) y tamaño
+    COUNT_CACHE_TTL = float(os.getenv("COUNT_CACHE_TTL", "30"))
+    COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "2048"))
+    
+    # Caché de respuestas de catálogos: segundos de validez (0 lo desactiva) y bytes máximos
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    
+    # Trabajos en segundo plano (en proceso, sin broker externo)
+    JOBS_MAX_WORKERS = int(os.getenv("JOBS_MAX_WORKERS", "2"))
+    JOBS_MAX_PENDING = int(os.getenv("JOBS_MAX_PENDING", "20"))
+    JOBS_MAX_PER_USER = int(os.getenv("JOBS_MAX_PER_USER", "3"))
+    
+    # Importación masiva de pacientes: filas por lote (un INSERT y una transacción por lote)
+    PATIENT_IMPORT_BATCH_SIZE = int(os.getenv("PATIENT_IMPORT_BATCH_SIZE", "1000"))
 
 
 class DevConfig(BaseConfig):
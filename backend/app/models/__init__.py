@@ -5,7 +5,8 @@ from .user import User
 from .patient import Patient
 from .medical_knowledge import Disease, Symptom, Sign, LabTest, PostmortemTest
 from .medical_knowledge import disease_symptoms, disease_signs, disease_lab_tests, disease_postmortem_tests
-from .diagnosis import Diagnosis, FollowUp
+from .diagnosis import Diagnosis, FollowUp, patient_diseases
+from .job import Job
 
 __all__ = [
     'User',
@@ -17,8 +18,10 @@ __all__ = [
     'PostmortemTest',
     'Diagnosis',
     'FollowUp',
+    'Job',
     'disease_symptoms',
     'disease_signs',
     'disease_lab_tests',
     'disease_postmortem_tests',
+    'patient_diseases',
 ]
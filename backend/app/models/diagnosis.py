@@ -9,6 +9,10 @@ from app.extensions import db
 class Diagnosis(db.Model):
     """Modelo de diagnóstico médico"""
     __tablename__ = 'diagnoses'
+    __table_args__ = (
+        # Historial del paciente: paginación keyset por (diagnosis_date, id)
+        db.Index('ix_diagnoses_patient_date', 'patient_id', 'diagnosis_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     patient_id = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
@@ -119,3 +123,13 @@ class FollowUp(db.Model):
     
     def __repr__(self):
         return f'<FollowUp {self.id} for Diagnosis {self.diagnosis_id}>'
+
+
+# Índice paciente–enfermedad: un par por cada (enfermedad, paciente) con al menos
+# un diagnóstico. Se mantiene en cada flush (ver app.services.patient_diseases);
+# la clave primaria (disease_code, patient_id) resuelve el filtro por enfermedad.
+patient_diseases = db.Table('patient_diseases',
+    db.Column('disease_code', db.String(20), db.ForeignKey('diseases.code', ondelete='CASCADE'), primary_key=True),
+    db.Column('patient_id', db.Integer, db.ForeignKey('patients.id', ondelete='CASCADE'), primary_key=True,
+              index=True)
+)
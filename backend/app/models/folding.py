@@ -0,0 +1,42 @@
+"""
+Columnas Normalizadas para Búsqueda
+Copias sin acentos y en minúsculas de nombres, mantenidas en cada escritura
+"""
+import unicodedata
+from functools import lru_cache
+from typing import Optional, Tuple
+from sqlalchemy import event
+from app.extensions import db
+
+# Clave de `Column.info` con el nombre de la columna de origen
+FOLDED_FROM = 'folded_from'
+
+
+def fold_text(value: Optional[str]) -> Optional[str]:
+    """'García Núñez' -> 'garcia nunez': sin diacríticos y con `casefold`."""
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def folded_column(source: str, length: int):
+    """Columna indexada con `fold_text(source)`; no forma parte de las respuestas ni exportaciones."""
+    return db.Column(db.String(length), index=True, info={FOLDED_FROM: source})
+
+
+@lru_cache(maxsize=None)
+def folded_columns(model: type) -> Tuple[Tuple[str, str], ...]:
+    """Pares (columna de origen, columna normalizada) de `model`."""
+    return tuple(
+        (column.info[FOLDED_FROM], column.key)
+        for column in model.__table__.columns
+        if FOLDED_FROM in column.info
+    )
+
+
+@event.listens_for(db.Model, 'before_insert', propagate=True)
+@event.listens_for(db.Model, 'before_update', propagate=True)
+def _refresh_folded_columns(mapper, connection, target):
+    for source, folded in folded_columns(type(target)):
+        setattr(target, folded, fold_text(getattr(target, source)))
@@ -0,0 +1,67 @@
+"""
+Modelo de Trabajo en Segundo Plano
+Registra los trabajos pesados (scoring por lotes, evaluación retrospectiva, etc.)
+que ejecuta el `JobRunner` fuera de las peticiones
+"""
+import json
+from datetime import datetime
+from app.extensions import db
+
+
+class Job(db.Model):
+    """Trabajo en segundo plano con su estado, progreso y resultado"""
+    __tablename__ = 'jobs'
+
+    # Estados posibles
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+    id = db.Column(db.String(36), primary_key=True)  # UUID
+    job_type = db.Column(db.String(50), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default=PENDING, index=True)
+    params = db.Column(db.Text)  # JSON string con los parámetros del trabajo
+    progress = db.Column(db.Float, nullable=False, default=0.0)  # 0.0 - 1.0
+    progress_message = db.Column(db.String(200))
+    result = db.Column(db.Text)  # JSON string con el resultado
+    error = db.Column(db.Text)
+    cancel_requested = db.Column(db.Boolean, nullable=False, default=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    worker = db.Column(db.String(100))  # 'host:pid' del proceso que lo ejecuta
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    def to_dict(self, include_result=False):
+        """Convierte el trabajo a diccionario"""
+        data = {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'params': json.loads(self.params) if self.params else {},
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested,
+            'created_by': self.created_by,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+        if include_result:
+            data['result'] = json.loads(self.result) if self.result else None
+        return data
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.job_type} {self.status}>'
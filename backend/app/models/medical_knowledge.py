@@ -4,6 +4,7 @@ Gestiona enfermedades, signos, síntomas y pruebas
 """
 from datetime import datetime
 from app.extensions import db
+from app.models.folding import folded_column
 
 
 class Disease(db.Model):
@@ -13,6 +14,7 @@ class Disease(db.Model):
     # Usar code como clave primaria (formato: TIPO + número, ej: RESP01, GASTR01)
     code = db.Column(db.String(20), primary_key=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
+    name_folded = folded_column('name', 200)  # Nombre normalizado para búsqueda
     description = db.Column(db.Text)
     category = db.Column(db.String(100))  # Categoría de la enfermedad (RESP, GASTR, CARD, etc.)
     severity = db.Column(db.String(50))  # 'leve', 'moderada', 'grave', 'crítica'
@@ -73,6 +75,7 @@ class Symptom(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(20), unique=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
+    name_folded = folded_column('name', 200)  # Nombre normalizado para búsqueda
     description = db.Column(db.Text)
     category = db.Column(db.String(100))  # Categoría del síntoma
     
@@ -108,6 +111,7 @@ class Sign(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(20), unique=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
+    name_folded = folded_column('name', 200)  # Nombre normalizado para búsqueda
     description = db.Column(db.Text)
     category = db.Column(db.String(100))
     measurement_unit = db.Column(db.String(50))  # Unidad de medida si aplica
@@ -147,6 +151,7 @@ class LabTest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     code = db.Column(db.String(20), unique=True, nullable=False, index=True)
     name = db.Column(db.String(200), nullable=False)
+    name_folded = folded_column('name', 200)  # Nombre normalizado para búsqueda
     description = db.Column(db.Text)
     category = db.Column(db.String(100))
     normal_range = db.Column(db.String(200))
@@ -299,6 +304,7 @@ class PatientSignsLog(db.Model):
     sign_id = db.Column(db.Integer, db.ForeignKey('signs.id'), nullable=False, index=True)
     value_numeric = db.Column(db.Float, nullable=True)
     value_text = db.Column(db.String(200), nullable=True)
+    value_code = db.Column(db.SmallInteger, nullable=True)  # Grado cualitativo codificado (ver app.modules.qualitative)
     unit = db.Column(db.String(50), nullable=True)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     visit_id = db.Column(db.String(64), nullable=True, index=True)
@@ -314,6 +320,7 @@ class PatientSignsLog(db.Model):
             'sign_id': self.sign_id,
             'value_numeric': self.value_numeric,
             'value_text': self.value_text,
+            'value_code': self.value_code,
             'unit': self.unit,
             'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
             'visit_id': self.visit_id,
@@ -331,6 +338,7 @@ class PatientLabResultsLog(db.Model):
     lab_test_id = db.Column(db.Integer, db.ForeignKey('lab_tests.id'), nullable=False, index=True)
     value_numeric = db.Column(db.Float, nullable=True)
     value_text = db.Column(db.String(200), nullable=True)
+    value_code = db.Column(db.SmallInteger, nullable=True)  # Grado cualitativo codificado (ver app.modules.qualitative)
     unit = db.Column(db.String(50), nullable=True)
     recorded_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     visit_id = db.Column(db.String(64), nullable=True, index=True)
@@ -346,6 +354,7 @@ class PatientLabResultsLog(db.Model):
             'lab_test_id': self.lab_test_id,
             'value_numeric': self.value_numeric,
             'value_text': self.value_text,
+            'value_code': self.value_code,
             'unit': self.unit,
             'recorded_at': self.recorded_at.isoformat() if self.recorded_at else None,
             'visit_id': self.visit_id,
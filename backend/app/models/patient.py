@@ -4,6 +4,7 @@ Gestiona la información de los pacientes
 """
 from datetime import datetime
 from app.extensions import db
+from app.models.folding import folded_column
 
 
 class Patient(db.Model):
@@ -15,6 +16,11 @@ class Patient(db.Model):
     second_name = db.Column(db.String(100))  # Segundo nombre (opcional)
     paternal_surname = db.Column(db.String(100), nullable=False)  # Apellido paterno
     maternal_surname = db.Column(db.String(100))  # Apellido materno (opcional)
+    # Nombres normalizados (sin acentos, minúsculas) para búsqueda
+    first_name_folded = folded_column('first_name', 100)
+    second_name_folded = folded_column('second_name', 100)
+    paternal_surname_folded = folded_column('paternal_surname', 100)
+    maternal_surname_folded = folded_column('maternal_surname', 100)
     date_of_birth = db.Column(db.Date, nullable=False)
     gender = db.Column(db.String(20))  # 'male', 'female', 'other'
     blood_type_abo = db.Column(db.Integer)  # 0-3
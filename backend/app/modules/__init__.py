@@ -1,19 +1,29 @@
-
 """
 Módulos de lógica de negocio para el sistema de diagnóstico médico.
+
+Estos módulos no dependen de Flask: los adaptadores para la aplicación están en
+`app.services.inference`.
 """
+from .knowledge_base import KnowledgeBase, DiseaseRules, CatalogEntry
+from .evidence import PatientEvidence, ObservedValues
+from .units import UnitConversionError
+from .loaders import load_knowledge_base, load_patient_evidence
 from .inference_engine import (
     InferenceEngine,
-    get_patient_evidence,
-    get_treatment_recommendation,
     parse_numeric_range,
     is_value_abnormal
 )
 
 __all__ = [
+    'KnowledgeBase',
+    'DiseaseRules',
+    'CatalogEntry',
+    'PatientEvidence',
+    'ObservedValues',
+    'UnitConversionError',
     'InferenceEngine',
-    'get_patient_evidence',
-    'get_treatment_recommendation',
+    'load_knowledge_base',
+    'load_patient_evidence',
     'parse_numeric_range',
     'is_value_abnormal'
 ]
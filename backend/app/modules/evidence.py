@@ -0,0 +1,166 @@
+"""
+Evidencia del Paciente
+======================
+
+Representación compacta de la evidencia clínica que consume el motor:
+
+- `symptoms`: frozenset de IDs de síntomas.
+- `signs` / `labs`: `ObservedValues`, arreglos paralelos de IDs (`array('l')`) y
+  valores numéricos (`array('d')`, NaN cuando no hay valor numérico), más el
+  texto, la unidad y el grado cualitativo (`value_code`) solo cuando existen.
+
+Los nombres, códigos y rangos normales no se copian en la evidencia: viven una
+sola vez en la `KnowledgeBase`. `PatientEvidence.from_dict` acepta el formato de
+diccionario anterior para quien construya evidencia a mano.
+"""
+
+import math
+from array import array
+from typing import Dict, Any, Optional, Iterable, Iterator, Tuple
+
+NAN = float('nan')
+
+
+class ObservedValues:
+    """Valores observados de signos o laboratorios en arreglos paralelos."""
+
+    __slots__ = ('ids', 'values', 'texts', 'units', 'codes', '_positions')
+
+    def __init__(self):
+        self.ids = array('l')
+        self.values = array('d')
+        self.texts = None  # {posición: texto}, solo si hay valores cualitativos
+        self.units = None  # {posición: unidad}, solo si hay unidades
+        self.codes = None  # {posición: grado}, solo si hay resultados cualitativos codificados
+        self._positions = {}
+
+    def add(self, item_id: int, value_numeric: Optional[float] = None,
+            value_text: Optional[str] = None, unit: Optional[str] = None,
+            value_code: Optional[int] = None) -> None:
+        """Agrega un valor; si el ID ya existe, el registro más reciente reemplaza al anterior."""
+        position = self._positions.get(item_id)
+        if position is None:
+            position = len(self.ids)
+            self._positions[item_id] = position
+            self.ids.append(item_id)
+            self.values.append(NAN)
+        self.values[position] = NAN if value_numeric is None else float(value_numeric)
+        self.texts = _set_optional(self.texts, position, value_text)
+        self.units = _set_optional(self.units, position, unit)
+        self.codes = _set_optional(self.codes, position, value_code)
+
+    def get(self, item_id: int) -> Optional[Tuple[Optional[float], Optional[str], Optional[str], Optional[int]]]:
+        """Retorna (value_numeric, value_text, unit, value_code) o None si el ID no fue observado."""
+        position = self._positions.get(item_id)
+        if position is None:
+            return None
+        value = self.values[position]
+        return (
+            None if math.isnan(value) else value,
+            self.texts.get(position) if self.texts else None,
+            self.units.get(position) if self.units else None,
+            self.codes.get(position) if self.codes else None
+        )
+
+    def items(self) -> Iterator[Tuple[int, Tuple[Optional[float], Optional[str], Optional[str], Optional[int]]]]:
+        for item_id in self.ids:
+            yield item_id, self.get(item_id)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._positions
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def _set_optional(mapping: Optional[Dict[int, Any]], position: int, value: Any) -> Optional[Dict[int, Any]]:
+    if value is not None and value != '':
+        if mapping is None:
+            mapping = {}
+        mapping[position] = value
+    elif mapping:
+        mapping.pop(position, None)
+    return mapping
+
+
+class PatientEvidence:
+    """Evidencia clínica de un paciente (opcionalmente de una sola visita)."""
+
+    __slots__ = ('patient_id', 'visit_id', 'symptoms', 'signs', 'labs')
+
+    def __init__(self, patient_id: Optional[int] = None, visit_id: Optional[str] = None,
+                 symptoms: Iterable[int] = (),
+                 signs: Optional[ObservedValues] = None,
+                 labs: Optional[ObservedValues] = None):
+        self.patient_id = patient_id
+        self.visit_id = visit_id
+        self.symptoms = frozenset(symptoms)
+        self.signs = signs if signs is not None else ObservedValues()
+        self.labs = labs if labs is not None else ObservedValues()
+
+    def is_empty(self) -> bool:
+        return not self.symptoms and not self.signs and not self.labs
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PatientEvidence':
+        """
+        Construye la evidencia a partir del formato de diccionario:
+        {
+            'symptoms': [symptom_id, ...],
+            'signs': {sign_id: {'value_numeric': 39.5, 'value_text': None, 'unit': '°C', 'value_code': None}, ...},
+            'labs': {lab_id: {'value_numeric': 150.0, 'value_text': None, 'unit': 'mg/L'}, ...},
+            'patient_id': 1,
+            'visit_id': '...'
+        }
+        """
+        signs = ObservedValues()
+        for sign_id, value in data.get('signs', {}).items():
+            signs.add(int(sign_id), value.get('value_numeric'), value.get('value_text'), value.get('unit'),
+                      value.get('value_code'))
+        labs = ObservedValues()
+        for lab_id, value in data.get('labs', {}).items():
+            labs.add(int(lab_id), value.get('value_numeric'), value.get('value_text'), value.get('unit'),
+                     value.get('value_code'))
+        return cls(
+            patient_id=data.get('patient_id'),
+            visit_id=data.get('visit_id'),
+            symptoms=data.get('symptoms', ()),
+            signs=signs,
+            labs=labs
+        )
+
+    @classmethod
+    def coerce(cls, data) -> 'PatientEvidence':
+        """Acepta una `PatientEvidence` o un diccionario en el formato de `from_dict`."""
+        return data if isinstance(data, cls) else cls.from_dict(data)
+
+    def to_dict(self, knowledge_base=None) -> Dict[str, Any]:
+        """
+        Convierte la evidencia al formato de diccionario. Si se pasa la base de
+        conocimiento, se agregan código, nombre y rango normal de cada elemento.
+        """
+        def observed(values: ObservedValues, catalog) -> Dict[int, Dict[str, Any]]:
+            data = {}
+            for item_id, (value_numeric, value_text, unit, value_code) in values.items():
+                item = {'value_numeric': value_numeric, 'value_text': value_text, 'unit': unit,
+                        'value_code': value_code}
+                entry = catalog.get(item_id) if catalog is not None else None
+                if entry is not None:
+                    item.update(code=entry.code, name=entry.name, normal_range=entry.normal_range)
+                data[item_id] = item
+            return data
+
+        return {
+            'symptoms': sorted(self.symptoms),
+            'signs': observed(self.signs, knowledge_base.signs if knowledge_base else None),
+            'labs': observed(self.labs, knowledge_base.labs if knowledge_base else None),
+            'visit_id': self.visit_id,
+            'patient_id': self.patient_id
+        }
+
+    def __repr__(self):
+        return (f'<PatientEvidence patient={self.patient_id} visit={self.visit_id}: '
+                f'{len(self.symptoms)}/{len(self.signs)}/{len(self.labs)}>')
@@ -6,177 +6,68 @@ Implementa lógica basada en reglas simples con suma de pesos para diagnosticar
 enfermedades basándose en síntomas, signos clínicos y resultados de laboratorio del paciente.
 
 El motor:
-1. Recupera toda la evidencia del paciente desde los logs atómicos
-2. Consulta las reglas (asociaciones disease-evidence con pesos) de todas las enfermedades
+1. Recibe la evidencia del paciente como estructura plana (ver `app.modules.loaders`)
+2. Recorre las reglas (asociaciones disease-evidence con pesos) de la `KnowledgeBase`
 3. Calcula un score acumulado para cada enfermedad sumando los pesos de evidencia coincidente
 4. Retorna la enfermedad con mayor score junto con su nivel de confianza
+
+Este módulo no depende de Flask ni de la base de datos: la carga de reglas y de
+evidencia vive en `app.modules.loaders` y los adaptadores para la aplicación en
+`app.services.inference`.
 """
 
-import re
-from typing import Dict, List, Tuple, Optional, Any
+import heapq
+from typing import Dict, FrozenSet, List, Optional, Any, Tuple, Union
 from datetime import datetime
-from sqlalchemy import text
-from app.extensions import db
-from app.models.medical_knowledge import (
-    Disease, Symptom, Sign, LabTest,
-    PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog
-)
+from app.modules.evidence import PatientEvidence, ObservedValues
+from app.modules.knowledge_base import KnowledgeBase, DiseaseRules, CatalogEntry
+from app.modules.qualitative import QUALITATIVE_FACTORS
+from app.modules.ranges import is_outside_range
+# Re-exportados para quien importaba los rangos desde este módulo
+from app.modules.ranges import parse_numeric_range, is_value_abnormal  # noqa: F401
 
 
-def get_patient_evidence(patient_id: int, visit_id: Optional[str] = None) -> Dict[str, Any]:
+def evidence_factor(entry: Optional[CatalogEntry], value_numeric: Optional[float], value_text: Optional[str],
+                    value_code: Optional[int] = None) -> float:
     """
-    Recupera toda la evidencia clínica del paciente desde los logs atómicos.
-    
-    Args:
-        patient_id: ID del paciente
-        visit_id: ID opcional de visita para filtrar logs de una consulta específica
-        
-    Returns:
-        Diccionario estructurado con:
-        {
-            'symptoms': [symptom_id1, symptom_id2, ...],
-            'signs': {
-                sign_id1: {'value': 39.5, 'unit': '°C', 'code': 'SG001'},
-                sign_id2: {'value': 110, 'unit': 'lpm', 'code': 'SG004'},
-                ...
-            },
-            'labs': {
-                lab_id1: {'value': 150.0, 'unit': 'mg/L', 'code': 'LAB008'},
-                lab_id2: {'value': 12.1, 'unit': 'g/dL', 'code': 'LAB001'},
-                ...
-            },
-            'visit_id': visit_id,
-            'patient_id': patient_id
-        }
-    """
-    
-    # Query síntomas
-    symptoms_query = PatientSymptomsLog.query.filter_by(patient_id=patient_id)
-    if visit_id:
-        symptoms_query = symptoms_query.filter_by(visit_id=visit_id)
+    Fracción del peso de una regla de signo o laboratorio que aporta un valor observado.
     
-    symptoms_logs = symptoms_query.all()
-    symptoms_ids = [log.symptom_id for log in symptoms_logs]
-    
-    # Query signos
-    signs_query = PatientSignsLog.query.filter_by(patient_id=patient_id)
-    if visit_id:
-        signs_query = signs_query.filter_by(visit_id=visit_id)
-    
-    signs_logs = signs_query.all()
-    signs_data = {}
-    for log in signs_logs:
-        sign = Sign.query.get(log.sign_id)
-        signs_data[log.sign_id] = {
-            'value_numeric': log.value_numeric,
-            'value_text': log.value_text,
-            'unit': log.unit or (sign.measurement_unit if sign else None),
-            'code': sign.code if sign else None,
-            'name': sign.name if sign else None,
-            'normal_range': sign.normal_range if sign else None
-        }
-    
-    # Query laboratorios
-    labs_query = PatientLabResultsLog.query.filter_by(patient_id=patient_id)
-    if visit_id:
-        labs_query = labs_query.filter_by(visit_id=visit_id)
-    
-    labs_logs = labs_query.all()
-    labs_data = {}
-    for log in labs_logs:
-        lab_test = LabTest.query.get(log.lab_test_id)
-        labs_data[log.lab_test_id] = {
-            'value_numeric': log.value_numeric,
-            'value_text': log.value_text,
-            'unit': log.unit or (lab_test.unit if lab_test else None),
-            'code': lab_test.code if lab_test else None,
-            'name': lab_test.name if lab_test else None,
-            'normal_range': lab_test.normal_range if lab_test else None
-        }
+    Los resultados cualitativos se puntúan por su grado entero (`value_code`,
+    codificado al registrarse). Los registros sin grado (anteriores al libro de
+    códigos o construidos a mano) se codifican con el libro de la entrada.
     
-    return {
-        'symptoms': symptoms_ids,
-        'signs': signs_data,
-        'labs': labs_data,
-        'visit_id': visit_id,
-        'patient_id': patient_id
-    }
-
-
-def parse_numeric_range(range_str: str) -> Tuple[Optional[float], Optional[float]]:
-    """
-    Parsea un string de rango a valores min/max.
-    
-    Ejemplos:
-        '36.5-37.5' -> (36.5, 37.5)
-        '<10' -> (None, 10)
-        '>90' -> (90, None)
-        '70-100' -> (70, 100)
-        
-    Args:
-        range_str: String representando el rango normal
-        
     Returns:
-        Tupla (min_value, max_value) donde None indica sin límite
+        1.0 si el valor numérico está fuera del rango normal o el resultado
+        cualitativo es anormal, 0.5 si es indeterminado o si es un texto que no
+        figura en el libro de códigos, y 0.0 en cualquier otro caso
     """
-    if not range_str or range_str == 'Variable':
-        return (None, None)
-    
-    # Pattern: número-número (ej. 70-100)
-    match = re.match(r'^(\d+\.?\d*)\s*-\s*(\d+\.?\d*)$', range_str.strip())
-    if match:
-        return (float(match.group(1)), float(match.group(2)))
-    
-    # Pattern: <número (ej. <10)
-    match = re.match(r'^<\s*(\d+\.?\d*)$', range_str.strip())
-    if match:
-        return (None, float(match.group(1)))
-    
-    # Pattern: >número (ej. >90)
-    match = re.match(r'^>\s*(\d+\.?\d*)$', range_str.strip())
-    if match:
-        return (float(match.group(1)), None)
-    
-    # Pattern: ≥número o >=número
-    match = re.match(r'^(≥|>=)\s*(\d+\.?\d*)$', range_str.strip())
-    if match:
-        return (float(match.group(2)), None)
-    
-    # Pattern: ≤número o <=número
-    match = re.match(r'^(≤|<=)\s*(\d+\.?\d*)$', range_str.strip())
-    if match:
-        return (None, float(match.group(2)))
-    
-    return (None, None)
+    if value_numeric is not None:
+        if entry is None:
+            return 0.0
+        return 1.0 if is_outside_range(value_numeric, entry.range_min, entry.range_max) else 0.0
+    if value_code is None and value_text and entry is not None:
+        value_code = entry.encode_qualitative(value_text)
+    if value_code is not None:
+        return QUALITATIVE_FACTORS[value_code]
+    # Peso reducido para textos sin codificar
+    return 0.5 if value_text else 0.0
 
 
-def is_value_abnormal(value: Optional[float], normal_range: str) -> bool:
+def evidence_factors(values: ObservedValues, catalog: Dict[int, CatalogEntry]) -> Dict[int, float]:
     """
-    Determina si un valor numérico está fuera del rango normal.
-    
-    Args:
-        value: Valor numérico a evaluar
-        normal_range: String con el rango normal (ej. '70-100', '<10', etc.)
-        
-    Returns:
-        True si el valor está fuera del rango normal (anormal), False si está dentro
+    Calcula el factor de cada valor observado una sola vez por diagnóstico
+    (el rango normal es propiedad del catálogo, no de la enfermedad).
+    Solo incluye los valores que aportan score.
     """
-    if value is None:
-        return False
-    
-    min_val, max_val = parse_numeric_range(normal_range)
-    
-    # Si no pudimos parsear el rango, asumimos que es normal
-    if min_val is None and max_val is None:
-        return False
-    
-    # Verificar si está fuera del rango
-    if min_val is not None and value < min_val:
-        return True
-    if max_val is not None and value > max_val:
-        return True
-    
-    return False
+    factors = {}
+    for item_id, (value_numeric, value_text, _, value_code) in values.items():
+        entry = catalog.get(item_id)
+        if entry is None:
+            continue
+        factor = evidence_factor(entry, value_numeric, value_text, value_code)
+        if factor:
+            factors[item_id] = factor
+    return factors
 
 
 class InferenceEngine:
@@ -185,109 +76,32 @@ class InferenceEngine:
     
     Calcula scores para cada enfermedad sumando los pesos de la evidencia
     del paciente que coincide con las reglas de asociación en la base de conocimiento.
+    Es seguro compartir una instancia entre hilos: `diagnose` no modifica estado.
     """
     
-    def __init__(self):
-        """Inicializa el motor de inferencia."""
-        self.diseases_cache = None
-        self.rules_cache = None
-    
-    def _load_disease_rules(self) -> Dict[str, Dict[str, List[Dict]]]:
+    def __init__(self, knowledge_base: KnowledgeBase):
         """
-        Carga todas las reglas (asociaciones disease-evidence con pesos) desde la BD.
+        Inicializa el motor de inferencia.
         
-        Returns:
-            Dict estructurado:
-            {
-                'RESP01': {
-                    'symptoms': [{'id': 1, 'weight': 1.0, 'code': 'S001'}, ...],
-                    'signs': [{'id': 2, 'weight': 0.8, 'code': 'SG002'}, ...],
-                    'labs': [{'id': 3, 'weight': 0.9, 'code': 'LAB008'}, ...]
-                },
-                ...
-            }
+        Args:
+            knowledge_base: Reglas compiladas; el motor no guarda estado entre llamadas
         """
-        if self.rules_cache is not None:
-            return self.rules_cache
-        
-        rules = {}
-        
-        # Obtener todas las enfermedades activas
-        diseases = Disease.query.filter_by(is_active=True).all()
-        
-        for disease in diseases:
-            disease_code = disease.code
-            rules[disease_code] = {
-                'symptoms': [],
-                'signs': [],
-                'labs': [],
-                'disease_name': disease.name,
-                'category': disease.category,
-                'severity': disease.severity
-            }
-            
-            # Síntomas con pesos
-            symptoms_query = text("""
-                SELECT symptom_id, weight 
-                FROM disease_symptoms 
-                WHERE disease_code = :disease_code
-            """)
-            symptoms_results = db.session.execute(symptoms_query, {'disease_code': disease_code})
-            for row in symptoms_results:
-                symptom = Symptom.query.get(row.symptom_id)
-                if symptom and symptom.is_active:
-                    rules[disease_code]['symptoms'].append({
-                        'id': row.symptom_id,
-                        'weight': row.weight,
-                        'code': symptom.code,
-                        'name': symptom.name
-                    })
-            
-            # Signos con pesos
-            signs_query = text("""
-                SELECT sign_id, weight 
-                FROM disease_signs 
-                WHERE disease_code = :disease_code
-            """)
-            signs_results = db.session.execute(signs_query, {'disease_code': disease_code})
-            for row in signs_results:
-                sign = Sign.query.get(row.sign_id)
-                if sign and sign.is_active:
-                    rules[disease_code]['signs'].append({
-                        'id': row.sign_id,
-                        'weight': row.weight,
-                        'code': sign.code,
-                        'name': sign.name,
-                        'normal_range': sign.normal_range
-                    })
-            
-            # Laboratorios con pesos
-            labs_query = text("""
-                SELECT lab_test_id, weight 
-                FROM disease_lab_tests 
-                WHERE disease_code = :disease_code
-            """)
-            labs_results = db.session.execute(labs_query, {'disease_code': disease_code})
-            for row in labs_results:
-                lab_test = LabTest.query.get(row.lab_test_id)
-                if lab_test and lab_test.is_active:
-                    rules[disease_code]['labs'].append({
-                        'id': row.lab_test_id,
-                        'weight': row.weight,
-                        'code': lab_test.code,
-                        'name': lab_test.name,
-                        'normal_range': lab_test.normal_range
-                    })
-        
-        self.rules_cache = rules
-        return rules
+        self.knowledge_base = knowledge_base
     
-    def diagnose(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+    def diagnose(self, patient_data: Union[PatientEvidence, Dict[str, Any]],
+                 explain: bool = True, top_n: int = 6) -> Dict[str, Any]:
         """
         Ejecuta el motor de inferencia para diagnosticar basándose en la evidencia del paciente.
         
+        El recorrido de reglas solo acumula scores numéricos; la evidencia
+        coincidente (`matched_evidence`) se construye después, y únicamente para
+        los diagnósticos retornados.
+        
         Args:
-            patient_data: Diccionario con evidencia del paciente (retornado por get_patient_evidence)
+            patient_data: Evidencia del paciente (`PatientEvidence` retornada por
+                load_patient_evidence, o diccionario en el formato de `PatientEvidence.from_dict`)
+            explain: Si es False, los diagnósticos retornados no incluyen `matched_evidence`
+            top_n: Número de diagnósticos retornados (principal + alternativas)
             
         Returns:
             Diccionario con:
@@ -313,164 +127,168 @@ class InferenceEngine:
             }
         """
         
-        # Cargar reglas
-        disease_rules = self._load_disease_rules()
-        
-        # Resultados
-        disease_scores = []
+        evidence = PatientEvidence.coerce(patient_data)
+        knowledge_base = self.knowledge_base
+        candidates = self.score_candidates(evidence)
         
-        # Evaluar cada enfermedad
-        for disease_code, rules in disease_rules.items():
-            score = 0.0
-            max_possible_score = 0.0
-            matched_evidence = {
-                'symptoms': [],
-                'signs': [],
-                'labs': []
-            }
-            
-            # ===== SÍNTOMAS =====
-            for symptom_rule in rules['symptoms']:
-                max_possible_score += symptom_rule['weight']
-                
-                # Si el paciente tiene este síntoma, sumar el peso
-                if symptom_rule['id'] in patient_data['symptoms']:
-                    score += symptom_rule['weight']
-                    matched_evidence['symptoms'].append({
-                        'code': symptom_rule['code'],
-                        'name': symptom_rule['name'],
-                        'weight': symptom_rule['weight']
-                    })
-            
-            # ===== SIGNOS =====
-            for sign_rule in rules['signs']:
-                max_possible_score += sign_rule['weight']
-                
-                # Si el paciente tiene este signo registrado
-                if sign_rule['id'] in patient_data['signs']:
-                    patient_sign = patient_data['signs'][sign_rule['id']]
-                    
-                    # Verificar si el valor está anormal (fuera de rango normal)
-                    if patient_sign['value_numeric'] is not None:
-                        if is_value_abnormal(patient_sign['value_numeric'], sign_rule['normal_range']):
-                            score += sign_rule['weight']
-                            matched_evidence['signs'].append({
-                                'code': sign_rule['code'],
-                                'name': sign_rule['name'],
-                                'value': patient_sign['value_numeric'],
-                                'unit': patient_sign['unit'],
-                                'weight': sign_rule['weight'],
-                                'abnormal': True
-                            })
-                    else:
-                        # Si no hay valor numérico pero hay texto, contar como evidencia
-                        if patient_sign['value_text']:
-                            score += sign_rule['weight'] * 0.5  # Peso reducido para valores cualitativos
-                            matched_evidence['signs'].append({
-                                'code': sign_rule['code'],
-                                'name': sign_rule['name'],
-                                'value': patient_sign['value_text'],
-                                'weight': sign_rule['weight'] * 0.5,
-                                'qualitative': True
-                            })
-            
-            # ===== LABORATORIOS =====
-            for lab_rule in rules['labs']:
-                max_possible_score += lab_rule['weight']
-                
-                # Si el paciente tiene este laboratorio
-                if lab_rule['id'] in patient_data['labs']:
-                    patient_lab = patient_data['labs'][lab_rule['id']]
-                    
-                    # Verificar si el valor está anormal
-                    if patient_lab['value_numeric'] is not None:
-                        if is_value_abnormal(patient_lab['value_numeric'], lab_rule['normal_range']):
-                            score += lab_rule['weight']
-                            matched_evidence['labs'].append({
-                                'code': lab_rule['code'],
-                                'name': lab_rule['name'],
-                                'value': patient_lab['value_numeric'],
-                                'unit': patient_lab['unit'],
-                                'weight': lab_rule['weight'],
-                                'abnormal': True
-                            })
-                    else:
-                        # Valor cualitativo
-                        if patient_lab['value_text']:
-                            score += lab_rule['weight'] * 0.5
-                            matched_evidence['labs'].append({
-                                'code': lab_rule['code'],
-                                'name': lab_rule['name'],
-                                'value': patient_lab['value_text'],
-                                'weight': lab_rule['weight'] * 0.5,
-                                'qualitative': True
-                            })
-            
-            # Calcular confianza (porcentaje del score máximo posible)
-            confidence = (score / max_possible_score * 100.0) if max_possible_score > 0 else 0.0
-            
-            # Solo incluir enfermedades con al menos algo de score
-            if score > 0:
-                disease_scores.append({
-                    'disease_code': disease_code,
-                    'disease_name': rules['disease_name'],
-                    'category': rules['category'],
-                    'severity': rules['severity'],
-                    'score': round(score, 2),
-                    'confidence': round(confidence, 2),
-                    'max_possible_score': round(max_possible_score, 2),
-                    'matched_evidence': matched_evidence
-                })
+        # Top N por score descendente (estable ante empates, igual que sort)
+        top = heapq.nlargest(top_n, candidates, key=lambda c: round(c[1], 2))
         
-        # Ordenar por score descendente
-        disease_scores.sort(key=lambda x: x['score'], reverse=True)
+        disease_scores = [self._build_result(rules, score) for rules, score in top]
+        if explain:
+            for item, (rules, _) in zip(disease_scores, top):
+                item['matched_evidence'] = self._matched_evidence(rules, evidence)
         
         # Preparar resultado
         result = {
             'primary_diagnosis': disease_scores[0] if disease_scores else None,
-            'alternative_diagnoses': disease_scores[1:6] if len(disease_scores) > 1 else [],  # Top 5 alternativas
-            'total_diseases_evaluated': len(disease_rules),
-            'total_candidates': len(disease_scores),
+            'alternative_diagnoses': disease_scores[1:],
+            'total_diseases_evaluated': len(knowledge_base.diseases),
+            'total_candidates': len(candidates),
             'inference_timestamp': datetime.utcnow().isoformat(),
-            'patient_id': patient_data.get('patient_id'),
-            'visit_id': patient_data.get('visit_id')
+            'patient_id': evidence.patient_id,
+            'visit_id': evidence.visit_id
         }
         
         return result
-
-
-def get_treatment_recommendation(disease_code: str) -> Optional[Dict[str, str]]:
-    """
-    Obtiene las recomendaciones de tratamiento y prevención para una enfermedad.
     
-    Args:
-        disease_code: Código de la enfermedad (ej. 'RESP03')
+    def score_candidates(self, patient_data: Union[PatientEvidence, Dict[str, Any]]) -> List[Tuple[DiseaseRules, float]]:
+        """
+        Puntúa todas las enfermedades y retorna las que tienen score mayor a
+        cero como tuplas (reglas, score), en el orden de la base de conocimiento.
+        """
+        evidence = PatientEvidence.coerce(patient_data)
+        knowledge_base = self.knowledge_base
+        symptoms = evidence.symptoms
+        sign_factors = evidence_factors(evidence.signs, knowledge_base.signs)
+        lab_factors = evidence_factors(evidence.labs, knowledge_base.labs)
         
-    Returns:
-        Diccionario con:
-        {
-            'disease_code': 'RESP03',
-            'disease_name': 'Neumonía bacteriana',
-            'treatment_recommendations': 'Antibióticos...',
-            'prevention_measures': 'Vacunación...',
-            'severity': 'grave'
+        candidates = []
+        for rules in knowledge_base.diseases.values():
+            score = self._score_rules(rules, symptoms, sign_factors, lab_factors)
+            
+            # Solo incluir enfermedades con al menos algo de score
+            if score > 0:
+                candidates.append((rules, score))
+        return candidates
+    
+    def explain(self, disease_code: str, patient_data: Union[PatientEvidence, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Explica el score de una sola enfermedad frente a la evidencia del paciente.
+        
+        Returns:
+            Mismo formato que un elemento de `diagnose` (con `matched_evidence`),
+            o None si la enfermedad no está en la base de conocimiento
+        """
+        rules = self.knowledge_base.get_disease(disease_code)
+        if rules is None:
+            return None
+        
+        evidence = PatientEvidence.coerce(patient_data)
+        score = self._score_rules(
+            rules,
+            evidence.symptoms,
+            evidence_factors(evidence.signs, self.knowledge_base.signs),
+            evidence_factors(evidence.labs, self.knowledge_base.labs)
+        )
+        result = self._build_result(rules, score)
+        result['matched_evidence'] = self._matched_evidence(rules, evidence)
+        return result
+    
+    @staticmethod
+    def _build_result(rules: DiseaseRules, score: float) -> Dict[str, Any]:
+        max_possible_score = rules.max_score
+        
+        # Calcular confianza (porcentaje del score máximo posible)
+        confidence = (score / max_possible_score * 100.0) if max_possible_score > 0 else 0.0
+        
+        return {
+            'disease_code': rules.code,
+            'disease_name': rules.name,
+            'category': rules.category,
+            'severity': rules.severity,
+            'score': round(score, 2),
+            'confidence': round(confidence, 2),
+            'max_possible_score': round(max_possible_score, 2)
         }
-        O None si no se encuentra la enfermedad
-    """
-    disease = Disease.query.filter_by(code=disease_code, is_active=True).first()
     
-    if not disease:
-        return None
+    @staticmethod
+    def _score_rules(rules: DiseaseRules, symptoms: FrozenSet[int],
+                     sign_factors: Dict[int, float], lab_factors: Dict[int, float]) -> float:
+        """Acumula el score de una enfermedad sin generar explicaciones."""
+        score = 0.0
+        
+        # ===== SÍNTOMAS =====
+        for symptom_id, weight in zip(rules.symptom_ids, rules.symptom_weights):
+            if symptom_id in symptoms:
+                score += weight
+        
+        # ===== SIGNOS =====
+        for sign_id, weight in zip(rules.sign_ids, rules.sign_weights):
+            factor = sign_factors.get(sign_id)
+            if factor:
+                score += weight * factor
+        
+        # ===== LABORATORIOS =====
+        for lab_id, weight in zip(rules.lab_ids, rules.lab_weights):
+            factor = lab_factors.get(lab_id)
+            if factor:
+                score += weight * factor
+        
+        return score
     
-    return {
-        'disease_code': disease.code,
-        'disease_name': disease.name,
-        'treatment_recommendations': disease.treatment_recommendations,
-        'prevention_measures': disease.prevention_measures,
-        'severity': disease.severity,
-        'category': disease.category,
-        'description': disease.description
-    }
+    def _matched_evidence(self, rules: DiseaseRules, evidence: PatientEvidence) -> Dict[str, List[Dict]]:
+        """Construye la lista de evidencia coincidente de una enfermedad."""
+        knowledge_base = self.knowledge_base
+        matched_evidence = {
+            'symptoms': [],
+            'signs': [],
+            'labs': []
+        }
+        
+        for symptom_id, weight in zip(rules.symptom_ids, rules.symptom_weights):
+            if symptom_id in evidence.symptoms:
+                entry = knowledge_base.symptoms[symptom_id]
+                matched_evidence['symptoms'].append({
+                    'code': entry.code,
+                    'name': entry.name,
+                    'weight': weight
+                })
+        
+        groups = (
+            ('signs', rules.sign_ids, rules.sign_weights, evidence.signs, knowledge_base.signs),
+            ('labs', rules.lab_ids, rules.lab_weights, evidence.labs, knowledge_base.labs),
+        )
+        for key, ids, weights, observed_values, catalog in groups:
+            for item_id, weight in zip(ids, weights):
+                observed = observed_values.get(item_id)
+                if observed is None:
+                    continue
+                value_numeric, value_text, unit, value_code = observed
+                entry = catalog[item_id]
+                factor = evidence_factor(entry, value_numeric, value_text, value_code)
+                if factor == 1.0 and value_numeric is not None:
+                    matched_evidence[key].append({
+                        'code': entry.code,
+                        'name': entry.name,
+                        'value': value_numeric,
+                        'unit': unit,
+                        'weight': weight,
+                        'abnormal': True
+                    })
+                elif factor > 0:
+                    item = {
+                        'code': entry.code,
+                        'name': entry.name,
+                        'value': value_text,
+                        'weight': weight * factor,
+                        'qualitative': True
+                    }
+                    if factor == 1.0:
+                        item['abnormal'] = True
+                    matched_evidence[key].append(item)
+        
+        return matched_evidence
 
 
 # ==================== EJEMPLO DE USO ====================
@@ -485,6 +303,11 @@ if __name__ == '__main__':
     """
     
     from app import create_app
+    from app.services.inference import (
+        get_knowledge_base,
+        get_patient_evidence,
+        get_treatment_recommendation
+    )
     
     # Crear contexto de aplicación
     app = create_app()
@@ -507,11 +330,11 @@ if __name__ == '__main__':
             patient_data = get_patient_evidence(patient_id, visit_id)
             
             print(f"✅ Evidencia recuperada:")
-            print(f"   • Síntomas: {len(patient_data['symptoms'])} registrados")
-            print(f"   • Signos: {len(patient_data['signs'])} registrados")
-            print(f"   • Laboratorios: {len(patient_data['labs'])} registrados")
+            print(f"   • Síntomas: {len(patient_data.symptoms)} registrados")
+            print(f"   • Signos: {len(patient_data.signs)} registrados")
+            print(f"   • Laboratorios: {len(patient_data.labs)} registrados")
             
-            if not patient_data['symptoms'] and not patient_data['signs'] and not patient_data['labs']:
+            if patient_data.is_empty():
                 print("\n⚠️  ADVERTENCIA: No se encontró evidencia para este paciente.")
                 print("   Por favor, asegúrate de que existan logs en las tablas:")
                 print("   - patient_symptoms_log")
@@ -523,7 +346,7 @@ if __name__ == '__main__':
             print(f"\n🔍 PASO 2: Ejecutando motor de inferencia")
             print("-" * 80)
             
-            engine = InferenceEngine()
+            engine = InferenceEngine(get_knowledge_base())
             diagnosis_result = engine.diagnose(patient_data)
             
             print(f"✅ Inferencia completada:")
@@ -0,0 +1,134 @@
+"""
+Selección de la Siguiente Prueba
+================================
+
+Recomienda qué signo o prueba de laboratorio aún no observado separa mejor a
+los diagnósticos candidatos, por ganancia de información esperada.
+
+Modelo:
+- Los `top_k` candidatos del motor forman una distribución p proporcional a su
+  score; su entropía (en bits) mide cuán indeciso está el diferencial.
+- Para cada prueba t, la columna de la matriz de reglas (`KnowledgeBase.sign_rules`
+  / `lab_rules`) da la probabilidad de un resultado anormal dada cada
+  enfermedad: q = peso de la regla (acotado a [ε, 1-ε]) si la enfermedad tiene
+  la regla, y ε si no la tiene.
+- La ganancia es H(p) - [P(anormal)·H(p | anormal) + P(normal)·H(p | normal)],
+  con las posteriores obtenidas por Bayes.
+
+Todas las pruebas se evalúan en una sola pasada sobre las columnas del índice
+invertido (solo las pruebas con alguna regla entre los candidatos), sin volver
+a puntuar las enfermedades.
+"""
+
+import math
+from typing import Dict, List, Any, Sequence, Tuple
+from app.modules.evidence import PatientEvidence
+from app.modules.knowledge_base import KnowledgeBase, DiseaseRules
+
+# Probabilidad de un resultado anormal sin regla que lo explique (falsos positivos)
+DEFAULT_EPSILON = 0.05
+
+
+def entropy(probabilities: Sequence[float]) -> float:
+    """Entropía de Shannon en bits."""
+    return -sum(p * math.log2(p) for p in probabilities if p > 0)
+
+
+def expected_information_gain(prior: Sequence[float], q_abnormal: Sequence[float]) -> Tuple[float, float]:
+    """
+    Ganancia de información esperada de una prueba binaria (normal / anormal).
+
+    Args:
+        prior: Distribución actual sobre los candidatos (suma 1)
+        q_abnormal: P(resultado anormal | candidato), alineada con `prior`
+
+    Returns:
+        Tupla (ganancia en bits, P(resultado anormal))
+    """
+    joint_abnormal = [p * q for p, q in zip(prior, q_abnormal)]
+    p_abnormal = sum(joint_abnormal)
+    p_normal = 1.0 - p_abnormal
+    if p_abnormal <= 0.0 or p_normal <= 0.0:
+        return 0.0, p_abnormal
+
+    joint_normal = [p - j for p, j in zip(prior, joint_abnormal)]
+    expected = (
+        p_abnormal * entropy([j / p_abnormal for j in joint_abnormal])
+        + p_normal * entropy([j / p_normal for j in joint_normal])
+    )
+    return entropy(prior) - expected, p_abnormal
+
+
+def rank_next_tests(knowledge_base: KnowledgeBase, evidence: PatientEvidence,
+                    candidates: List[Tuple[DiseaseRules, float]],
+                    limit: int = 10, epsilon: float = DEFAULT_EPSILON) -> Dict[str, Any]:
+    """
+    Ordena los signos y laboratorios no observados por ganancia de información
+    sobre los candidatos dados.
+
+    Args:
+        knowledge_base: Base de conocimiento con los índices invertidos de reglas
+        evidence: Evidencia actual (sus signos y laboratorios se excluyen)
+        candidates: Tuplas (reglas, score) de los candidatos a separar
+        limit: Máximo de pruebas retornadas
+        epsilon: Probabilidad de resultado anormal sin regla asociada
+
+    Returns:
+        Diccionario con la distribución de los candidatos, su entropía y la
+        lista de pruebas ordenada por ganancia descendente
+    """
+    total = sum(score for _, score in candidates)
+    codes = [rules.code for rules, _ in candidates]
+    prior = [score / total for _, score in candidates] if total > 0 else []
+    position = {code: i for i, code in enumerate(codes)}
+    low, high = epsilon, 1.0 - epsilon
+
+    ranked = []
+    groups = (
+        ('sign', knowledge_base.sign_rules, evidence.signs),
+        ('lab', knowledge_base.lab_rules, evidence.labs),
+    )
+    if len(prior) > 1:
+        for kind, rule_columns, observed in groups:
+            for item_id, column in rule_columns.items():
+                if item_id in observed:
+                    continue
+                q = None
+                for code, weight in column.items():
+                    i = position.get(code)
+                    if i is not None:
+                        if q is None:
+                            q = [low] * len(prior)
+                        q[i] = min(high, max(low, weight))
+                # Sin reglas entre los candidatos la prueba no los separa
+                if q is None:
+                    continue
+                gain, p_abnormal = expected_information_gain(prior, q)
+                if gain > 0:
+                    ranked.append((gain, p_abnormal, kind, item_id, column))
+
+    ranked.sort(key=lambda r: (-r[0], r[2], r[3]))
+
+    tests = []
+    for gain, p_abnormal, kind, item_id, column in ranked[:limit]:
+        entry = (knowledge_base.signs if kind == 'sign' else knowledge_base.labs)[item_id]
+        tests.append({
+            'type': kind,
+            'id': item_id,
+            'code': entry.code,
+            'name': entry.name,
+            'unit': entry.unit,
+            'normal_range': entry.normal_range,
+            'information_gain': round(gain, 4),
+            'p_abnormal': round(p_abnormal, 4),
+            'supports': sorted(code for code in column if code in position)
+        })
+
+    return {
+        'candidates': [
+            {'disease_code': code, 'disease_name': rules.name, 'score': round(score, 2), 'probability': round(p, 4)}
+            for (rules, score), code, p in zip(candidates, codes, prior)
+        ],
+        'entropy': round(entropy(prior), 4),
+        'tests': tests
+    }
@@ -0,0 +1,240 @@
+"""
+Base de Conocimiento del Motor de Inferencia
+=============================================
+
+Objeto de valor independiente de Flask y de SQLAlchemy que contiene las reglas
+compiladas (asociaciones enfermedad-evidencia con pesos) y los catálogos de
+síntomas, signos y laboratorios necesarios para puntuar.
+
+Representación compacta:
+- Cada entrada de catálogo es un `CatalogEntry` con `__slots__`; el código, el
+  nombre y el rango normal se guardan una sola vez (códigos internados) y el
+  rango se compila a límites numéricos al cargar, igual que sus conversiones de
+  unidad hacia la unidad canónica (ver `app.modules.units`) y su libro de
+  códigos de resultados cualitativos (ver `app.modules.qualitative`).
+- Cada enfermedad es un `DiseaseRules` con `__slots__` cuyas reglas son tuplas
+  paralelas de IDs y pesos, más el score máximo posible precalculado. Se usan
+  tuplas y no `array`: con pocas reglas por enfermedad la cabecera de cada
+  arreglo pesa más que los datos, y recorrer un arreglo crea un objeto por
+  elemento en cada diagnóstico.
+
+Se construye una sola vez mediante `app.modules.loaders.load_knowledge_base` y
+puede serializarse con pickle o convertirse a diccionario (`to_dict` /
+`from_dict`) para usarse en procesos de trabajo, notebooks o benchmarks sin
+levantar la aplicación.
+"""
+
+import sys
+from typing import Dict, Any, Optional, Iterable, Tuple
+from app.modules.ranges import parse_numeric_range
+from app.modules.qualitative import compile_codebook, encode
+from app.modules.units import UnitConversionError, compile_conversions, convert, unit_key
+
+
+def intern_str(value: Optional[str]) -> Optional[str]:
+    """Interna cadenas repetidas (códigos, categorías) para compartir memoria."""
+    return sys.intern(value) if value else value
+
+
+class CatalogEntry:
+    """Síntoma, signo o prueba de laboratorio del catálogo."""
+
+    __slots__ = ('id', 'code', 'name', 'unit', 'normal_range', 'range_min', 'range_max',
+                 'conversions', 'codebook')
+
+    def __init__(self, id: int, code: str, name: str,
+                 unit: Optional[str] = None, normal_range: Optional[str] = None):
+        self.id = id
+        self.code = intern_str(code)
+        self.name = name
+        self.unit = intern_str(unit)
+        self.normal_range = normal_range
+        self.range_min, self.range_max = parse_numeric_range(normal_range)
+        self.conversions = compile_conversions(self.code, self.unit)
+        self.codebook = compile_codebook(self.code, normal_range)
+
+    def encode_qualitative(self, value_text: Optional[str]) -> Optional[int]:
+        """Grado entero de un resultado cualitativo (ver `app.modules.qualitative`) o None."""
+        return encode(self.codebook, value_text)
+
+    def to_canonical(self, value_numeric: Optional[float], unit: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+        """
+        Normaliza un valor numérico a la unidad del catálogo.
+
+        Returns:
+            Tupla (valor, unidad) en la unidad canónica. Sin valor numérico, o si
+            la entrada no tiene unidad convertible ni rango numérico, se
+            retornan tal cual.
+
+        Raises:
+            UnitConversionError: Si la unidad no es convertible y el valor se
+                compara contra un rango numérico o una tabla de conversión.
+        """
+        if value_numeric is None:
+            return value_numeric, unit
+        key = unit_key(unit)
+        if not key or key == unit_key(self.unit):
+            return value_numeric, self.unit or unit
+        if self.conversions and key in self.conversions:
+            return convert(float(value_numeric), self.conversions[key]), self.unit
+        if self.unit and (self.conversions is not None
+                          or self.range_min is not None or self.range_max is not None):
+            raise UnitConversionError(
+                f"Unidad '{unit}' no válida para {self.code} ({self.name}); unidad esperada: {self.unit}"
+            )
+        return value_numeric, unit
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'code': self.code,
+            'name': self.name,
+            'unit': self.unit,
+            'normal_range': self.normal_range
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CatalogEntry':
+        return cls(data['id'], data['code'], data['name'], data.get('unit'), data.get('normal_range'))
+
+    def __repr__(self):
+        return f'<CatalogEntry {self.code}: {self.name}>'
+
+
+class DiseaseRules:
+    """Reglas ponderadas de una enfermedad en tuplas paralelas (IDs / pesos)."""
+
+    __slots__ = (
+        'code', 'name', 'category', 'severity',
+        'symptom_ids', 'symptom_weights',
+        'sign_ids', 'sign_weights',
+        'lab_ids', 'lab_weights',
+        'max_score'
+    )
+
+    def __init__(self, code: str, name: str, category: Optional[str], severity: Optional[str],
+                 symptoms: Iterable[Tuple[int, float]] = (),
+                 signs: Iterable[Tuple[int, float]] = (),
+                 labs: Iterable[Tuple[int, float]] = ()):
+        self.code = intern_str(code)
+        self.name = name
+        self.category = intern_str(category)
+        self.severity = intern_str(severity)
+        self.symptom_ids, self.symptom_weights = _pack(symptoms)
+        self.sign_ids, self.sign_weights = _pack(signs)
+        self.lab_ids, self.lab_weights = _pack(labs)
+
+        # El score máximo no depende de la evidencia: se suma una sola vez
+        # (mismo orden que el recorrido del motor: síntomas, signos, laboratorios)
+        max_score = 0.0
+        for weights in (self.symptom_weights, self.sign_weights, self.lab_weights):
+            for weight in weights:
+                max_score += weight
+        self.max_score = max_score
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'code': self.code,
+            'name': self.name,
+            'category': self.category,
+            'severity': self.severity,
+            'symptoms': list(zip(self.symptom_ids, self.symptom_weights)),
+            'signs': list(zip(self.sign_ids, self.sign_weights)),
+            'labs': list(zip(self.lab_ids, self.lab_weights))
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DiseaseRules':
+        return cls(
+            data['code'], data['name'], data.get('category'), data.get('severity'),
+            symptoms=data.get('symptoms', ()),
+            signs=data.get('signs', ()),
+            labs=data.get('labs', ())
+        )
+
+    def __repr__(self):
+        return f'<DiseaseRules {self.code}: {len(self.symptom_ids)}/{len(self.sign_ids)}/{len(self.lab_ids)}>'
+
+
+def _pack(pairs: Iterable[Tuple[int, float]]) -> Tuple[Tuple[int, ...], Tuple[float, ...]]:
+    """Separa pares (id, peso) en tuplas paralelas de IDs y pesos."""
+    ids = []
+    weights = []
+    for item_id, weight in pairs:
+        ids.append(item_id)
+        weights.append(1.0 if weight is None else float(weight))
+    return tuple(ids), tuple(weights)
+
+
+class KnowledgeBase:
+    """
+    Reglas de diagnóstico compiladas y catálogos asociados.
+
+    Atributos:
+        diseases: Dict {disease_code: DiseaseRules}
+        symptoms: Dict {symptom_id: CatalogEntry}
+        signs: Dict {sign_id: CatalogEntry}
+        labs: Dict {lab_test_id: CatalogEntry}
+        version: Versión del catálogo con la que se construyó
+        sign_rules: Índice invertido {sign_id: {disease_code: peso}}
+        lab_rules: Índice invertido {lab_test_id: {disease_code: peso}}
+    """
+
+    def __init__(self,
+                 diseases: Dict[str, DiseaseRules],
+                 symptoms: Optional[Dict[int, CatalogEntry]] = None,
+                 signs: Optional[Dict[int, CatalogEntry]] = None,
+                 labs: Optional[Dict[int, CatalogEntry]] = None,
+                 version: int = 0):
+        self.diseases = diseases
+        self.symptoms = symptoms or {}
+        self.signs = signs or {}
+        self.labs = labs or {}
+        self.version = version
+
+        # Columnas de la matriz de reglas por signo / laboratorio (para
+        # seleccionar la siguiente prueba sin recorrer todas las enfermedades)
+        self.sign_rules: Dict[int, Dict[str, float]] = {}
+        self.lab_rules: Dict[int, Dict[str, float]] = {}
+        for rules in diseases.values():
+            for sign_id, weight in zip(rules.sign_ids, rules.sign_weights):
+                self.sign_rules.setdefault(sign_id, {})[rules.code] = weight
+            for lab_id, weight in zip(rules.lab_ids, rules.lab_weights):
+                self.lab_rules.setdefault(lab_id, {})[rules.code] = weight
+
+    def __len__(self) -> int:
+        return len(self.diseases)
+
+    def __contains__(self, disease_code: str) -> bool:
+        return disease_code in self.diseases
+
+    def get_disease(self, disease_code: str) -> Optional[DiseaseRules]:
+        """Retorna las reglas de una enfermedad o None si no existe."""
+        return self.diseases.get(disease_code)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convierte la base de conocimiento a un diccionario serializable en JSON."""
+        return {
+            'version': self.version,
+            'diseases': [rules.to_dict() for rules in self.diseases.values()],
+            'symptoms': [entry.to_dict() for entry in self.symptoms.values()],
+            'signs': [entry.to_dict() for entry in self.signs.values()],
+            'labs': [entry.to_dict() for entry in self.labs.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'KnowledgeBase':
+        """Reconstruye una base de conocimiento a partir de `to_dict`."""
+        def catalog(key):
+            return {item['id']: CatalogEntry.from_dict(item) for item in data.get(key, [])}
+
+        return cls(
+            diseases={item['code']: DiseaseRules.from_dict(item) for item in data.get('diseases', [])},
+            symptoms=catalog('symptoms'),
+            signs=catalog('signs'),
+            labs=catalog('labs'),
+            version=data.get('version', 0)
+        )
+
+    def __repr__(self):
+        return f'<KnowledgeBase v{self.version}: {len(self.diseases)} enfermedades>'
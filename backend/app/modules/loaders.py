@@ -0,0 +1,171 @@
+"""
+Cargadores del Motor de Inferencia
+===================================
+
+Construyen las estructuras que consume el motor (`KnowledgeBase` y la evidencia
+del paciente) a partir de cualquier `Session` o `Connection` de SQLAlchemy.
+
+No dependen de Flask, de `Model.query` ni de un contexto de aplicación, por lo
+que pueden usarse con un engine creado directamente:
+
+    from sqlalchemy import create_engine
+    engine = create_engine('sqlite:///medical_diagnostic.db')
+    with engine.connect() as conn:
+        kb = load_knowledge_base(conn)
+        evidence = load_patient_evidence(conn, patient_id=1)
+"""
+
+from typing import Dict, List, Tuple, Optional
+from sqlalchemy import text
+from app.modules.evidence import PatientEvidence
+from app.modules.knowledge_base import KnowledgeBase, CatalogEntry, DiseaseRules
+
+
+def load_knowledge_base(bind, version: int = 0) -> KnowledgeBase:
+    """
+    Carga todas las reglas activas en una sola pasada (una consulta por tabla).
+
+    Args:
+        bind: Session o Connection de SQLAlchemy
+        version: Versión del catálogo a registrar en la base de conocimiento
+
+    Returns:
+        KnowledgeBase con las enfermedades activas y sus reglas ponderadas
+    """
+    params = {'active': True}
+
+    symptoms = {
+        row.id: CatalogEntry(row.id, row.code, row.name)
+        for row in bind.execute(
+            text("SELECT id, code, name FROM symptoms WHERE is_active = :active"), params
+        )
+    }
+
+    signs = {
+        row.id: CatalogEntry(row.id, row.code, row.name, row.measurement_unit, row.normal_range)
+        for row in bind.execute(
+            text("""
+                SELECT id, code, name, measurement_unit, normal_range
+                FROM signs WHERE is_active = :active
+            """),
+            params
+        )
+    }
+
+    labs = {
+        row.id: CatalogEntry(row.id, row.code, row.name, row.unit, row.normal_range)
+        for row in bind.execute(
+            text("""
+                SELECT id, code, name, unit, normal_range
+                FROM lab_tests WHERE is_active = :active
+            """),
+            params
+        )
+    }
+
+    diseases = [
+        (row.code, row.name, row.category, row.severity)
+        for row in bind.execute(
+            text("""
+                SELECT code, name, category, severity
+                FROM diseases WHERE is_active = :active
+                ORDER BY code
+            """),
+            params
+        )
+    ]
+
+    # Asociaciones (id, peso) por enfermedad, solo contra elementos activos
+    rules: Dict[str, Dict[str, List[Tuple[int, float]]]] = {
+        code: {'symptoms': [], 'signs': [], 'labs': []} for code, _, _, _ in diseases
+    }
+    associations = (
+        ('symptoms', 'disease_symptoms', 'symptom_id', symptoms),
+        ('signs', 'disease_signs', 'sign_id', signs),
+        ('labs', 'disease_lab_tests', 'lab_test_id', labs),
+    )
+    for key, table, column, catalog in associations:
+        for row in bind.execute(text(f"""
+            SELECT disease_code, {column} AS item_id, weight
+            FROM {table}
+            ORDER BY disease_code, {column}
+        """)):
+            disease_rules = rules.get(row.disease_code)
+            if disease_rules is not None and row.item_id in catalog:
+                disease_rules[key].append((row.item_id, row.weight))
+
+    compiled = {
+        code: DiseaseRules(
+            code, name, category, severity,
+            symptoms=rules[code]['symptoms'],
+            signs=rules[code]['signs'],
+            labs=rules[code]['labs']
+        )
+        for code, name, category, severity in diseases
+    }
+
+    return KnowledgeBase(compiled, symptoms=symptoms, signs=signs, labs=labs, version=version)
+
+
+def load_patient_evidence(bind, patient_id: int, visit_id: Optional[str] = None) -> PatientEvidence:
+    """
+    Recupera toda la evidencia clínica del paciente desde los logs atómicos.
+
+    La unidad de cada valor cae en la unidad del catálogo cuando el log no la
+    trae (COALESCE en la misma consulta, sin una consulta por log).
+
+    Args:
+        bind: Session o Connection de SQLAlchemy
+        patient_id: ID del paciente
+        visit_id: ID opcional de visita para filtrar logs de una consulta específica
+
+    Returns:
+        PatientEvidence con los síntomas, signos y laboratorios registrados
+    """
+    params = {'patient_id': patient_id, 'visit_id': visit_id}
+    visit_filter = " AND l.visit_id = :visit_id" if visit_id else ""
+
+    # Síntomas
+    symptoms_ids = [
+        row.symptom_id
+        for row in bind.execute(
+            text(f"""
+                SELECT l.symptom_id
+                FROM patient_symptoms_log l
+                WHERE l.patient_id = :patient_id{visit_filter}
+            """),
+            params
+        )
+    ]
+
+    evidence = PatientEvidence(patient_id=patient_id, visit_id=visit_id, symptoms=symptoms_ids)
+
+    # Signos (el registro más reciente de cada signo prevalece)
+    for row in bind.execute(
+        text(f"""
+            SELECT l.sign_id, l.value_numeric, l.value_text, l.value_code,
+                   COALESCE(NULLIF(l.unit, ''), s.measurement_unit) AS unit
+            FROM patient_signs_log l
+            LEFT JOIN signs s ON s.id = l.sign_id
+            WHERE l.patient_id = :patient_id{visit_filter}
+            ORDER BY l.id
+        """),
+        params
+    ):
+        evidence.signs.add(row.sign_id, row.value_numeric, row.value_text, row.unit, row.value_code)
+
+    # Laboratorios
+    for row in bind.execute(
+        text(f"""
+            SELECT l.lab_test_id, l.value_numeric, l.value_text, l.value_code,
+                   COALESCE(NULLIF(l.unit, ''), t.unit) AS unit
+            FROM patient_lab_results_log l
+            LEFT JOIN lab_tests t ON t.id = l.lab_test_id
+            WHERE l.patient_id = :patient_id{visit_filter}
+            ORDER BY l.id
+        """),
+        params
+    ):
+        evidence.labs.add(row.lab_test_id, row.value_numeric, row.value_text, row.unit, row.value_code)
+
+    return evidence
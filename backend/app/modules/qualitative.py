@@ -0,0 +1,225 @@
+"""
+Codificación de Resultados Cualitativos
+=======================================
+
+Libro de códigos que traduce resultados cualitativos ('Negativo', 'Ausente',
+'Reactivo bilateral', '2+ (normal)', ...) a grados enteros por signo o prueba
+de laboratorio:
+
+    QUAL_NORMAL (0)         -> no aporta score
+    QUAL_INDETERMINATE (1)  -> aporta la mitad del peso (dudoso, trazas)
+    QUAL_ABNORMAL (2)       -> aporta el peso completo
+
+La base de conocimiento compila los términos propios de cada entrada una sola
+vez al cargarse (tabla por código + el rango normal del catálogo, que siempre
+es normal para esa entrada); el vocabulario general se comparte. El texto se
+codifica al registrarse y el motor solo compara enteros al puntuar.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+QUAL_NORMAL = 0
+QUAL_INDETERMINATE = 1
+QUAL_ABNORMAL = 2
+
+# Fracción del peso que aporta cada grado (indexado por código)
+QUALITATIVE_FACTORS = (0.0, 0.5, 1.0)
+
+# Vocabulario común a todas las entradas
+GENERAL_CODEBOOK: Dict[str, int] = {
+    'negativo': QUAL_NORMAL,
+    'negativa': QUAL_NORMAL,
+    'ausente': QUAL_NORMAL,
+    'ausentes': QUAL_NORMAL,
+    'normal': QUAL_NORMAL,
+    'normales': QUAL_NORMAL,
+    'no': QUAL_NORMAL,
+    'no palpable': QUAL_NORMAL,
+    'no reactivo': QUAL_NORMAL,
+    'sin alteraciones': QUAL_NORMAL,
+    'conservado': QUAL_NORMAL,
+    'conservada': QUAL_NORMAL,
+    'positivo': QUAL_ABNORMAL,
+    'positiva': QUAL_ABNORMAL,
+    'presente': QUAL_ABNORMAL,
+    'presentes': QUAL_ABNORMAL,
+    'si': QUAL_ABNORMAL,
+    'reactivo': QUAL_ABNORMAL,
+    'anormal': QUAL_ABNORMAL,
+    'alterado': QUAL_ABNORMAL,
+    'alterada': QUAL_ABNORMAL,
+    'palpable': QUAL_ABNORMAL,
+    'leve': QUAL_ABNORMAL,
+    'moderado': QUAL_ABNORMAL,
+    'moderada': QUAL_ABNORMAL,
+    'severo': QUAL_ABNORMAL,
+    'severa': QUAL_ABNORMAL,
+    '1+': QUAL_ABNORMAL,
+    '2+': QUAL_ABNORMAL,
+    '3+': QUAL_ABNORMAL,
+    '4+': QUAL_ABNORMAL,
+    'dudoso': QUAL_INDETERMINATE,
+    'dudosa': QUAL_INDETERMINATE,
+    'indeterminado': QUAL_INDETERMINATE,
+    'indeterminada': QUAL_INDETERMINATE,
+    'trazas': QUAL_INDETERMINATE,
+}
+
+# Términos propios de cada código (prevalecen sobre el vocabulario general)
+CODEBOOK_TABLE: Dict[str, Dict[str, int]] = {
+    # Reflejos osteotendinosos: normal 2+, tanto hipo como hiperreflexia son anormales
+    'SG012': {'0': QUAL_ABNORMAL, '1+': QUAL_ABNORMAL, '2+': QUAL_NORMAL,
+              '3+': QUAL_ABNORMAL, '4+': QUAL_ABNORMAL},
+    'SG015': {'reactivo': QUAL_NORMAL, 'reactivas': QUAL_NORMAL, 'isocoricas normorreactivas': QUAL_NORMAL,
+              'no reactivo': QUAL_ABNORMAL, 'arreactivo': QUAL_ABNORMAL, 'hiporreactivo': QUAL_ABNORMAL,
+              'lento': QUAL_ABNORMAL, 'anisocoria': QUAL_ABNORMAL},
+    'SG016': {'5/5': QUAL_NORMAL, '4/5': QUAL_ABNORMAL, '3/5': QUAL_ABNORMAL,
+              '2/5': QUAL_ABNORMAL, '1/5': QUAL_ABNORMAL, '0/5': QUAL_ABNORMAL},
+    'SG018': {'rosado': QUAL_NORMAL, 'normocoloreada': QUAL_NORMAL, 'palidez': QUAL_ABNORMAL,
+              'palida': QUAL_ABNORMAL, 'icterica': QUAL_ABNORMAL, 'cianotica': QUAL_ABNORMAL,
+              'marmorea': QUAL_ABNORMAL, 'rubicunda': QUAL_ABNORMAL},
+    'SG020': {'vesicular': QUAL_NORMAL, 'murmullo vesicular conservado': QUAL_NORMAL,
+              'disminuidos': QUAL_ABNORMAL, 'abolidos': QUAL_ABNORMAL, 'sibilancias': QUAL_ABNORMAL,
+              'crepitantes': QUAL_ABNORMAL, 'roncus': QUAL_ABNORMAL, 'estertores': QUAL_ABNORMAL},
+    'SG021': {'ritmicos': QUAL_NORMAL, 'soplo': QUAL_ABNORMAL, 'arritmicos': QUAL_ABNORMAL,
+              'galope': QUAL_ABNORMAL, 'frote': QUAL_ABNORMAL, 'velados': QUAL_ABNORMAL},
+    # Ruidos intestinales: 'presentes' es lo normal
+    'SG022': {'presentes': QUAL_NORMAL, 'presente': QUAL_NORMAL, 'ausentes': QUAL_ABNORMAL,
+              'ausente': QUAL_ABNORMAL, 'aumentados': QUAL_ABNORMAL, 'disminuidos': QUAL_ABNORMAL,
+              'metalicos': QUAL_ABNORMAL},
+    'SG033': {'resonante': QUAL_NORMAL, 'sonoridad conservada': QUAL_NORMAL, 'mate': QUAL_ABNORMAL,
+              'matidez': QUAL_ABNORMAL, 'submatidez': QUAL_ABNORMAL, 'hiperresonante': QUAL_ABNORMAL,
+              'timpanismo': QUAL_ABNORMAL},
+    'SG036': {'palpable': QUAL_ABNORMAL},
+    'SG040': {'rango completo': QUAL_NORMAL, 'limitado': QUAL_ABNORMAL, 'limitada': QUAL_ABNORMAL,
+              'rango limitado': QUAL_ABNORMAL},
+    'SG046': {'hidratada': QUAL_NORMAL, 'deshidratada': QUAL_ABNORMAL, 'seca': QUAL_ABNORMAL,
+              'signo del pliegue positivo': QUAL_ABNORMAL},
+    'LAB018': {'sin desarrollo': QUAL_NORMAL, 'contaminado': QUAL_INDETERMINATE},
+    'LAB019': {'normal': QUAL_NORMAL, 'infiltrado': QUAL_ABNORMAL, 'consolidacion': QUAL_ABNORMAL,
+               'derrame pleural': QUAL_ABNORMAL, 'cardiomegalia': QUAL_ABNORMAL,
+               'neumotorax': QUAL_ABNORMAL, 'atelectasia': QUAL_ABNORMAL},
+    'LAB020': {'ritmo sinusal': QUAL_NORMAL, 'fibrilacion auricular': QUAL_ABNORMAL,
+               'taquicardia': QUAL_ABNORMAL, 'bradicardia': QUAL_ABNORMAL,
+               'elevacion st': QUAL_ABNORMAL, 'infradesnivel st': QUAL_ABNORMAL,
+               'bloqueo': QUAL_ABNORMAL, 'extrasistoles': QUAL_ABNORMAL},
+}
+
+
+def fold_text(text: Optional[str]) -> str:
+    """
+    Forma normalizada de un resultado cualitativo: sin acentos, en minúsculas,
+    sin puntuación final y con espacios simples.
+
+    Ejemplos:
+        ' Negativo. ' -> 'negativo'
+        'Ictérica' -> 'icterica'
+    """
+    if not text:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', text)
+    folded = ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return re.sub(r'\s+', ' ', folded).strip(' .;:')
+
+
+# Palabras que niegan el término siguiente; nunca son un resultado por sí solas
+# dentro de un texto más largo ('No valorable' no es 'no')
+NEGATIONS = frozenset({'no', 'sin', 'ni'})
+
+# Longitud máxima (en palabras) de un término de los libros de códigos
+_MAX_TERM_WORDS = max(
+    len(term.split(' '))
+    for terms in (GENERAL_CODEBOOK, *CODEBOOK_TABLE.values())
+    for term in terms
+)
+
+
+def _variants(folded: str, first_segment: bool = True):
+    """
+    Formas completas de un texto, de la más a la menos específica: completo,
+    sin paréntesis y (opcionalmente) primer segmento antes de una coma.
+    """
+    yield folded
+    without_parens = re.sub(r'\s*\([^)]*\)', '', folded).strip()
+    if without_parens and without_parens != folded:
+        yield without_parens
+    segment = without_parens.split(',')[0].strip()
+    if first_segment and segment and segment != without_parens:
+        yield segment
+
+
+def _lookup(codebook: Optional[Dict[str, int]], term: str) -> Optional[int]:
+    code = codebook.get(term) if codebook else None
+    return GENERAL_CODEBOOK.get(term) if code is None else code
+
+
+def _scan_terms(codebook: Optional[Dict[str, int]], words: List[str]) -> List[Tuple[int, int, bool]]:
+    """
+    Términos conocidos del texto, de izquierda a derecha y el más largo en
+    cada posición: (posición, grado, negado). Una negación suelta ('sin' en
+    'sin soplo') marca el término siguiente como negado.
+    """
+    max_words = max([_MAX_TERM_WORDS] + [len(term.split(' ')) for term in codebook or ()])
+    terms = []
+    negated = False
+    i = 0
+    while i < len(words):
+        for j in range(min(len(words), i + max_words), i, -1):
+            term = ' '.join(words[i:j])
+            if term in NEGATIONS:
+                continue
+            code = _lookup(codebook, term)
+            if code is not None:
+                terms.append((i, code, negated))
+                negated = False
+                i = j
+                break
+        else:
+            negated = negated or words[i] in NEGATIONS
+            i += 1
+    return terms
+
+
+def compile_codebook(code: Optional[str], normal_range: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Compila los términos propios de una entrada del catálogo a
+    {texto_normalizado: grado}. El vocabulario general se comparte entre todas
+    las entradas y no se copia.
+
+    Returns:
+        Diccionario de términos propios, o None si la entrada no tiene ninguno
+    """
+    codebook = dict(CODEBOOK_TABLE.get(code, {})) if code else {}
+
+    # El rango normal del catálogo es, por definición, normal para esta entrada
+    # (salvo que sea un rango numérico, que se evalúa por valor)
+    folded = fold_text(normal_range)
+    if folded and not re.match(r'^[<>≤≥]?\s*=?\s*\d', folded):
+        for variant in _variants(folded):
+            codebook[variant] = QUAL_NORMAL
+    return codebook or None
+
+
+def encode(codebook: Optional[Dict[str, int]], value_text: Optional[str]) -> Optional[int]:
+    """
+    Traduce un resultado cualitativo a su grado, o None si no figura ni en los
+    términos propios de la entrada ni en el vocabulario general (el motor
+    aplica entonces el factor intermedio).
+    """
+    folded = fold_text(value_text)
+    if not folded:
+        return None
+    for variant in _variants(folded, first_segment=False):
+        code = _lookup(codebook, variant)
+        if code is not None:
+            return code
+
+    # El texto debe comenzar con un término conocido ('no reactivo bilateral');
+    # los términos posteriores no negados solo pueden agravarlo ('reactivo lento')
+    words = re.findall(r'[^\s,;]+', re.sub(r'\([^)]*\)', ' ', folded))
+    terms = _scan_terms(codebook, words)
+    if not terms or terms[0][0] != 0 or terms[0][2]:
+        return None
+    return max(code for _, code, negated in terms if not negated)
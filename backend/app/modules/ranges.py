@@ -0,0 +1,96 @@
+"""
+Rangos Normales
+===============
+
+Interpretación de los rangos normales de signos y laboratorios (ej. '70-100',
+'<10', '>=90'). La base de conocimiento los compila una sola vez al cargarse,
+de modo que el motor compara contra límites numéricos sin volver a parsear.
+"""
+
+import re
+from typing import Tuple, Optional
+
+
+def parse_numeric_range(range_str: str) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Parsea un string de rango a valores min/max.
+    
+    Ejemplos:
+        '36.5-37.5' -> (36.5, 37.5)
+        '<10' -> (None, 10)
+        '>90' -> (90, None)
+        '70-100' -> (70, 100)
+        
+    Args:
+        range_str: String representando el rango normal
+        
+    Returns:
+        Tupla (min_value, max_value) donde None indica sin límite
+    """
+    if not range_str or range_str == 'Variable':
+        return (None, None)
+    
+    # Pattern: número-número (ej. 70-100)
+    match = re.match(r'^(\d+\.?\d*)\s*-\s*(\d+\.?\d*)$', range_str.strip())
+    if match:
+        return (float(match.group(1)), float(match.group(2)))
+    
+    # Pattern: <número (ej. <10)
+    match = re.match(r'^<\s*(\d+\.?\d*)$', range_str.strip())
+    if match:
+        return (None, float(match.group(1)))
+    
+    # Pattern: >número (ej. >90)
+    match = re.match(r'^>\s*(\d+\.?\d*)$', range_str.strip())
+    if match:
+        return (float(match.group(1)), None)
+    
+    # Pattern: ≥número o >=número
+    match = re.match(r'^(≥|>=)\s*(\d+\.?\d*)$', range_str.strip())
+    if match:
+        return (float(match.group(2)), None)
+    
+    # Pattern: ≤número o <=número
+    match = re.match(r'^(≤|<=)\s*(\d+\.?\d*)$', range_str.strip())
+    if match:
+        return (None, float(match.group(2)))
+    
+    return (None, None)
+
+
+def is_value_abnormal(value: Optional[float], normal_range: str) -> bool:
+    """
+    Determina si un valor numérico está fuera del rango normal.
+    
+    Args:
+        value: Valor numérico a evaluar
+        normal_range: String con el rango normal (ej. '70-100', '<10', etc.)
+        
+    Returns:
+        True si el valor está fuera del rango normal (anormal), False si está dentro
+    """
+    if value is None:
+        return False
+    
+    min_val, max_val = parse_numeric_range(normal_range)
+    
+    # Si no pudimos parsear el rango, asumimos que es normal
+    if min_val is None and max_val is None:
+        return False
+    
+    # Verificar si está fuera del rango
+    if min_val is not None and value < min_val:
+        return True
+    if max_val is not None and value > max_val:
+        return True
+    
+    return False
+
+
+def is_outside_range(value: float, min_val: Optional[float], max_val: Optional[float]) -> bool:
+    """Versión de `is_value_abnormal` para límites ya compilados con `parse_numeric_range`."""
+    if min_val is not None and value < min_val:
+        return True
+    if max_val is not None and value > max_val:
+        return True
+    return False
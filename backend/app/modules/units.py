@@ -0,0 +1,126 @@
+"""
+Normalización de Unidades
+=========================
+
+Tabla de conversión de unidades por código de signo o prueba de laboratorio.
+Los valores numéricos se normalizan a la unidad canónica del catálogo una sola
+vez, al registrarse, y se guarda el valor canónico: el motor compara contra el
+rango normal sin convertir al puntuar.
+
+Cada código define sus unidades aceptadas como (factor, desplazamiento) hacia
+una unidad de referencia:
+
+    valor_referencia = valor * factor + desplazamiento
+
+La unidad canónica es la del catálogo (`measurement_unit` / `unit`) y no tiene
+que coincidir con la de referencia: `compile_conversions` compone ambas
+transformaciones al cargar la base de conocimiento, de modo que cambiar la
+unidad del catálogo a otra unidad de la tabla no requiere tocar la tabla.
+"""
+
+import re
+from typing import Dict, Optional, Tuple
+
+Conversion = Tuple[float, float]
+
+# Glucosa: 1 mmol/L = 18.016 mg/dL
+_GLUCOSE = {'mg/dL': (1.0, 0.0), 'mmol/L': (18.016, 0.0), 'g/L': (100.0, 0.0)}
+_PRESSURE = {'mmHg': (1.0, 0.0), 'kPa': (7.50062, 0.0), 'cmH2O': (0.735559, 0.0)}
+_LENGTH_CM = {'cm': (1.0, 0.0), 'mm': (0.1, 0.0), 'm': (100.0, 0.0), 'in': (2.54, 0.0)}
+_PER_MINUTE = {'lpm': (1.0, 0.0), 'rpm': (1.0, 0.0), 'bpm': (1.0, 0.0), '/min': (1.0, 0.0)}
+_NG_ML = {'ng/mL': (1.0, 0.0), 'µg/L': (1.0, 0.0), 'ng/L': (0.001, 0.0), 'pg/mL': (0.001, 0.0)}
+
+UNIT_TABLE: Dict[str, Dict[str, Conversion]] = {
+    # Signos vitales y somatometría
+    'SG001': {'°C': (1.0, 0.0), 'C': (1.0, 0.0), '°F': (5 / 9, -160 / 9), 'F': (5 / 9, -160 / 9),
+              'K': (1.0, -273.15)},
+    'SG002': _PRESSURE,
+    'SG003': _PRESSURE,
+    'SG004': _PER_MINUTE,
+    'SG005': _PER_MINUTE,
+    'SG006': {'%': (1.0, 0.0)},
+    'SG007': {'kg': (1.0, 0.0), 'g': (0.001, 0.0), 'lb': (0.45359237, 0.0)},
+    'SG009': _LENGTH_CM,
+    'SG010': _LENGTH_CM,
+    'SG011': _GLUCOSE,
+    'SG014': {'mm': (1.0, 0.0), 'cm': (10.0, 0.0)},
+    'SG019': {'segundos': (1.0, 0.0), 's': (1.0, 0.0), 'seg': (1.0, 0.0), 'ms': (0.001, 0.0)},
+    'SG034': {'cmH2O': (1.0, 0.0), 'mmHg': (1.35951, 0.0)},
+    'SG048': _LENGTH_CM,
+
+    # Laboratorios
+    'LAB002': _GLUCOSE,
+    # HbA1c: % NGSP = 0.09148 * mmol/mol IFCC + 2.152
+    'LAB003': {'%': (1.0, 0.0), 'mmol/mol': (0.09148, 2.152)},
+    # Creatinina: 1 mg/dL = 88.42 µmol/L
+    'LAB004': {'mg/dL': (1.0, 0.0), 'µmol/L': (1 / 88.42, 0.0), 'mmol/L': (1000 / 88.42, 0.0)},
+    # Urea: 1 mmol/L = 6.006 mg/dL
+    'LAB005': {'mg/dL': (1.0, 0.0), 'mmol/L': (6.006, 0.0), 'g/L': (100.0, 0.0)},
+    'LAB008': {'mg/L': (1.0, 0.0), 'mg/dL': (10.0, 0.0)},
+    'LAB009': {'mm/h': (1.0, 0.0)},
+    # Transaminasas: 1 µkat/L = 60 U/L
+    'LAB010': {'U/L': (1.0, 0.0), 'UI/L': (1.0, 0.0), 'µkat/L': (60.0, 0.0)},
+    'LAB011': _NG_ML,
+    # BNP: 1 pmol/L = 3.467 pg/mL
+    'LAB012': {'pg/mL': (1.0, 0.0), 'ng/L': (1.0, 0.0), 'pmol/L': (3.467, 0.0)},
+    'LAB013': {'ng/mL': (1.0, 0.0), 'µg/L': (1.0, 0.0), 'µg/mL': (1000.0, 0.0), 'mg/L': (1000.0, 0.0)},
+    'LAB016': _NG_ML,
+    # Lactato: 1 mmol/L = 9.008 mg/dL
+    'LAB017': {'mmol/L': (1.0, 0.0), 'mg/dL': (1 / 9.008, 0.0)},
+}
+
+# Decimales con los que se guarda un valor convertido (evita ruido de punto flotante)
+CANONICAL_DECIMALS = 6
+
+
+class UnitConversionError(ValueError):
+    """La unidad informada no puede convertirse a la unidad canónica."""
+
+
+def unit_key(unit: Optional[str]) -> str:
+    """
+    Forma normalizada de una unidad para compararla: sin espacios, en
+    minúsculas y con las variantes de micro y grado unificadas.
+
+    Ejemplos:
+        'mg/dL' -> 'mg/dl'
+        'μmol/L' -> 'umol/l'
+        'cm H2O' -> 'cmh2o'
+        'ºC' -> '°c'
+    """
+    if not unit:
+        return ''
+    key = re.sub(r'\s+', '', unit).casefold()
+    return key.replace('µ', 'u').replace('μ', 'u').replace('º', '°').rstrip('.')
+
+
+def compile_conversions(code: Optional[str], canonical_unit: Optional[str]) -> Optional[Dict[str, Conversion]]:
+    """
+    Compila la tabla de un código a {unit_key: (factor, desplazamiento)} hacia
+    la unidad canónica del catálogo.
+
+    Retorna None si el código no tiene tabla o si la unidad del catálogo no
+    figura en ella (no se sabe convertir).
+    """
+    table = UNIT_TABLE.get(code) if code else None
+    if not table:
+        return None
+
+    by_key = {unit_key(unit): conversion for unit, conversion in table.items()}
+    canonical = by_key.get(unit_key(canonical_unit))
+    if canonical is None:
+        return None
+
+    canonical_factor, canonical_offset = canonical
+    return {
+        key: (factor / canonical_factor, (offset - canonical_offset) / canonical_factor)
+        for key, (factor, offset) in by_key.items()
+    }
+
+
+def convert(value: float, conversion: Conversion) -> float:
+    """Aplica una conversión (factor, desplazamiento) compilada."""
+    factor, offset = conversion
+    if factor == 1.0 and offset == 0.0:
+        return value
+    return round(value * factor + offset, CANONICAL_DECIMALS)
@@ -8,6 +8,10 @@ from .symptoms import symptoms_bp
 from .signs import signs_bp
 from .lab_tests import lab_tests_bp
 from .postmortem_tests import postmortem_tests_bp
+from .jobs import jobs_bp
+from .exports import exports_bp
+from .autocomplete import autocomplete_bp
+from .catalog import catalog_bp
 
 
 def register_blueprints(app):
@@ -22,4 +26,8 @@ def register_blueprints(app):
     app.register_blueprint(signs_bp)
     app.register_blueprint(lab_tests_bp)
     app.register_blueprint(postmortem_tests_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(exports_bp)
+    app.register_blueprint(autocomplete_bp)
+    app.register_blueprint(catalog_bp)
 
@@ -0,0 +1,45 @@
+"""
+Rutas de autocompletado del catálogo (síntomas, signos, pruebas de laboratorio y enfermedades)
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.autocomplete import CATALOG_SOURCES, MAX_AUTOCOMPLETE_LIMIT, get_autocomplete
+
+autocomplete_bp = Blueprint('autocomplete', __name__, url_prefix='/api/autocomplete')
+
+
+@autocomplete_bp.route('', methods=['GET'])
+@jwt_required()
+def autocomplete():
+    """
+    Sugerencias del catálogo para el texto escrito, servidas desde memoria
+
+    Query params:
+    - q: texto escrito (requerido); coincide con el inicio del código, del
+      nombre o de una palabra del nombre, sin distinguir mayúsculas ni acentos
+    - types: tipos separados por coma (symptoms, signs, lab_tests, diseases;
+      default: todos)
+    - limit: máximo de sugerencias (default: 10, max: 50)
+    """
+    try:
+        query = request.args.get('q', '', type=str) or ''
+        if not query.strip():
+            return jsonify({'status': 'error', 'message': 'El parámetro q es requerido'}), 400
+
+        types_param = request.args.get('types')
+        types = [t.strip() for t in types_param.split(',') if t.strip()] if types_param else list(CATALOG_SOURCES)
+        invalid = [t for t in types if t not in CATALOG_SOURCES]
+        if invalid or not types:
+            return jsonify({
+                'status': 'error',
+                'message': f"Tipos no válidos: {', '.join(invalid)}. Opciones: {', '.join(CATALOG_SOURCES)}"
+            }), 400
+
+        limit = request.args.get('limit', 10, type=int)
+        if limit < 1 or limit > MAX_AUTOCOMPLETE_LIMIT:
+            limit = 10
+
+        return jsonify({'status': 'success', 'data': get_autocomplete().search(query, types, limit)}), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
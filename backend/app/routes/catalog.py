@@ -0,0 +1,71 @@
+"""
+Rutas de importación masiva del catálogo médico (síntomas, signos, pruebas, enfermedades y pesos)
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models.user import User
+from app.services.catalog_import import (
+    CatalogImportError, SECTIONS, import_catalog, merge_packs, pack_from_json, read_pack_file
+)
+
+catalog_bp = Blueprint('catalog', __name__, url_prefix='/api/catalog')
+
+
+@catalog_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_catalog_pack():
+    """
+    Importar un paquete del catálogo en una sola transacción (solo admin)
+
+    Cuerpo:
+    - application/json: objeto con una lista de filas por sección
+      (symptoms, signs, lab_tests, diseases, disease_symptoms, disease_signs,
+      disease_lab_tests)
+    - multipart/form-data: un CSV por sección (nombre del campo = sección)
+      y/o archivos .json con secciones
+
+    Query params opcionales:
+    - dry_run: 'true' para solo validar, sin escribir
+
+    Si el paquete no es válido responde 400 con la lista de errores y no
+    escribe nada.
+    """
+    try:
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user or user.role != 'admin':
+            return jsonify({'status': 'error', 'message': 'Solo administradores pueden importar el catálogo'}), 403
+
+        if request.files:
+            pack = merge_packs(
+                read_pack_file(upload.filename, upload.read(), field if field in SECTIONS else None)
+                for field, upload in request.files.items(multi=True)
+            )
+        else:
+            data = request.get_json(silent=True)
+            if data is None:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Envíe el paquete como JSON o como archivos CSV/JSON (multipart/form-data)'
+                }), 400
+            pack = pack_from_json(data)
+
+        dry_run = (request.args.get('dry_run') or '').lower() in ('1', 'true', 'si', 'sí', 'yes')
+        summary = import_catalog(pack, dry_run=dry_run)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Paquete válido (sin cambios)' if dry_run else 'Catálogo importado',
+            'data': summary
+        }), 200
+
+    except CatalogImportError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e),
+            'errors': e.errors,
+            'total_errors': e.total
+        }), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -8,17 +8,35 @@ from app.models.medical_knowledge import (
     Disease, Symptom, Sign, LabTest, 
     PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog
 )
-from app.modules.inference_engine import (
-    get_patient_evidence, 
-    InferenceEngine, 
-    get_treatment_recommendation
+from app.modules.units import UnitConversionError
+from app.services.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, parse_datetime_param, parse_page_size, split_page
 )
+from app.services.conditional import combine, conditional_response, row_versions, table_versions
+from app.services.serialization import (
+    serialize_diagnosis, serialize_disease_summary, serialize_doctor_summary, serialize_patient_summary,
+    serializer_for
+)
+from app.services.inference import (
+    build_evidence,
+    diagnose_patient,
+    encode_qualitative,
+    explain_disease,
+    get_treatment_recommendation,
+    get_patient_evidence,
+    normalize_measurement,
+    recommend_next_tests
+)
+from sqlalchemy import func, or_, and_
 from datetime import datetime
 import uuid
 import json
 
 diagnoses_bp = Blueprint('diagnoses', __name__, url_prefix='/api')
 
+# Máximo de diagnósticos por página del historial del paciente
+MAX_HISTORY_PAGE_SIZE = 100
+
 def is_doctor(current_user_id):
     """Helper para verificar si el usuario actual es doctor"""
     user = db.session.get(User, int(current_user_id))
@@ -36,10 +54,55 @@ def can_access_patient(current_user_id, patient_id):
     patient = db.session.get(Patient, patient_id)
     return patient and patient.doctor_id == int(current_user_id)
 
+def load_by_ids(model, key_column, keys):
+    """Carga en una sola consulta las filas cuyo `key_column` está en `keys` -> {clave: fila}"""
+    if not keys:
+        return {}
+    return {getattr(row, key_column.key): row for row in model.query.filter(key_column.in_(keys)).all()}
+
+def logs_by_diagnosis(log_model, diagnosis_ids):
+    """Carga en una sola consulta los logs de varios diagnósticos -> {diagnosis_id: [log serializado, ...]}"""
+    grouped = {}
+    if not diagnosis_ids:
+        return grouped
+    serialize_log = serializer_for(log_model)
+    logs = log_model.query.filter(log_model.diagnosis_id.in_(diagnosis_ids)).order_by(log_model.id).all()
+    for log in logs:
+        grouped.setdefault(log.diagnosis_id, []).append(serialize_log(log))
+    return grouped
+
+def log_counts_by_diagnosis(log_model, diagnosis_ids):
+    """Cuenta en una sola consulta los logs de varios diagnósticos -> {diagnosis_id: n}"""
+    if not diagnosis_ids:
+        return {}
+    rows = db.session.query(log_model.diagnosis_id, func.count(log_model.id)).filter(
+        log_model.diagnosis_id.in_(diagnosis_ids)
+    ).group_by(log_model.diagnosis_id).all()
+    return dict(rows)
+
+def logs_with_catalog(log_model, catalog_model, fk_column, diagnosis_id):
+    """
+    Logs de un diagnóstico con el nombre y código de su entrada de catálogo,
+    en una sola consulta -> [(log, nombre, código), ...]
+    """
+    return db.session.query(log_model, catalog_model.name, catalog_model.code).outerjoin(
+        catalog_model, catalog_model.id == fk_column
+    ).filter(log_model.diagnosis_id == diagnosis_id).order_by(log_model.id).all()
+
 @diagnoses_bp.route('/patients/<int:patient_id>/diagnoses', methods=['GET'])
 @jwt_required()
 def get_patient_diagnoses(patient_id):
-    """Obtener todos los diagnósticos de un paciente"""
+    """
+    Obtener el historial de diagnósticos de un paciente (más reciente primero)
+
+    Query params opcionales:
+    - limit (o page_size): diagnósticos por página (máximo 100); sin él se
+      retorna el historial completo
+    - cursor: `pagination.next_cursor` de la página anterior
+    - date_from / date_to: rango de diagnosis_date (ISO 8601; date_to inclusivo)
+    - logs: 'full' (default) incluye los logs; 'counts' solo su cantidad;
+      'none' los omite
+    """
     try:
         current_user_id = int(get_jwt_identity())
         
@@ -51,55 +114,87 @@ def get_patient_diagnoses(patient_id):
         if not patient or not patient.is_active:
             return jsonify({'status': 'error', 'message': 'Paciente no encontrado'}), 404
         
-        # Obtener diagnósticos con relaciones
-        diagnoses = Diagnosis.query.filter_by(patient_id=patient_id).order_by(Diagnosis.diagnosis_date.desc()).all()
+        logs_mode = request.args.get('logs', 'full', type=str)
+        if logs_mode not in ('full', 'counts', 'none'):
+            return jsonify({'status': 'error', 'message': "logs debe ser 'full', 'counts' o 'none'"}), 400
+        
+        limit = request.args.get('limit', type=int)
+        if limit is None:
+            limit = request.args.get('page_size', type=int)
+        limit = parse_page_size(limit, default=None, maximum=MAX_HISTORY_PAGE_SIZE)
+        
+        try:
+            date_from = parse_datetime_param(request.args.get('date_from'))
+            date_to = parse_datetime_param(request.args.get('date_to'), end_of_day=True)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Formato de fecha inválido, use ISO 8601'}), 400
+        
+        query = Diagnosis.query.filter(Diagnosis.patient_id == patient_id)
+        if date_from:
+            query = query.filter(Diagnosis.diagnosis_date >= date_from)
+        if date_to:
+            query = query.filter(Diagnosis.diagnosis_date <= date_to)
+        
+        # Keyset: continuar después del último (diagnosis_date, id) entregado
+        cursor = request.args.get('cursor')
+        if cursor:
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor, 2)
+                cursor_date = datetime.fromisoformat(cursor_date)
+                cursor_id = int(cursor_id)
+            except (InvalidCursor, ValueError, TypeError):
+                return jsonify({'status': 'error', 'message': 'Cursor inválido'}), 400
+            query = query.filter(or_(
+                Diagnosis.diagnosis_date < cursor_date,
+                and_(Diagnosis.diagnosis_date == cursor_date, Diagnosis.id < cursor_id)
+            ))
+        
+        query = query.order_by(Diagnosis.diagnosis_date.desc(), Diagnosis.id.desc())
+        if limit is not None:
+            query = query.limit(limit + 1)
+        diagnoses, has_more = split_page(query.all(), limit)
+        
+        # Cargar relaciones en lote (una consulta por tabla, no por diagnóstico)
+        diagnosis_ids = [d.id for d in diagnoses]
+        doctors = load_by_ids(User, User.id, {d.doctor_id for d in diagnoses})
+        diseases = load_by_ids(Disease, Disease.code, {d.disease_code for d in diagnoses})
+        if logs_mode == 'full':
+            symptoms_logs = logs_by_diagnosis(PatientSymptomsLog, diagnosis_ids)
+            signs_logs = logs_by_diagnosis(PatientSignsLog, diagnosis_ids)
+            lab_results_logs = logs_by_diagnosis(PatientLabResultsLog, diagnosis_ids)
+        elif logs_mode == 'counts':
+            symptoms_counts = log_counts_by_diagnosis(PatientSymptomsLog, diagnosis_ids)
+            signs_counts = log_counts_by_diagnosis(PatientSignsLog, diagnosis_ids)
+            lab_results_counts = log_counts_by_diagnosis(PatientLabResultsLog, diagnosis_ids)
         
         diagnoses_data = []
         for d in diagnoses:
-            # Obtener información del doctor
-            doctor = db.session.get(User, d.doctor_id)
-            doctor_data = {
-                'id': doctor.id,
-                'username': doctor.username,
-                'first_name': doctor.first_name,
-                'paternal_surname': doctor.paternal_surname
-            } if doctor else None
-            
-            # Obtener información de la enfermedad
-            disease = db.session.get(Disease, d.disease_code)
-            disease_data = {
-                'code': disease.code,
-                'name': disease.name,
-                'description': disease.description
-            } if disease else None
-            
-            diagnoses_data.append({
-                'id': d.id,
-                'patient_id': d.patient_id,
-                'doctor_id': d.doctor_id,
-                'disease_code': d.disease_code,
-                'diagnosis_date': d.diagnosis_date.isoformat() if d.diagnosis_date else None,
-                'visit_id': d.visit_id,
-                # Obtener logs de síntomas, signos y resultados de laboratorio
-                'symptoms_logs': [s.to_dict() for s in d.symptoms_logs.all()],
-                'signs_logs': [s.to_dict() for s in d.signs_logs.all()],
-                'lab_results_logs': [l.to_dict() for l in d.lab_results_logs.all()],
-                'confidence_score': d.confidence_score,
-                'inference_details': d.inference_details,
-                'alternative_diseases': d.alternative_diseases,
-                'treatment': d.treatment,
-                'treatment_start_date': d.treatment_start_date.isoformat() if d.treatment_start_date else None,
-                'treatment_end_date': d.treatment_end_date.isoformat() if d.treatment_end_date else None,
-                'notes': d.notes,
-                'status': d.status,
-                'follow_up_date': d.follow_up_date.isoformat() if d.follow_up_date else None,
-                'created_at': d.created_at.isoformat() if d.created_at else None,
-                'updated_at': d.updated_at.isoformat() if d.updated_at else None,
-                'doctor': doctor_data,
-                'disease': disease_data
-            })
-        
-        return jsonify({'status': 'success', 'data': diagnoses_data}), 200
+            doctor = doctors.get(d.doctor_id)
+            disease = diseases.get(d.disease_code)
+            item = serialize_diagnosis(d)
+            item['doctor'] = serialize_doctor_summary(doctor) if doctor else None
+            item['disease'] = serialize_disease_summary(disease) if disease else None
+            # Logs de síntomas, signos y resultados de laboratorio
+            if logs_mode == 'full':
+                item['symptoms_logs'] = symptoms_logs.get(d.id, [])
+                item['signs_logs'] = signs_logs.get(d.id, [])
+                item['lab_results_logs'] = lab_results_logs.get(d.id, [])
+            elif logs_mode == 'counts':
+                item['symptoms_logs_count'] = symptoms_counts.get(d.id, 0)
+                item['signs_logs_count'] = signs_counts.get(d.id, 0)
+                item['lab_results_logs_count'] = lab_results_counts.get(d.id, 0)
+            diagnoses_data.append(item)
+        
+        last = diagnoses[-1] if diagnoses else None
+        return jsonify({
+            'status': 'success',
+            'data': diagnoses_data,
+            'pagination': {
+                'limit': limit,
+                'has_more': has_more,
+                'next_cursor': encode_cursor(last.diagnosis_date, last.id) if has_more else None
+            }
+        }), 200
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -124,96 +219,170 @@ def get_diagnosis(diagnosis_id):
         disease = db.session.get(Disease, diagnosis.disease_code)
         patient = db.session.get(Patient, diagnosis.patient_id)
         
-        # Obtener logs atómicos
-        symptoms_logs = PatientSymptomsLog.query.filter_by(diagnosis_id=diagnosis_id).all()
-        signs_logs = PatientSignsLog.query.filter_by(diagnosis_id=diagnosis_id).all()
-        lab_results_logs = PatientLabResultsLog.query.filter_by(diagnosis_id=diagnosis_id).all()
-        
-        # Construir datos de síntomas con sus detalles
-        symptoms_data = []
-        for log in symptoms_logs:
-            symptom = db.session.get(Symptom, log.symptom_id)
-            symptoms_data.append({
-                'log_id': log.id,
-                'symptom_id': log.symptom_id,
-                'symptom_name': symptom.name if symptom else None,
-                'symptom_code': symptom.code if symptom else None,
-                'recorded_at': log.recorded_at.isoformat() if log.recorded_at else None,
-                'note': log.note
-            })
+        # Validador: filas cargadas, logs del diagnóstico y catálogos de los nombres
+        validator = combine(
+            row_versions(diagnosis, doctor, disease, patient),
+            table_versions(
+                (PatientSymptomsLog, PatientSymptomsLog.diagnosis_id == diagnosis_id),
+                (PatientSignsLog, PatientSignsLog.diagnosis_id == diagnosis_id),
+                (PatientLabResultsLog, PatientLabResultsLog.diagnosis_id == diagnosis_id),
+                Symptom, Sign, LabTest
+            )
+        )
         
-        # Construir datos de signos con sus valores
-        signs_data = []
-        for log in signs_logs:
-            sign = db.session.get(Sign, log.sign_id)
-            signs_data.append({
-                'log_id': log.id,
-                'sign_id': log.sign_id,
-                'sign_name': sign.name if sign else None,
-                'sign_code': sign.code if sign else None,
-                'value_numeric': log.value_numeric,
-                'value_text': log.value_text,
-                'unit': log.unit,
-                'recorded_at': log.recorded_at.isoformat() if log.recorded_at else None,
-                'note': log.note
-            })
+        def build_response():
+            # Obtener logs atómicos junto con su entrada de catálogo (una consulta por tabla)
+            symptoms_logs = logs_with_catalog(PatientSymptomsLog, Symptom, PatientSymptomsLog.symptom_id, diagnosis_id)
+            signs_logs = logs_with_catalog(PatientSignsLog, Sign, PatientSignsLog.sign_id, diagnosis_id)
+            lab_results_logs = logs_with_catalog(PatientLabResultsLog, LabTest, PatientLabResultsLog.lab_test_id, diagnosis_id)
+        
+            # Construir datos de síntomas con sus detalles
+            symptoms_data = []
+            for log, symptom_name, symptom_code in symptoms_logs:
+                symptoms_data.append({
+                    'log_id': log.id,
+                    'symptom_id': log.symptom_id,
+                    'symptom_name': symptom_name,
+                    'symptom_code': symptom_code,
+                    'recorded_at': log.recorded_at,
+                    'note': log.note
+                })
         
-        # Construir datos de pruebas de laboratorio con sus resultados
-        lab_results_data = []
-        for log in lab_results_logs:
-            lab_test = db.session.get(LabTest, log.lab_test_id)
-            lab_results_data.append({
-                'log_id': log.id,
-                'lab_test_id': log.lab_test_id,
-                'lab_test_name': lab_test.name if lab_test else None,
-                'lab_test_code': lab_test.code if lab_test else None,
-                'value_numeric': log.value_numeric,
-                'value_text': log.value_text,
-                'unit': log.unit,
-                'recorded_at': log.recorded_at.isoformat() if log.recorded_at else None,
-                'note': log.note
+            # Construir datos de signos con sus valores
+            signs_data = []
+            for log, sign_name, sign_code in signs_logs:
+                signs_data.append({
+                    'log_id': log.id,
+                    'sign_id': log.sign_id,
+                    'sign_name': sign_name,
+                    'sign_code': sign_code,
+                    'value_numeric': log.value_numeric,
+                    'value_text': log.value_text,
+                    'unit': log.unit,
+                    'recorded_at': log.recorded_at,
+                    'note': log.note
+                })
+        
+            # Construir datos de pruebas de laboratorio con sus resultados
+            lab_results_data = []
+            for log, lab_test_name, lab_test_code in lab_results_logs:
+                lab_results_data.append({
+                    'log_id': log.id,
+                    'lab_test_id': log.lab_test_id,
+                    'lab_test_name': lab_test_name,
+                    'lab_test_code': lab_test_code,
+                    'value_numeric': log.value_numeric,
+                    'value_text': log.value_text,
+                    'unit': log.unit,
+                    'recorded_at': log.recorded_at,
+                    'note': log.note
+                })
+        
+            diagnosis_data = serialize_diagnosis(diagnosis)
+            diagnosis_data.update({
+                'symptoms': symptoms_data,
+                'signs': signs_data,
+                'lab_results': lab_results_data,
+                'doctor': serialize_doctor_summary(doctor) if doctor else None,
+                'disease': serialize_disease_summary(disease) if disease else None,
+                'patient': serialize_patient_summary(patient) if patient else None
             })
         
-        diagnosis_data = {
-            'id': diagnosis.id,
-            'patient_id': diagnosis.patient_id,
-            'doctor_id': diagnosis.doctor_id,
-            'disease_code': diagnosis.disease_code,
-            'diagnosis_date': diagnosis.diagnosis_date.isoformat() if diagnosis.diagnosis_date else None,
-            'visit_id': diagnosis.visit_id,
-            'symptoms': symptoms_data,
-            'signs': signs_data,
-            'lab_results': lab_results_data,
-            'confidence_score': diagnosis.confidence_score,
-            'inference_details': diagnosis.inference_details,
-            'alternative_diseases': diagnosis.alternative_diseases,
-            'treatment': diagnosis.treatment,
-            'treatment_start_date': diagnosis.treatment_start_date.isoformat() if diagnosis.treatment_start_date else None,
-            'treatment_end_date': diagnosis.treatment_end_date.isoformat() if diagnosis.treatment_end_date else None,
-            'notes': diagnosis.notes,
-            'status': diagnosis.status,
-            'follow_up_date': diagnosis.follow_up_date.isoformat() if diagnosis.follow_up_date else None,
-            'created_at': diagnosis.created_at.isoformat() if diagnosis.created_at else None,
-            'updated_at': diagnosis.updated_at.isoformat() if diagnosis.updated_at else None,
-            'doctor': {
-                'id': doctor.id,
-                'username': doctor.username,
-                'first_name': doctor.first_name,
-                'paternal_surname': doctor.paternal_surname
-            } if doctor else None,
-            'disease': {
-                'id': disease.id,
-                'name': disease.name,
-                'description': disease.description
-            } if disease else None,
-            'patient': {
-                'id': patient.id,
-                'first_name': patient.first_name,
-                'paternal_surname': patient.paternal_surname
-            } if patient else None
-        }
-        
-        return jsonify({'status': 'success', 'data': diagnosis_data}), 200
+            return jsonify({'status': 'success', 'data': diagnosis_data}), 200
+        
+        return conditional_response(validator, build_response)
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@diagnoses_bp.route('/diagnoses/<int:diagnosis_id>/explain', methods=['GET'])
+@jwt_required()
+def explain_diagnosis(diagnosis_id):
+    """Explicar el score de una enfermedad frente a la evidencia registrada en la visita del diagnóstico
+    
+    Query params opcionales:
+    - disease_code: enfermedad a explicar (default: la enfermedad del diagnóstico)
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        diagnosis = db.session.get(Diagnosis, diagnosis_id)
+        if not diagnosis:
+            return jsonify({'status': 'error', 'message': 'Diagnóstico no encontrado'}), 404
+        
+        # Verificar acceso
+        if not can_access_patient(current_user_id, diagnosis.patient_id):
+            return jsonify({'status': 'error', 'message': 'No autorizado'}), 403
+        
+        if not diagnosis.visit_id:
+            return jsonify({'status': 'error', 'message': 'El diagnóstico no tiene una visita asociada'}), 400
+        
+        disease_code = request.args.get('disease_code', '', type=str) or diagnosis.disease_code
+        
+        explanation = explain_disease(diagnosis.patient_id, diagnosis.visit_id, disease_code)
+        if explanation is None:
+            return jsonify({'status': 'error', 'message': 'Enfermedad no encontrada'}), 404
+        
+        return jsonify({'status': 'success', 'data': explanation}), 200
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@diagnoses_bp.route('/diagnoses/next-best-test', methods=['POST'])
+@jwt_required()
+def next_best_test():
+    """
+    Recomendar el signo o prueba de laboratorio que mejor separa a los diagnósticos candidatos
+    
+    Request body esperado:
+    {
+        "patient_id": int,
+        "visit_id": str (opcional, evidencia registrada de esa visita),
+        "symptoms": [...], "signs": [...], "lab_results": [...] (opcionales, mismo formato que POST /api/diagnoses;
+            si se envía alguno, se usa esa evidencia sin registrarla en lugar de la registrada),
+        "top_k": int (opcional, candidatos a separar, default 5),
+        "limit": int (opcional, pruebas retornadas, default 10)
+    }
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        if not is_doctor(current_user_id):
+            return jsonify({'status': 'error', 'message': 'Solo doctores pueden solicitar recomendaciones'}), 403
+        
+        data = request.get_json() or {}
+        
+        if 'patient_id' not in data:
+            return jsonify({'status': 'error', 'message': 'Campo requerido: patient_id'}), 400
+        
+        if not can_access_patient(current_user_id, data['patient_id']):
+            return jsonify({'status': 'error', 'message': 'No autorizado para este paciente'}), 403
+        
+        try:
+            top_k = int(data.get('top_k', 5))
+            limit = int(data.get('limit', 10))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'top_k y limit deben ser enteros'}), 400
+        if not 2 <= top_k <= 20 or not 1 <= limit <= 50:
+            return jsonify({'status': 'error', 'message': 'top_k debe estar entre 2 y 20 y limit entre 1 y 50'}), 400
+        
+        if any(key in data for key in ('symptoms', 'signs', 'lab_results')):
+            try:
+                evidence = build_evidence(
+                    data['patient_id'],
+                    data.get('symptoms', []),
+                    data.get('signs', []),
+                    data.get('lab_results', [])
+                )
+            except UnitConversionError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+        else:
+            evidence = get_patient_evidence(data['patient_id'], data.get('visit_id'))
+        
+        if evidence.is_empty():
+            return jsonify({'status': 'error', 'message': 'No hay evidencia para evaluar'}), 400
+        
+        return jsonify({'status': 'success', 'data': recommend_next_tests(evidence, top_k=top_k, limit=limit)}), 200
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -240,6 +409,10 @@ def create_diagnosis():
         "lab_results": [{"lab_test_id": int, "value_numeric": float (opcional), "value_text": str (opcional), "unit": str (opcional), "note": str (opcional)}] (opcional),
         "notes": str (opcional)
     }
+    
+    Los valores numéricos se guardan convertidos a la unidad del catálogo; una
+    unidad no convertible responde 400. Los resultados cualitativos se guardan
+    junto a su grado codificado (value_code).
     """
     try:
         current_user_id = int(get_jwt_identity())
@@ -263,6 +436,21 @@ def create_diagnosis():
         visit_id = str(uuid.uuid4())
         recorded_at = datetime.utcnow()
         
+        # Normalizar valores a la unidad canónica de cada signo / prueba antes de guardarlos
+        signs_data = data.get('signs', [])
+        lab_results_data = data.get('lab_results', [])
+        try:
+            sign_values = [
+                normalize_measurement('signs', sign['sign_id'], sign.get('value_numeric'), sign.get('unit'))
+                for sign in signs_data
+            ]
+            lab_values = [
+                normalize_measurement('labs', lab_result['lab_test_id'], lab_result.get('value_numeric'), lab_result.get('unit'))
+                for lab_result in lab_results_data
+            ]
+        except UnitConversionError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
         # PASO 1: Guardar logs atómicos primero (necesarios para la inferencia)
         # Crear logs atómicos de síntomas
         symptoms_data = data.get('symptoms', [])
@@ -278,14 +466,14 @@ def create_diagnosis():
             db.session.add(symptom_log)
         
         # Crear logs atómicos de signos
-        signs_data = data.get('signs', [])
-        for sign in signs_data:
+        for sign, (value_numeric, unit) in zip(signs_data, sign_values):
             sign_log = PatientSignsLog(
                 patient_id=data['patient_id'],
                 sign_id=sign['sign_id'],
-                value_numeric=sign.get('value_numeric'),
+                value_numeric=value_numeric,
                 value_text=sign.get('value_text'),
-                unit=sign.get('unit'),
+                value_code=encode_qualitative('signs', sign['sign_id'], sign.get('value_text')),
+                unit=unit,
                 recorded_at=recorded_at,
                 visit_id=visit_id,
                 diagnosis_id=None,  # Se actualizará después
@@ -294,14 +482,14 @@ def create_diagnosis():
             db.session.add(sign_log)
         
         # Crear logs atómicos de pruebas de laboratorio
-        lab_results_data = data.get('lab_results', [])
-        for lab_result in lab_results_data:
+        for lab_result, (value_numeric, unit) in zip(lab_results_data, lab_values):
             lab_log = PatientLabResultsLog(
                 patient_id=data['patient_id'],
                 lab_test_id=lab_result['lab_test_id'],
-                value_numeric=lab_result.get('value_numeric'),
+                value_numeric=value_numeric,
                 value_text=lab_result.get('value_text'),
-                unit=lab_result.get('unit'),
+                value_code=encode_qualitative('labs', lab_result['lab_test_id'], lab_result.get('value_text')),
+                unit=unit,
                 recorded_at=recorded_at,
                 visit_id=visit_id,
                 diagnosis_id=None,  # Se actualizará después
@@ -313,12 +501,8 @@ def create_diagnosis():
         
         # PASO 2: Ejecutar motor de inferencia
         try:
-            # Recuperar evidencia del paciente (incluye los logs recién creados)
-            patient_evidence = get_patient_evidence(data['patient_id'], visit_id)
-            
-            # Ejecutar motor de inferencia
-            engine = InferenceEngine()
-            inference_result = engine.diagnose(patient_evidence)
+            # Recuperar evidencia (incluye los logs recién creados) y ejecutar el motor
+            inference_result = diagnose_patient(data['patient_id'], visit_id)
             
             # Extraer resultado principal
             if inference_result['primary_diagnosis']:
@@ -2,11 +2,28 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 from app.extensions import db
-from app.models.medical_knowledge import Disease, Symptom, Sign
+from app.models.medical_knowledge import (
+    Disease, Symptom, Sign, LabTest, PostmortemTest,
+    disease_symptoms, disease_signs, disease_lab_tests, disease_postmortem_tests
+)
 from app.models.user import User
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.conditional import conditional_on_tables
+from app.services.search import apply_text_search, read_prefix_flag
+from app.services.response_cache import cached_response
+from app.services.serialization import serializer_for
 
 diseases_bp = Blueprint('diseases', __name__, url_prefix='/api')
 
+# Relaciones que pueden incluirse con ?include=
+DISEASE_RELATIONS = ('symptoms', 'signs', 'lab_tests', 'postmortem_tests')
+
+# Tablas de las que dependen las respuestas de enfermedades (ETag / Last-Modified)
+DISEASE_TABLES = (
+    Disease, Symptom, Sign, LabTest, PostmortemTest,
+    disease_symptoms, disease_signs, disease_lab_tests, disease_postmortem_tests
+)
+
 def is_admin(current_user_id):
     """Helper para verificar si el usuario actual es admin"""
     user = db.session.get(User, int(current_user_id))
@@ -38,85 +55,147 @@ def get_next_code_for_category(category: str) -> str:
     # Formatear con ceros a la izquierda (2 dígitos)
     return f"{prefix}{next_number:02d}"
 
+def parse_include():
+    """
+    Lee ?include=symptoms,signs,... -> tupla de relaciones a incluir.
+    Sin el parámetro se incluyen todas; `include=` vacío no incluye ninguna.
+
+    Raises:
+        ValueError: Si alguna relación no existe
+    """
+    raw = request.args.get('include')
+    if raw is None:
+        return DISEASE_RELATIONS
+    include = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    invalid = [name for name in include if name not in DISEASE_RELATIONS]
+    if invalid:
+        raise ValueError(f"include no válido: {', '.join(invalid)}. Opciones: {', '.join(DISEASE_RELATIONS)}")
+    return include
+
+def load_disease_relations(codes, include):
+    """
+    Carga las relaciones pedidas de varias enfermedades con una consulta por
+    relación (no por enfermedad), incluyendo el peso de la asociación
+    -> {relación: {disease_code: [dict, ...]}}
+    """
+    related = {name: {} for name in include}
+    if not codes:
+        return related
+    for name in include:
+        relationship = Disease.__mapper__.relationships[name]
+        association = relationship.secondary
+        target = relationship.mapper.class_
+        rows = db.session.query(association.c.disease_code, association.c.weight, target).join(
+            association, relationship.secondaryjoin
+        ).filter(association.c.disease_code.in_(codes)).order_by(
+            association.c.disease_code, *relationship.mapper.primary_key
+        ).all()
+        serialize_item = serializer_for(target)
+        for disease_code, weight, item in rows:
+            item_data = serialize_item(item)
+            item_data['weight'] = weight
+            related[name].setdefault(disease_code, []).append(item_data)
+    return related
+
+def diseases_to_dict(diseases, include):
+    """Serializa enfermedades con las relaciones pedidas cargadas en lote"""
+    related = load_disease_relations([d.code for d in diseases], include)
+    serialize_disease = serializer_for(Disease)
+    diseases_data = []
+    for disease in diseases:
+        disease_dict = serialize_disease(disease)
+        for name in include:
+            disease_dict[name] = related[name].get(disease.code, [])
+        diseases_data.append(disease_dict)
+    return diseases_data
+
 @diseases_bp.route('/diseases', methods=['GET'])
 @jwt_required()
+@cached_response('symptoms', 'signs', 'lab_tests', 'postmortem_tests')
+@conditional_on_tables(*DISEASE_TABLES)
 def get_diseases():
     """Obtener todas las enfermedades activas con paginación y filtrado
     
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 1000)
-    - nombre: filtrar por nombre (búsqueda parcial case-insensitive)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
+    - nombre: filtrar por nombre (búsqueda parcial, sin distinguir mayúsculas ni acentos)
+    - q: búsqueda de texto en nombre y descripción (parcial, case-insensitive)
+    - prefijo: 'true' para que nombre coincida desde el inicio
     - categoria: filtrar por categoría (búsqueda parcial case-insensitive)
     - severidad: filtrar por severidad exacta
+    - include: relaciones a incluir, separadas por coma (symptoms, signs,
+      lab_tests, postmortem_tests; default: todas; vacío: ninguna)
     """
     try:
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
+        try:
+            include = parse_include()
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         
         # Construir query base
         query = Disease.query.filter_by(is_active=True)
         
         # Filtros opcionales
         nombre = request.args.get('nombre', '', type=str) or ''
+        q = request.args.get('q', '', type=str) or ''
         categoria = request.args.get('categoria', '', type=str) or ''
         severidad = request.args.get('severidad', '', type=str) or ''
         
-        if nombre:
-            query = query.filter(Disease.name.ilike(f'%{nombre}%'))
-        
         if categoria:
             query = query.filter(Disease.category.ilike(f'%{categoria}%'))
         
         if severidad:
             query = query.filter(Disease.severity == severidad)
         
-        # Ordenar por código
-        query = query.order_by(Disease.code)
-        
-        # Obtener total count antes de paginar
-        total_count = query.count()
+        # Búsqueda de texto (nombre; q: nombre y descripción) desde el índice de búsqueda
+        query, rank = apply_text_search(
+            query, Disease, {('name',): nombre, ('name', 'description'): q}, prefix=read_prefix_flag()
+        )
         
-        # Aplicar paginación
-        diseases = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Aplicar paginación (ordenada por relevancia si hay búsqueda, luego por code)
+        diseases, pagination = paginate(query, [Disease.code], page_request, rank=rank)
         
-        diseases_data = []
-        for disease in diseases:
-            disease_dict = disease.to_dict(include_relations=True)
-            diseases_data.append(disease_dict)
+        diseases_data = diseases_to_dict(diseases, include)
         
         return jsonify({
             'status': 'success',
             'data': diseases_data,
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 @diseases_bp.route('/diseases/<string:code>', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(*DISEASE_TABLES)
 def get_disease(code):
-    """Obtener una enfermedad específica por código"""
+    """Obtener una enfermedad específica por código
+    
+    Query params opcionales:
+    - include: relaciones a incluir (ver GET /diseases)
+    """
     try:
+        try:
+            include = parse_include()
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        
         disease = db.session.get(Disease, code)
         
         if not disease or not disease.is_active:
             return jsonify({'status': 'error', 'message': 'Enfermedad no encontrada'}), 404
         
-        disease_data = disease.to_dict(include_relations=True)
+        disease_data = diseases_to_dict([disease], include)[0]
         
         return jsonify({'status': 'success', 'data': disease_data}), 200
         
@@ -280,6 +359,7 @@ def delete_disease(code):
 
 @diseases_bp.route('/diseases/categories', methods=['GET'])
 @jwt_required()
+@cached_response()
 def get_disease_categories():
     """Obtener todas las categorías de enfermedades disponibles"""
     try:
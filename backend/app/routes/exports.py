@@ -0,0 +1,71 @@
+"""
+Rutas de exportación en streaming (NDJSON / CSV) de pacientes, diagnósticos y logs
+"""
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models.user import User
+from app.services.exports import EXPORTS, EXPORT_FORMATS, EXPORT_WRITERS, build_export_query
+from app.services.pagination import parse_datetime_param
+
+exports_bp = Blueprint('exports', __name__, url_prefix='/api/exports')
+
+
+@exports_bp.route('/<resource>', methods=['GET'])
+@jwt_required()
+def export_resource(resource):
+    """
+    Exportar un recurso completo como respuesta en streaming
+
+    Recursos: patients, diagnoses, symptoms-logs, signs-logs, lab-results-logs
+    (solo de pacientes activos)
+
+    Query params opcionales:
+    - format: 'ndjson' (default) o 'csv'
+    - patient_id: limitar a un paciente
+    - date_from / date_to: rango de fecha (ISO 8601; date_to inclusivo). Se
+      aplica a created_at (pacientes), diagnosis_date (diagnósticos) o
+      recorded_at (logs)
+    """
+    try:
+        user = db.session.get(User, int(get_jwt_identity()))
+        if not user or user.role not in ['admin', 'doctor']:
+            return jsonify({'status': 'error', 'message': 'No autorizado'}), 403
+
+        if resource not in EXPORTS:
+            return jsonify({
+                'status': 'error',
+                'message': f"Recurso no válido. Opciones: {', '.join(EXPORTS)}"
+            }), 404
+
+        export_format = request.args.get('format', 'ndjson', type=str)
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'status': 'error', 'message': "format debe ser 'ndjson' o 'csv'"}), 400
+
+        try:
+            date_from = parse_datetime_param(request.args.get('date_from'))
+            date_to = parse_datetime_param(request.args.get('date_to'), end_of_day=True)
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Formato de fecha inválido, use ISO 8601'}), 400
+
+        query = build_export_query(
+            resource,
+            doctor_id=None if user.role == 'admin' else user.id,
+            patient_id=request.args.get('patient_id', type=int),
+            date_from=date_from,
+            date_to=date_to
+        )
+
+        filename = f"{resource}-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+        return Response(
+            stream_with_context(EXPORT_WRITERS[export_format](query)),
+            content_type=EXPORT_FORMATS[export_format],
+            headers={
+                'Content-Disposition': f'attachment; filename="{filename}"',
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
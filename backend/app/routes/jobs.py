@@ -0,0 +1,196 @@
+"""
+Rutas para trabajos en segundo plano (scoring por lotes, evaluación retrospectiva)
+"""
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.extensions import db
+from app.models.job import Job
+from app.models.user import User
+from app.services.jobs import JOB_HANDLERS, JobParamsError, JobQueueFull, get_job_runner
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+
+def get_current_user():
+    return db.session.get(User, int(get_jwt_identity()))
+
+
+def get_accessible_job(job_id, user):
+    """Retorna el trabajo si existe y el usuario es su creador o administrador"""
+    job = db.session.get(Job, job_id)
+    if not job:
+        return None, (jsonify({'status': 'error', 'message': 'Trabajo no encontrado'}), 404)
+    if user.role != 'admin' and job.created_by != user.id:
+        return None, (jsonify({'status': 'error', 'message': 'No autorizado'}), 403)
+    return job, None
+
+
+@jobs_bp.route('', methods=['POST'])
+@jwt_required()
+def submit_job():
+    """
+    Encolar un trabajo en segundo plano
+
+    Request body esperado:
+    {
+        "job_type": "batch_diagnose" | "retrospective_evaluation",
+        "params": {...} (opcional)
+    }
+    """
+    try:
+        user = get_current_user()
+        if not user or user.role not in ['admin', 'doctor']:
+            return jsonify({'status': 'error', 'message': 'Solo doctores pueden crear trabajos'}), 403
+
+        data = request.get_json() or {}
+        job_type = data.get('job_type')
+        if job_type not in JOB_HANDLERS:
+            return jsonify({
+                'status': 'error',
+                'message': f"job_type debe ser uno de: {', '.join(sorted(JOB_HANDLERS))}"
+            }), 400
+
+        params = data.get('params') or {}
+        if not isinstance(params, dict):
+            return jsonify({'status': 'error', 'message': 'params debe ser un objeto'}), 400
+
+        try:
+            job = get_job_runner().submit(job_type, params, user.id, is_admin=user.role == 'admin')
+        except JobParamsError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        except JobQueueFull as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 429
+
+        return jsonify({
+            'status': 'success',
+            'message': 'Trabajo encolado',
+            'data': job.to_dict()
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """
+    Listar trabajos del usuario (todos si es administrador)
+
+    Query params opcionales:
+    - status: filtrar por estado
+    - job_type: filtrar por tipo
+    - limit: máximo de resultados (default 50, máximo 200)
+    """
+    try:
+        user = get_current_user()
+        if not user:
+            return jsonify({'status': 'error', 'message': 'Usuario no encontrado'}), 404
+
+        query = Job.query
+        if user.role != 'admin':
+            query = query.filter_by(created_by=user.id)
+
+        status = request.args.get('status', '', type=str)
+        if status:
+            query = query.filter_by(status=status)
+        job_type = request.args.get('job_type', '', type=str)
+        if job_type:
+            query = query.filter_by(job_type=job_type)
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+
+        jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+        return jsonify({'status': 'success', 'data': [job.to_dict() for job in jobs]}), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Obtener el estado de un trabajo (sin el resultado)"""
+    try:
+        job, error = get_accessible_job(job_id, get_current_user())
+        if error:
+            return error
+        return jsonify({'status': 'success', 'data': job.to_dict()}), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>/progress', methods=['GET'])
+@jwt_required()
+def get_job_progress(job_id):
+    """Consultar solo el progreso de un trabajo (para sondeo frecuente)"""
+    try:
+        job, error = get_accessible_job(job_id, get_current_user())
+        if error:
+            return error
+        return jsonify({
+            'status': 'success',
+            'data': {
+                'id': job.id,
+                'status': job.status,
+                'progress': job.progress,
+                'progress_message': job.progress_message,
+                'cancel_requested': job.cancel_requested
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>/result', methods=['GET'])
+@jwt_required()
+def get_job_result(job_id):
+    """Obtener el resultado de un trabajo terminado"""
+    try:
+        job, error = get_accessible_job(job_id, get_current_user())
+        if error:
+            return error
+
+        if job.status == Job.FAILED:
+            return jsonify({'status': 'error', 'message': job.error or 'El trabajo falló', 'data': job.to_dict()}), 500
+        if job.status != Job.SUCCEEDED:
+            return jsonify({
+                'status': 'error',
+                'message': f'El trabajo no ha terminado (estado: {job.status})',
+                'data': job.to_dict()
+            }), 409
+
+        return jsonify({'status': 'success', 'data': job.to_dict(include_result=True)}), 200
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+@jwt_required()
+def cancel_job(job_id):
+    """Cancelar un trabajo pendiente o en ejecución"""
+    try:
+        job, error = get_accessible_job(job_id, get_current_user())
+        if error:
+            return error
+
+        if job.is_finished:
+            return jsonify({
+                'status': 'error',
+                'message': f'El trabajo ya terminó (estado: {job.status})',
+                'data': job.to_dict()
+            }), 409
+
+        job = get_job_runner().cancel(job)
+        return jsonify({
+            'status': 'success',
+            'message': 'Trabajo cancelado' if job.status == Job.CANCELLED else 'Cancelación solicitada',
+            'data': job.to_dict()
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
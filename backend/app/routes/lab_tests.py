@@ -6,30 +6,34 @@ from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app.extensions import db
 from app.models import LabTest
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.conditional import conditional_on_tables
+from app.services.search import apply_text_search, read_prefix_flag
+from app.services.response_cache import cached_response
+from app.services.serialization import serialize_lab_test
 
 lab_tests_bp = Blueprint('lab_tests', __name__, url_prefix='/api')
 
 @lab_tests_bp.route('/lab-tests', methods=['GET'])
 @jwt_required()
+@cached_response()
+@conditional_on_tables(LabTest)
 def get_lab_tests():
     """Obtener todas las pruebas de laboratorio activas (no eliminadas) con paginación y filtrado
     
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 1000)
-    - nombre: filtrar por nombre (búsqueda parcial case-insensitive)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
+    - nombre: filtrar por nombre (búsqueda parcial, sin distinguir mayúsculas ni acentos)
+    - q: búsqueda de texto en nombre y descripción (parcial, case-insensitive)
+    - prefijo: 'true' para que nombre coincida desde el inicio
     - categoria: filtrar por categoría (búsqueda parcial case-insensitive)
     """
     try:
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
-        
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         # Construir query base
         query = LabTest.query.filter(
             LabTest.is_active == True,
@@ -38,49 +42,33 @@ def get_lab_tests():
         
         # Filtros opcionales
         nombre = request.args.get('nombre', '', type=str) or ''
+        q = request.args.get('q', '', type=str) or ''
         categoria = request.args.get('categoria', '', type=str) or ''
         codigo = request.args.get('codigo', '', type=str) or ''
         
-        if nombre:
-            query = query.filter(LabTest.name.ilike(f'%{nombre}%'))
-        
         if categoria:
             query = query.filter(LabTest.category.ilike(f'%{categoria}%'))
         
         if codigo:
             query = query.filter(LabTest.code.ilike(f'%{codigo}%'))
         
-        # Obtener total count antes de paginar
-        total_count = query.count()
+        # Búsqueda de texto (nombre; q: nombre y descripción) desde el índice de búsqueda
+        query, rank = apply_text_search(
+            query, LabTest, {('name',): nombre, ('name', 'description'): q}, prefix=read_prefix_flag()
+        )
         
-        # Aplicar paginación
-        lab_tests = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Aplicar paginación (ordenada por relevancia si hay búsqueda, luego por id)
+        lab_tests, pagination = paginate(query, [LabTest.id], page_request, rank=rank)
         
         return jsonify({
             'status': 'success',
-            'data': [
-                {
-                    'id': test.id,
-                    'code': test.code,
-                    'name': test.name,
-                    'description': test.description,
-                    'category': test.category,
-                    'normal_range': test.normal_range,
-                    'unit': test.unit,
-                    'is_active': test.is_active,
-                    'created_at': test.created_at.isoformat() if test.created_at else None,
-                    'updated_at': test.updated_at.isoformat() if test.updated_at else None
-                }
-                for test in lab_tests
-            ],
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'data': [serialize_lab_test(test) for test in lab_tests],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -89,6 +77,7 @@ def get_lab_tests():
 
 @lab_tests_bp.route('/lab-tests/<int:test_id>', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(LabTest)
 def get_lab_test(test_id):
     """Obtener una prueba de laboratorio por ID"""
     try:
@@ -101,18 +90,7 @@ def get_lab_test(test_id):
         
         return jsonify({
             'status': 'success',
-            'data': {
-                'id': test.id,
-                'code': test.code,
-                'name': test.name,
-                'description': test.description,
-                'category': test.category,
-                'normal_range': test.normal_range,
-                'unit': test.unit,
-                'is_active': test.is_active,
-                'created_at': test.created_at.isoformat() if test.created_at else None,
-                'updated_at': test.updated_at.isoformat() if test.updated_at else None
-            }
+            'data': serialize_lab_test(test)
         }), 200
         
     except Exception as e:
@@ -162,18 +140,7 @@ def create_lab_test():
         return jsonify({
             'status': 'success',
             'message': 'Prueba de laboratorio creada exitosamente',
-            'data': {
-                'id': new_test.id,
-                'code': new_test.code,
-                'name': new_test.name,
-                'description': new_test.description,
-                'category': new_test.category,
-                'normal_range': new_test.normal_range,
-                'unit': new_test.unit,
-                'is_active': new_test.is_active,
-                'created_at': new_test.created_at.isoformat() if new_test.created_at else None,
-                'updated_at': new_test.updated_at.isoformat() if new_test.updated_at else None
-            }
+            'data': serialize_lab_test(new_test)
         }), 201
         
     except Exception as e:
@@ -227,18 +194,7 @@ def update_lab_test(test_id):
         return jsonify({
             'status': 'success',
             'message': 'Prueba de laboratorio actualizada exitosamente',
-            'data': {
-                'id': test.id,
-                'code': test.code,
-                'name': test.name,
-                'description': test.description,
-                'category': test.category,
-                'normal_range': test.normal_range,
-                'unit': test.unit,
-                'is_active': test.is_active,
-                'created_at': test.created_at.isoformat() if test.created_at else None,
-                'updated_at': test.updated_at.isoformat() if test.updated_at else None
-            }
+            'data': serialize_lab_test(test)
         }), 200
         
     except Exception as e:
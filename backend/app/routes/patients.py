@@ -3,6 +3,13 @@ from flask_jwt_extended import jwt_required, get_jwt_identity  # type: ignore[im
 from app.extensions import db
 from app.models.patient import Patient
 from app.models.user import User
+from app.models.medical_knowledge import Disease
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.patient_diseases import patients_with_diseases
+from app.services.search import apply_text_search, matching_keys, read_prefix_flag
+from app.services.serialization import serialize_patient
+from app.services.conditional import conditional_response, row_versions
+from app.services.patient_import import IMPORT_FORMATS, import_patients
 from datetime import datetime
 
 patients_bp = Blueprint('patients', __name__, url_prefix='/api/patients')
@@ -25,6 +32,13 @@ def get_patients():
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 100)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
+    - nombre, apellido_paterno, apellido_materno: búsqueda parcial, sin distinguir mayúsculas ni acentos
+    - prefijo: 'true' para que nombre y apellidos coincidan desde el inicio
+    - enfermedad: pacientes con algún diagnóstico cuya enfermedad coincide por nombre
+    
+    Con filtros de texto, en modo página los resultados se ordenan por relevancia.
     """
     try:
         current_user_id = int(get_jwt_identity())
@@ -33,15 +47,8 @@ def get_patients():
         if not user:
             return jsonify({'status': 'error', 'message': 'Usuario no encontrado'}), 404
         
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
-        
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         
         # Admin ve todos los pacientes, doctor solo los suyos
         if user.role == 'admin':
@@ -57,78 +64,33 @@ def get_patients():
         apellido_materno = request.args.get('apellido_materno', '', type=str) or ''
         enfermedad = request.args.get('enfermedad', '', type=str) or ''
 
-        # Aplicar filtros de nombre/apellidos
-        if nombre:
-            term = f"%{nombre}%"
-            query = query.filter(
-                (Patient.first_name.ilike(term)) |
-                (Patient.second_name.ilike(term))
-            )
-
-        if apellido_paterno:
-            term = f"%{apellido_paterno}%"
-            query = query.filter(Patient.paternal_surname.ilike(term))
-
-        if apellido_materno:
-            term = f"%{apellido_materno}%"
-            query = query.filter(Patient.maternal_surname.ilike(term))
+        # Filtros de nombre/apellidos, respondidos desde el índice de búsqueda
+        query, rank = apply_text_search(query, Patient, {
+            ('first_name', 'second_name'): nombre,
+            ('paternal_surname',): apellido_paterno,
+            ('maternal_surname',): apellido_materno
+        }, prefix=read_prefix_flag())
 
-        # Filtro por enfermedad necesita join con diagnósticos y enfermedades
+        # Filtro por enfermedad: semi-join con el índice paciente–enfermedad
+        # sobre las enfermedades cuyo nombre coincide
         if enfermedad:
-            term = f"%{enfermedad}%"
-            # Import aquí para evitar ciclos si no se usan globalmente
-            from app.models.diagnosis import Diagnosis
-            from app.models.medical_knowledge import Disease
-
-            query = query.join(Diagnosis, Diagnosis.patient_id == Patient.id)
-            query = query.join(Disease, Disease.code == Diagnosis.disease_code)
-            query = query.filter(Disease.name.ilike(term)).distinct()
-        
-        # Obtener total count
-        total_count = query.count()
-        
-        # Aplicar paginación
-        patients = query.offset((page - 1) * page_size).limit(page_size).all()
-        
-        patients_data = [{
-            'id': p.id,
-            'first_name': p.first_name,
-            'second_name': p.second_name,
-            'paternal_surname': p.paternal_surname,
-            'maternal_surname': p.maternal_surname,
-            'full_name': p.full_name,
-            'date_of_birth': p.date_of_birth.isoformat() if p.date_of_birth else None,
-            'age': p.age,
-            'gender': p.gender,
-            'blood_type_abo': p.blood_type_abo,
-            'blood_type_rh': p.blood_type_rh,
-            'height': p.height,
-            'weight': p.weight,
-            'bmi': p.bmi,
-            'smoking_status': p.smoking_status,
-            'alcohol_consumption': p.alcohol_consumption,
-            'email': p.email,
-            'phone': p.phone,
-            'address': p.address,
-            'allergies': p.allergies,
-            'chronic_conditions': p.chronic_conditions,
-            'doctor_id': p.doctor_id,
-            'is_active': p.is_active,
-            'created_at': p.created_at.isoformat() if p.created_at else None,
-            'updated_at': p.updated_at.isoformat() if p.updated_at else None
-        } for p in patients]
+            disease_codes = matching_keys(Disease, Disease.code, {('name',): enfermedad})
+            query = query.filter(patients_with_diseases(disease_codes))
+        
+        # Aplicar paginación (ordenada por relevancia si hay búsqueda, luego por id)
+        patients, pagination = paginate(query, [Patient.id], page_request, rank=rank)
+        
+        patients_data = [serialize_patient(p) for p in patients]
         
         return jsonify({
             'status': 'success',
             'data': patients_data,
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -152,35 +114,10 @@ def get_patient(patient_id):
         if user.role != 'admin' and patient.doctor_id != current_user_id:
             return jsonify({'status': 'error', 'message': 'No autorizado'}), 403
         
-        patient_data = {
-            'id': patient.id,
-            'first_name': patient.first_name,
-            'second_name': patient.second_name,
-            'paternal_surname': patient.paternal_surname,
-            'maternal_surname': patient.maternal_surname,
-            'full_name': patient.full_name,
-            'date_of_birth': patient.date_of_birth.isoformat() if patient.date_of_birth else None,
-            'age': patient.age,
-            'gender': patient.gender,
-            'blood_type_abo': patient.blood_type_abo,
-            'blood_type_rh': patient.blood_type_rh,
-            'height': patient.height,
-            'weight': patient.weight,
-            'bmi': patient.bmi,
-            'smoking_status': patient.smoking_status,
-            'alcohol_consumption': patient.alcohol_consumption,
-            'email': patient.email,
-            'phone': patient.phone,
-            'address': patient.address,
-            'allergies': patient.allergies,
-            'chronic_conditions': patient.chronic_conditions,
-            'doctor_id': patient.doctor_id,
-            'is_active': patient.is_active,
-            'created_at': patient.created_at.isoformat() if patient.created_at else None,
-            'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
-        }
-        
-        return jsonify({'status': 'success', 'data': patient_data}), 200
+        return conditional_response(
+            row_versions(patient),
+            lambda: (jsonify({'status': 'success', 'data': serialize_patient(patient)}), 200)
+        )
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -235,6 +172,56 @@ def create_patient():
         db.session.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+@patients_bp.route('/import', methods=['POST'])
+@jwt_required()
+def import_patients_file():
+    """Importar pacientes en masa desde CSV o NDJSON (solo doctores y admin)
+    
+    Cuerpo: el archivo como cuerpo de la solicitud (Content-Type text/csv o
+    application/x-ndjson), o multipart/form-data con el archivo en el campo 'file'.
+    Columnas: las de POST /api/patients (first_name, paternal_surname,
+    date_of_birth y gender requeridas).
+    
+    Query params opcionales:
+    - format: 'csv' o 'ndjson' (default: según Content-Type o extensión del archivo)
+    
+    El archivo se procesa en streaming y en lotes con transacción propia; las
+    filas inválidas se reportan (número de línea, campo, mensaje) sin detener
+    la importación. Los pacientes quedan asignados al usuario que importa.
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+        
+        if not is_doctor(current_user_id):
+            return jsonify({'status': 'error', 'message': 'Solo doctores pueden importar pacientes'}), 403
+        
+        upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+        if upload is not None:
+            stream, filename, mimetype = upload.stream, upload.filename or '', upload.mimetype
+        else:
+            stream, filename, mimetype = request.stream, '', request.mimetype
+        
+        import_format = request.args.get('format')
+        if not import_format:
+            if mimetype in ('application/x-ndjson', 'application/jsonl') or filename.lower().endswith(('.ndjson', '.jsonl')):
+                import_format = 'ndjson'
+            elif mimetype == 'text/csv' or filename.lower().endswith('.csv'):
+                import_format = 'csv'
+        if import_format not in IMPORT_FORMATS:
+            return jsonify({'status': 'error', 'message': "format debe ser 'csv' o 'ndjson'"}), 400
+        
+        summary = import_patients(IMPORT_FORMATS[import_format](stream), doctor_id=current_user_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': f"Importación completada: {summary['inserted']} pacientes creados, {summary['failed']} filas con errores",
+            'data': summary
+        }), 200
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
 @patients_bp.route('/<int:patient_id>', methods=['PUT'])
 @jwt_required()
 def update_patient(patient_id):
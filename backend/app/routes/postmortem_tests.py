@@ -6,17 +6,23 @@ from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app.extensions import db
 from app.models import PostmortemTest
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.conditional import conditional_on_tables
+from app.services.serialization import serializer_for
 
 postmortem_tests_bp = Blueprint('postmortem_tests', __name__, url_prefix='/api')
 
 @postmortem_tests_bp.route('/postmortem-tests', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(PostmortemTest)
 def get_postmortem_tests():
     """Obtener todas las pruebas post-mortem activas (no eliminadas) con paginación y filtrado
     
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 1000)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
     - nombre: filtrar por nombre (búsqueda parcial case-insensitive)
     - death_cause: filtrar por causa de muerte
     - codigo: filtrar por código de la prueba (partial match)
@@ -24,15 +30,8 @@ def get_postmortem_tests():
     - autopsy_date: filtrar por fecha de autopsia (YYYY-MM-DD exact match)
     """
     try:
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
-        
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         
         # Construir query base
         query = PostmortemTest.query.filter(
@@ -62,23 +61,19 @@ def get_postmortem_tests():
                 # ignore invalid date format
                 pass
 
-        # Obtener total count antes de paginar
-        total_count = query.count()
-        
-        # Aplicar paginación
-        tests = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Aplicar paginación (ordenada por code; el conteo es opcional y se cachea)
+        tests, pagination = paginate(query, [PostmortemTest.code], page_request)
+        serialize_test = serializer_for(PostmortemTest)
         
         return jsonify({
             'status': 'success',
-            'data': [test.to_dict() for test in tests],
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'data': [serialize_test(test) for test in tests],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -87,6 +82,7 @@ def get_postmortem_tests():
 
 @postmortem_tests_bp.route('/postmortem-tests/<string:code>', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(PostmortemTest)
 def get_postmortem_test(code):
     """Obtener una prueba post-mortem por código"""
     try:
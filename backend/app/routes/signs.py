@@ -6,30 +6,34 @@ from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app.extensions import db
 from app.models import Sign
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.conditional import conditional_on_tables
+from app.services.search import apply_text_search, read_prefix_flag
+from app.services.response_cache import cached_response
+from app.services.serialization import serialize_sign
 
 signs_bp = Blueprint('signs', __name__, url_prefix='/api')
 
 @signs_bp.route('/signs', methods=['GET'])
 @jwt_required()
+@cached_response()
+@conditional_on_tables(Sign)
 def get_signs():
     """Obtener todos los signos activos (no eliminados) con paginación y filtrado
     
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 1000)
-    - nombre: filtrar por nombre (búsqueda parcial case-insensitive)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
+    - nombre: filtrar por nombre (búsqueda parcial, sin distinguir mayúsculas ni acentos)
+    - q: búsqueda de texto en nombre y descripción (parcial, case-insensitive)
+    - prefijo: 'true' para que nombre coincida desde el inicio
     - categoria: filtrar por categoría (búsqueda parcial case-insensitive)
     """
     try:
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
-        
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         
         # Construir query base
         query = Sign.query.filter(
@@ -39,45 +43,29 @@ def get_signs():
         
         # Filtros opcionales
         nombre = request.args.get('nombre', '', type=str) or ''
+        q = request.args.get('q', '', type=str) or ''
         categoria = request.args.get('categoria', '', type=str) or ''
         
-        if nombre:
-            query = query.filter(Sign.name.ilike(f'%{nombre}%'))
-        
         if categoria:
             query = query.filter(Sign.category.ilike(f'%{categoria}%'))
         
-        # Obtener total count antes de paginar
-        total_count = query.count()
+        # Búsqueda de texto (nombre; q: nombre y descripción) desde el índice de búsqueda
+        query, rank = apply_text_search(
+            query, Sign, {('name',): nombre, ('name', 'description'): q}, prefix=read_prefix_flag()
+        )
         
-        # Aplicar paginación
-        signs = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Aplicar paginación (ordenada por relevancia si hay búsqueda, luego por id)
+        signs, pagination = paginate(query, [Sign.id], page_request, rank=rank)
         
         return jsonify({
             'status': 'success',
-            'data': [
-                {
-                    'id': sign.id,
-                    'code': sign.code,
-                    'name': sign.name,
-                    'description': sign.description,
-                    'category': sign.category,
-                    'measurement_unit': sign.measurement_unit,
-                    'normal_range': sign.normal_range,
-                    'is_active': sign.is_active,
-                    'created_at': sign.created_at.isoformat() if sign.created_at else None,
-                    'updated_at': sign.updated_at.isoformat() if sign.updated_at else None
-                }
-                for sign in signs
-            ],
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'data': [serialize_sign(sign) for sign in signs],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -86,6 +74,7 @@ def get_signs():
 
 @signs_bp.route('/signs/<int:sign_id>', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(Sign)
 def get_sign(sign_id):
     """Obtener un signo por ID"""
     try:
@@ -98,18 +87,7 @@ def get_sign(sign_id):
         
         return jsonify({
             'status': 'success',
-            'data': {
-                'id': sign.id,
-                'code': sign.code,
-                'name': sign.name,
-                'description': sign.description,
-                'category': sign.category,
-                'measurement_unit': sign.measurement_unit,
-                'normal_range': sign.normal_range,
-                'is_active': sign.is_active,
-                'created_at': sign.created_at.isoformat() if sign.created_at else None,
-                'updated_at': sign.updated_at.isoformat() if sign.updated_at else None
-            }
+            'data': serialize_sign(sign)
         }), 200
         
     except Exception as e:
@@ -159,18 +137,7 @@ def create_sign():
         return jsonify({
             'status': 'success',
             'message': 'Signo creado exitosamente',
-            'data': {
-                'id': new_sign.id,
-                'code': new_sign.code,
-                'name': new_sign.name,
-                'description': new_sign.description,
-                'category': new_sign.category,
-                'measurement_unit': new_sign.measurement_unit,
-                'normal_range': new_sign.normal_range,
-                'is_active': new_sign.is_active,
-                'created_at': new_sign.created_at.isoformat() if new_sign.created_at else None,
-                'updated_at': new_sign.updated_at.isoformat() if new_sign.updated_at else None
-            }
+            'data': serialize_sign(new_sign)
         }), 201
         
     except Exception as e:
@@ -224,18 +191,7 @@ def update_sign(sign_id):
         return jsonify({
             'status': 'success',
             'message': 'Signo actualizado exitosamente',
-            'data': {
-                'id': sign.id,
-                'code': sign.code,
-                'name': sign.name,
-                'description': sign.description,
-                'category': sign.category,
-                'measurement_unit': sign.measurement_unit,
-                'normal_range': sign.normal_range,
-                'is_active': sign.is_active,
-                'created_at': sign.created_at.isoformat() if sign.created_at else None,
-                'updated_at': sign.updated_at.isoformat() if sign.updated_at else None
-            }
+            'data': serialize_sign(sign)
         }), 200
         
     except Exception as e:
@@ -6,30 +6,34 @@ from flask_jwt_extended import jwt_required
 from datetime import datetime
 from app.extensions import db
 from app.models import Symptom
+from app.services.pagination import InvalidCursor, paginate, read_page_request
+from app.services.conditional import conditional_on_tables
+from app.services.search import apply_text_search, read_prefix_flag
+from app.services.response_cache import cached_response
+from app.services.serialization import serialize_symptom
 
 symptoms_bp = Blueprint('symptoms', __name__, url_prefix='/api')
 
 @symptoms_bp.route('/symptoms', methods=['GET'])
 @jwt_required()
+@cached_response()
+@conditional_on_tables(Symptom)
 def get_symptoms():
     """Obtener todos los síntomas activos (no eliminados) con paginación y filtrado
     
     Query params opcionales:
     - page: número de página (default: 1)
     - page_size: tamaño de página (default: 10, max: 1000)
-    - nombre: filtrar por nombre (búsqueda parcial case-insensitive)
+    - cursor: paginación keyset; vacío para la primera página, luego pagination.next_cursor
+    - count: 'true' (exacto), 'estimate' (aproximado) o 'false' (sin total_count); default: true con page, false con cursor
+    - nombre: filtrar por nombre (búsqueda parcial, sin distinguir mayúsculas ni acentos)
+    - q: búsqueda de texto en nombre y descripción (parcial, case-insensitive)
+    - prefijo: 'true' para que nombre coincida desde el inicio
     - categoria: filtrar por categoría (búsqueda parcial case-insensitive)
     """
     try:
-        # Parámetros de paginación
-        page = request.args.get('page', 1, type=int)
-        page_size = request.args.get('page_size', 10, type=int)
-        
-        # Validar parámetros
-        if page < 1:
-            page = 1
-        if page_size < 1 or page_size > 1000:
-            page_size = 10
+        # Parámetros de paginación (por página o por cursor)
+        page_request = read_page_request()
         
         # Construir query base
         query = Symptom.query.filter(
@@ -39,43 +43,29 @@ def get_symptoms():
         
         # Filtros opcionales
         nombre = request.args.get('nombre', '', type=str) or ''
+        q = request.args.get('q', '', type=str) or ''
         categoria = request.args.get('categoria', '', type=str) or ''
         
-        if nombre:
-            query = query.filter(Symptom.name.ilike(f'%{nombre}%'))
-        
         if categoria:
             query = query.filter(Symptom.category.ilike(f'%{categoria}%'))
         
-        # Obtener total count antes de paginar
-        total_count = query.count()
+        # Búsqueda de texto (nombre; q: nombre y descripción) desde el índice de búsqueda
+        query, rank = apply_text_search(
+            query, Symptom, {('name',): nombre, ('name', 'description'): q}, prefix=read_prefix_flag()
+        )
         
-        # Aplicar paginación
-        symptoms = query.offset((page - 1) * page_size).limit(page_size).all()
+        # Aplicar paginación (ordenada por relevancia si hay búsqueda, luego por id)
+        symptoms, pagination = paginate(query, [Symptom.id], page_request, rank=rank)
         
         return jsonify({
             'status': 'success',
-            'data': [
-                {
-                    'id': symptom.id,
-                    'code': symptom.code,
-                    'name': symptom.name,
-                    'description': symptom.description,
-                    'category': symptom.category,
-                    'is_active': symptom.is_active,
-                    'created_at': symptom.created_at.isoformat() if symptom.created_at else None,
-                    'updated_at': symptom.updated_at.isoformat() if symptom.updated_at else None
-                }
-                for symptom in symptoms
-            ],
-            'pagination': {
-                'page': page,
-                'page_size': page_size,
-                'total_count': total_count,
-                'total_pages': (total_count + page_size - 1) // page_size
-            }
+            'data': [serialize_symptom(symptom) for symptom in symptoms],
+            'pagination': pagination
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+        
     except Exception as e:
         return jsonify({
             'status': 'error',
@@ -84,6 +74,7 @@ def get_symptoms():
 
 @symptoms_bp.route('/symptoms/<int:symptom_id>', methods=['GET'])
 @jwt_required()
+@conditional_on_tables(Symptom)
 def get_symptom(symptom_id):
     """Obtener un síntoma por ID"""
     try:
@@ -96,16 +87,7 @@ def get_symptom(symptom_id):
         
         return jsonify({
             'status': 'success',
-            'data': {
-                'id': symptom.id,
-                'code': symptom.code,
-                'name': symptom.name,
-                'description': symptom.description,
-                'category': symptom.category,
-                'is_active': symptom.is_active,
-                'created_at': symptom.created_at.isoformat() if symptom.created_at else None,
-                'updated_at': symptom.updated_at.isoformat() if symptom.updated_at else None
-            }
+            'data': serialize_symptom(symptom)
         }), 200
         
     except Exception as e:
@@ -153,16 +135,7 @@ def create_symptom():
         return jsonify({
             'status': 'success',
             'message': 'Síntoma creado exitosamente',
-            'data': {
-                'id': new_symptom.id,
-                'code': new_symptom.code,
-                'name': new_symptom.name,
-                'description': new_symptom.description,
-                'category': new_symptom.category,
-                'is_active': new_symptom.is_active,
-                'created_at': new_symptom.created_at.isoformat() if new_symptom.created_at else None,
-                'updated_at': new_symptom.updated_at.isoformat() if new_symptom.updated_at else None
-            }
+            'data': serialize_symptom(new_symptom)
         }), 201
         
     except Exception as e:
@@ -212,16 +185,7 @@ def update_symptom(symptom_id):
         return jsonify({
             'status': 'success',
             'message': 'Síntoma actualizado exitosamente',
-            'data': {
-                'id': symptom.id,
-                'code': symptom.code,
-                'name': symptom.name,
-                'description': symptom.description,
-                'category': symptom.category,
-                'is_active': symptom.is_active,
-                'created_at': symptom.created_at.isoformat() if symptom.created_at else None,
-                'updated_at': symptom.updated_at.isoformat() if symptom.updated_at else None
-            }
+            'data': serialize_symptom(symptom)
         }), 200
         
     except Exception as e:
@@ -0,0 +1,152 @@
+"""
+Autocompletado del Catálogo
+===========================
+
+Índice en memoria, por proceso, para sugerir síntomas, signos, pruebas de
+laboratorio y enfermedades mientras el usuario escribe, sin consultar la base
+de datos en cada tecla.
+
+Cada tipo tiene tres arreglos ordenados de claves normalizadas (`fold_text`),
+consultados con búsqueda binaria en orden de prioridad:
+
+1. código ('s00' encuentra S001, S002, ...),
+2. nombre completo ('dolor' encuentra "Dolor abdominal"),
+3. inicio de cada palabra del nombre ('abd' encuentra "Dolor abdominal").
+
+Una búsqueda cuesta O(log n + k) y deja de recorrer en cuanto reúne `limit`
+resultados. Solo se indexan elementos activos y no eliminados.
+
+El índice se reconstruye cuando cambia la versión del catálogo
+(`app.services.inference.get_kb_version`), igual que la base de conocimiento:
+de inmediato tras un cambio hecho en este proceso, y con a lo sumo
+`KB_VERSION_CHECK_INTERVAL` segundos de retraso para los cambios hechos por
+otros workers.
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from app.extensions import db
+from app.models.folding import fold_text
+from app.models.medical_knowledge import Disease, Symptom, Sign, LabTest
+from app.services.inference import get_kb_version
+
+# Máximo de sugerencias por búsqueda
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+_WORD = re.compile(r'\w+')
+
+
+class _CatalogSource(NamedTuple):
+    model: type
+    fields: Tuple[str, ...]  # Campos de cada sugerencia
+
+
+CATALOG_SOURCES: Dict[str, _CatalogSource] = {
+    'symptoms': _CatalogSource(Symptom, ('id', 'code', 'name', 'category')),
+    'signs': _CatalogSource(Sign, ('id', 'code', 'name', 'category')),
+    'lab_tests': _CatalogSource(LabTest, ('id', 'code', 'name', 'category')),
+    'diseases': _CatalogSource(Disease, ('code', 'name', 'category')),
+}
+
+
+class _SortedKeys:
+    """Claves ordenadas con la posición del elemento al que pertenecen."""
+
+    def __init__(self, pairs: List[Tuple[str, int]]):
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.positions = [position for _, position in pairs]
+
+    def scan(self, prefix: str) -> Iterator[Tuple[str, int]]:
+        """(clave, posición) de las claves que comienzan con `prefix`, en orden."""
+        keys, positions = self.keys, self.positions
+        i = bisect_left(keys, prefix)
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i], positions[i]
+            i += 1
+
+
+class PrefixIndex:
+    """Índice de prefijos de un tipo del catálogo."""
+
+    def __init__(self, items: Sequence[Dict[str, Any]]):
+        self.items = list(items)
+        codes, names, words = [], [], []
+        for position, item in enumerate(self.items):
+            name = fold_text(item['name'] or '')
+            codes.append((fold_text(item['code'] or ''), position))
+            names.append((name, position))
+            # La primera palabra ya está cubierta por el nombre completo
+            words.extend((word, position) for word in set(_WORD.findall(name)[1:]))
+        self._classes = (_SortedKeys(codes), _SortedKeys(names), _SortedKeys(words))
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str, Dict[str, Any]]]:
+        """Hasta `limit` coincidencias (prioridad, clave, elemento), de mayor a menor prioridad."""
+        results = []
+        seen = set()
+        for priority, keys in enumerate(self._classes):
+            for key, position in keys.scan(prefix):
+                if position in seen:
+                    continue
+                seen.add(position)
+                results.append((priority, key, self.items[position]))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class CatalogAutocomplete:
+    """Índices de prefijos de todos los tipos, para una versión del catálogo."""
+
+    def __init__(self, version: int, indexes: Dict[str, PrefixIndex]):
+        self.version = version
+        self.indexes = indexes
+
+    def search(self, query: str, types: Sequence[str], limit: int) -> List[Dict[str, Any]]:
+        """Sugerencias para `query` entre los `types` indicados, las más relevantes primero."""
+        prefix = fold_text(query.strip())
+        if not prefix:
+            return []
+        matches = []
+        for order, kind in enumerate(types):
+            for priority, key, item in self.indexes[kind].search(prefix, limit):
+                matches.append((priority, key, order, kind, item))
+        matches.sort(key=lambda m: m[:3])
+        return [dict(item, type=kind) for _, _, _, kind, item in matches[:limit]]
+
+
+def build_autocomplete(version: int) -> CatalogAutocomplete:
+    """Carga los elementos activos del catálogo (una consulta por tipo) y construye los índices."""
+    indexes = {}
+    for kind, source in CATALOG_SOURCES.items():
+        model = source.model
+        rows = db.session.query(*(getattr(model, f) for f in source.fields)).filter(
+            model.is_active == True,
+            model.deleted_at.is_(None)
+        ).all()
+        indexes[kind] = PrefixIndex([dict(zip(source.fields, row)) for row in rows])
+    return CatalogAutocomplete(version, indexes)
+
+
+_lock = threading.Lock()
+_autocomplete: Optional[CatalogAutocomplete] = None
+
+
+def get_autocomplete() -> CatalogAutocomplete:
+    """Índice del proceso, reconstruido si la versión del catálogo cambió desde la última carga."""
+    global _autocomplete
+    version = get_kb_version()
+    current = _autocomplete
+    if current is not None and current.version == version:
+        return current
+
+    with _lock:
+        version = get_kb_version()
+        if _autocomplete is None or _autocomplete.version != version:
+            _autocomplete = build_autocomplete(version)
+        return _autocomplete
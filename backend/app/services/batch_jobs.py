@@ -0,0 +1,199 @@
+"""
+Trabajos de Inferencia por Lotes
+================================
+
+Tipos de trabajo registrados en el `JobRunner` (ver `app.services.jobs`):
+
+- `batch_diagnose`: ejecuta el motor sobre la evidencia completa de un conjunto
+  de pacientes.
+- `retrospective_evaluation`: vuelve a ejecutar el motor sobre la evidencia de
+  cada visita diagnosticada y la compara con la enfermedad registrada.
+
+Ambos respetan el alcance del usuario que creó el trabajo: un doctor solo
+procesa sus pacientes; un administrador, todos. Sus parámetros se validan al
+encolar el trabajo (ver los validadores `_validate_*`).
+"""
+
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Iterable, List
+from app.extensions import db
+from app.models.diagnosis import Diagnosis
+from app.models.patient import Patient
+from app.services.inference import get_engine, get_patient_evidence
+from app.services.jobs import JobContext, JobParamsError, register_job
+
+# Máximo de discrepancias detalladas en el resultado de la evaluación retrospectiva
+MAX_REPORTED_MISMATCHES = 100
+
+# Máximo de diagnósticos por paciente (top_n)
+MAX_TOP_N = 20
+
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+# ==================== VALIDACIÓN DE PARÁMETROS ====================
+
+def _check_known(params: Dict[str, Any], allowed: Iterable[str]) -> None:
+    unknown = sorted(set(params) - set(allowed))
+    if unknown:
+        raise JobParamsError(f"Parámetros desconocidos: {', '.join(unknown)}")
+
+
+def _integer(value: Any, field: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise JobParamsError(f'{field} debe ser un entero')
+    try:
+        return int(value)
+    except ValueError:
+        raise JobParamsError(f'{field} debe ser un entero')
+
+
+def _top_n(params: Dict[str, Any]) -> int:
+    top_n = _integer(params.get('top_n', 3), 'top_n')
+    if not 1 <= top_n <= MAX_TOP_N:
+        raise JobParamsError(f'top_n debe estar entre 1 y {MAX_TOP_N}')
+    return top_n
+
+
+def _validate_batch_diagnose(params: Dict[str, Any]) -> Dict[str, Any]:
+    _check_known(params, ('patient_ids', 'top_n'))
+    validated: Dict[str, Any] = {'top_n': _top_n(params)}
+    patient_ids = params.get('patient_ids')
+    if patient_ids is not None:
+        if not isinstance(patient_ids, list):
+            raise JobParamsError('patient_ids debe ser una lista de IDs')
+        validated['patient_ids'] = [_integer(pid, 'Cada ID de patient_ids') for pid in patient_ids]
+    return validated
+
+
+def _validate_retrospective_evaluation(params: Dict[str, Any]) -> Dict[str, Any]:
+    _check_known(params, ('date_from', 'date_to', 'top_n'))
+    validated: Dict[str, Any] = {'top_n': _top_n(params)}
+    dates = {}
+    for field in ('date_from', 'date_to'):
+        value = params.get(field)
+        if value in (None, ''):
+            continue
+        try:
+            dates[field] = _parse_date(str(value))
+        except ValueError:
+            raise JobParamsError(f'{field} debe ser una fecha ISO 8601')
+        validated[field] = dates[field].isoformat()
+    if len(dates) == 2:
+        try:
+            inverted = dates['date_from'] > dates['date_to']
+        except TypeError:
+            raise JobParamsError('date_from y date_to deben indicar ambas, o ninguna, la zona horaria')
+        if inverted:
+            raise JobParamsError('date_from debe ser anterior a date_to')
+    return validated
+
+
+# ==================== TRABAJOS ====================
+
+@register_job('batch_diagnose', validator=_validate_batch_diagnose)
+def batch_diagnose(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parámetros:
+        patient_ids: Lista opcional de pacientes (default: todos los activos del alcance)
+        top_n: Diagnósticos por paciente (default 3)
+    """
+    top_n = int(params.get('top_n', 3))
+
+    query = db.session.query(Patient.id).filter(Patient.is_active == True)
+    if not ctx.is_admin:
+        query = query.filter(Patient.doctor_id == ctx.user_id)
+    if params.get('patient_ids'):
+        query = query.filter(Patient.id.in_([int(pid) for pid in params['patient_ids']]))
+    patient_ids = [row.id for row in query.order_by(Patient.id)]
+
+    engine = get_engine()
+    results: List[Dict[str, Any]] = []
+    without_evidence = 0
+    for i, patient_id in enumerate(patient_ids):
+        ctx.progress(i, len(patient_ids), f'Paciente {i + 1} de {len(patient_ids)}')
+        evidence = get_patient_evidence(patient_id)
+        if evidence.is_empty():
+            without_evidence += 1
+            continue
+        diagnosis = engine.diagnose(evidence, explain=False, top_n=top_n)
+        ranked = [diagnosis['primary_diagnosis']] + diagnosis['alternative_diagnoses'] if diagnosis['primary_diagnosis'] else []
+        results.append({
+            'patient_id': patient_id,
+            'diagnoses': [
+                {'disease_code': d['disease_code'], 'disease_name': d['disease_name'],
+                 'score': d['score'], 'confidence': d['confidence']}
+                for d in ranked
+            ]
+        })
+
+    return {
+        'total_patients': len(patient_ids),
+        'scored': len(results),
+        'without_evidence': without_evidence,
+        'results': results
+    }
+
+
+@register_job('retrospective_evaluation', validator=_validate_retrospective_evaluation)
+def retrospective_evaluation(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Parámetros:
+        date_from / date_to: Rango opcional de diagnosis_date (ISO 8601)
+        top_n: Posiciones consideradas para el acierto top-N (default 3)
+    """
+    top_n = int(params.get('top_n', 3))
+
+    query = db.session.query(
+        Diagnosis.id, Diagnosis.patient_id, Diagnosis.visit_id, Diagnosis.disease_code
+    ).filter(Diagnosis.visit_id.isnot(None))
+    if not ctx.is_admin:
+        query = query.join(Patient, Patient.id == Diagnosis.patient_id).filter(Patient.doctor_id == ctx.user_id)
+    date_from = _parse_date(params.get('date_from'))
+    date_to = _parse_date(params.get('date_to'))
+    if date_from:
+        query = query.filter(Diagnosis.diagnosis_date >= date_from)
+    if date_to:
+        query = query.filter(Diagnosis.diagnosis_date <= date_to)
+    diagnoses = query.order_by(Diagnosis.id).all()
+
+    engine = get_engine()
+    evaluated = top1_hits = topn_hits = 0
+    per_disease = defaultdict(lambda: {'total': 0, 'top1': 0, f'top{top_n}': 0})
+    mismatches = []
+    for i, d in enumerate(diagnoses):
+        ctx.progress(i, len(diagnoses), f'Diagnóstico {i + 1} de {len(diagnoses)}')
+        evidence = get_patient_evidence(d.patient_id, d.visit_id)
+        if evidence.is_empty():
+            continue
+        result = engine.diagnose(evidence, explain=False, top_n=top_n)
+        ranked = [r['disease_code'] for r in
+                  ([result['primary_diagnosis']] if result['primary_diagnosis'] else []) + result['alternative_diagnoses']]
+
+        evaluated += 1
+        stats = per_disease[d.disease_code]
+        stats['total'] += 1
+        if ranked[:1] == [d.disease_code]:
+            top1_hits += 1
+            stats['top1'] += 1
+        if d.disease_code in ranked:
+            topn_hits += 1
+            stats[f'top{top_n}'] += 1
+        elif len(mismatches) < MAX_REPORTED_MISMATCHES:
+            mismatches.append({
+                'diagnosis_id': d.id,
+                'recorded': d.disease_code,
+                'predicted': ranked
+            })
+
+    return {
+        'total_diagnoses': len(diagnoses),
+        'evaluated': evaluated,
+        'top1_accuracy': round(top1_hits / evaluated, 4) if evaluated else None,
+        f'top{top_n}_accuracy': round(topn_hits / evaluated, 4) if evaluated else None,
+        'per_disease': dict(per_disease),
+        'mismatches': mismatches
+    }
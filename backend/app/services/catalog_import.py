@@ -0,0 +1,529 @@
+"""
+Importación Masiva del Catálogo
+===============================
+
+Carga un paquete (por ejemplo, una guía clínica) de síntomas, signos, pruebas
+de laboratorio, enfermedades y asociaciones enfermedad–elemento con su peso,
+en una sola transacción.
+
+Formato del paquete: un objeto JSON con una lista de filas por sección, o un
+CSV por sección (encabezado = nombres de campo).
+
+- symptoms:  code, name, category [, description, is_active]
+- signs:     code, name, category [, description, measurement_unit, normal_range, is_active]
+- lab_tests: code, name, category [, description, normal_range, unit, is_active]
+- diseases:  code, name, category [, description, severity, treatment_recommendations,
+             prevention_measures, is_active]
+- disease_symptoms:  disease_code, symptom_code [, weight]
+- disease_signs:     disease_code, sign_code [, weight]
+- disease_lab_tests: disease_code, lab_test_code [, weight]
+
+Las asociaciones referencian códigos del mismo paquete o ya existentes.
+
+Proceso:
+
+1. Se valida el paquete completo (campos, longitudes, duplicados y
+   referencias) y se reportan todos los errores juntos; si hay alguno no se
+   escribe nada.
+2. Cada sección se inserta o actualiza por código con una sola sentencia
+   ejecutada sobre todas sus filas (`INSERT ... ON CONFLICT DO UPDATE` en
+   SQLite/PostgreSQL, `ON DUPLICATE KEY UPDATE` en MySQL). Los elementos
+   eliminados que vuelven a importarse se restauran (deleted_at vacío e
+   is_active verdadero, salvo que el paquete indique is_active); los demás
+   conservan su is_active si el paquete no lo incluye.
+3. Al confirmar, la versión del catálogo se incrementa una sola vez y se
+   invalidan los cachés de conteos y de respuestas de los catálogos.
+
+Estas invalidaciones solo alcanzan al proceso que importó. Los demás workers
+(y el servidor, si se importa con `flask catalog import`) ven el paquete:
+
+- en la base de conocimiento y el autocompletado, al detectar el cambio de la
+  huella del catálogo (filas con `updated_at` nuevo, más las enfermedades
+  cuyas asociaciones cambiaron): a lo sumo `KB_VERSION_CHECK_INTERVAL`
+  segundos después;
+- en las respuestas y conteos de los catálogos, al vencer
+  `RESPONSE_CACHE_TTL` y `COUNT_CACHE_TTL`.
+"""
+
+import csv
+import io
+import json
+import math
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+from sqlalchemy import and_, bindparam, case, select, true
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app.extensions import db
+from app.models.folding import fold_text, folded_columns
+from app.models.medical_knowledge import (
+    Disease, Symptom, Sign, LabTest,
+    disease_symptoms, disease_signs, disease_lab_tests
+)
+from app.services.count_cache import count_cache
+from app.services.inference import invalidate_knowledge_base
+from app.services.response_cache import response_cache
+
+# Errores incluidos en la respuesta cuando el paquete no es válido
+MAX_REPORTED_ERRORS = 100
+
+# Códigos por consulta al buscar elementos existentes
+LOOKUP_CHUNK = 500
+
+Pack = Dict[str, List[Any]]
+
+
+class CatalogSection(NamedTuple):
+    model: type
+    required: Tuple[str, ...]
+    optional: Tuple[str, ...]
+
+
+class AssociationSection(NamedTuple):
+    table: Any
+    catalog: str  # Sección de los elementos asociados
+    code_field: str  # Campo del paquete con el código del elemento
+    item_column: str  # Columna de la tabla de asociación con su id
+
+
+CATALOG_SECTIONS: Dict[str, CatalogSection] = {
+    'symptoms': CatalogSection(Symptom, ('code', 'name', 'category'), ('description', 'is_active')),
+    'signs': CatalogSection(Sign, ('code', 'name', 'category'),
+                            ('description', 'measurement_unit', 'normal_range', 'is_active')),
+    'lab_tests': CatalogSection(LabTest, ('code', 'name', 'category'),
+                                ('description', 'normal_range', 'unit', 'is_active')),
+    'diseases': CatalogSection(Disease, ('code', 'name', 'category'),
+                               ('description', 'severity', 'treatment_recommendations',
+                                'prevention_measures', 'is_active')),
+}
+
+ASSOCIATION_SECTIONS: Dict[str, AssociationSection] = {
+    'disease_symptoms': AssociationSection(disease_symptoms, 'symptoms', 'symptom_code', 'symptom_id'),
+    'disease_signs': AssociationSection(disease_signs, 'signs', 'sign_code', 'sign_id'),
+    'disease_lab_tests': AssociationSection(disease_lab_tests, 'lab_tests', 'lab_test_code', 'lab_test_id'),
+}
+
+SECTIONS = tuple(CATALOG_SECTIONS) + tuple(ASSOCIATION_SECTIONS)
+
+_TRUE = ('1', 'true', 'si', 'sí', 'yes')
+_FALSE = ('0', 'false', 'no')
+
+
+class CatalogImportError(ValueError):
+    """El paquete no es válido; `errors` detalla cada problema (sección, fila, campo, mensaje)."""
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        self.errors = errors[:MAX_REPORTED_ERRORS]
+        self.total = len(errors)
+        super().__init__(f'El paquete tiene {self.total} error(es); no se importó nada')
+
+
+def _error(section: Optional[str], row: Optional[int], field: Optional[str], message: str) -> Dict[str, Any]:
+    return {'section': section, 'row': row, 'field': field, 'message': message}
+
+
+# ==================== LECTURA ====================
+
+def pack_from_json(data: Any) -> Pack:
+    """Paquete a partir de un objeto JSON (ya decodificado, texto o bytes)."""
+    if isinstance(data, (bytes, str)):
+        try:
+            data = json.loads(data)
+        except ValueError as e:
+            raise CatalogImportError([_error(None, None, None, f'JSON inválido: {e}')])
+    if not isinstance(data, dict):
+        raise CatalogImportError([_error(None, None, None, 'El paquete debe ser un objeto JSON con una lista por sección')])
+
+    errors = [
+        _error(section, None, None, f"Sección desconocida. Opciones: {', '.join(SECTIONS)}")
+        for section in data if section not in SECTIONS
+    ]
+    errors.extend(
+        _error(section, None, None, 'La sección debe ser una lista')
+        for section in SECTIONS if section in data and not isinstance(data[section], list)
+    )
+    if errors:
+        raise CatalogImportError(errors)
+    return {section: data[section] for section in SECTIONS if section in data}
+
+
+def pack_from_csv(section: str, content: Any) -> Pack:
+    """Paquete con una sola sección leída de un CSV; las celdas vacías se toman como ausentes."""
+    if section not in SECTIONS:
+        raise CatalogImportError([_error(section, None, None, f"Sección desconocida. Opciones: {', '.join(SECTIONS)}")])
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+    reader = csv.DictReader(io.StringIO(content))
+    rows = [
+        {field.strip(): value for field, value in row.items() if field and value not in (None, '')}
+        for row in reader
+    ]
+    return {section: rows}
+
+
+def read_pack_file(filename: str, content: Any, section: Optional[str] = None) -> Pack:
+    """Paquete de un archivo `.json`, o de un CSV de la sección `section` (por omisión, el nombre del archivo)."""
+    stem, extension = os.path.splitext(os.path.basename(filename or ''))
+    if extension.lower() == '.json':
+        return pack_from_json(content)
+    return pack_from_csv(section or stem, content)
+
+
+def merge_packs(packs: Iterable[Pack]) -> Pack:
+    """Une varios paquetes concatenando las filas de cada sección."""
+    merged: Pack = {}
+    for pack in packs:
+        for section, rows in pack.items():
+            merged.setdefault(section, []).extend(rows)
+    return merged
+
+
+# ==================== VALIDACIÓN ====================
+
+class _PreparedPack(NamedTuple):
+    catalog: Dict[str, List[Dict[str, Any]]]  # Filas normalizadas por sección
+    columns: Dict[str, Tuple[str, ...]]  # Campos presentes por sección
+    associations: Dict[str, List[Dict[str, Any]]]  # {'disease_code', 'item_code', 'weight'}
+    summary: Dict[str, Dict[str, int]]
+
+
+def _chunks(values: Sequence[Any], size: int = LOOKUP_CHUNK) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _existing_codes(model: type, codes: Iterable[str]) -> Dict[str, bool]:
+    """Códigos de `codes` que ya existen en la tabla de `model` -> si están eliminados."""
+    codes = sorted(set(codes))
+    found: Dict[str, bool] = {}
+    for chunk in _chunks(codes):
+        found.update(db.session.execute(
+            select(model.code, model.deleted_at.isnot(None)).where(model.code.in_(chunk))
+        ).all())
+    return found
+
+
+def _existing_pairs(association: AssociationSection, disease_codes: Iterable[str]) -> Set[Tuple[str, str]]:
+    """Pares (enfermedad, código del elemento) ya asociados para las enfermedades dadas."""
+    model = CATALOG_SECTIONS[association.catalog].model
+    table = association.table
+    codes = sorted(set(disease_codes))
+    found: Set[Tuple[str, str]] = set()
+    for chunk in _chunks(codes):
+        found.update(tuple(row) for row in db.session.execute(
+            select(table.c.disease_code, model.code)
+            .join(model, model.id == table.c[association.item_column])
+            .where(table.c.disease_code.in_(chunk))
+        ))
+    return found
+
+
+def _text(value: Any, max_length: Optional[int]) -> Tuple[Optional[str], Optional[str]]:
+    """(texto normalizado, mensaje de error)."""
+    if value is None:
+        return None, None
+    if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+        return None, 'Debe ser texto'
+    value = str(value).strip()
+    if max_length and len(value) > max_length:
+        return None, f'Excede {max_length} caracteres'
+    return value or None, None
+
+
+def _flag(value: Any) -> Tuple[Optional[bool], Optional[str]]:
+    if isinstance(value, bool):
+        return value, None
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True, None
+    if text in _FALSE:
+        return False, None
+    return None, "Debe ser 'true' o 'false'"
+
+
+def _weight(value: Any) -> Tuple[Optional[float], Optional[str]]:
+    if value is None:
+        return 1.0, None
+    try:
+        weight = float(value)
+    except (TypeError, ValueError):
+        return None, 'Debe ser un número'
+    if isinstance(value, bool) or not math.isfinite(weight) or weight <= 0:
+        return None, 'Debe ser un número positivo'
+    return weight, None
+
+
+def _validate_catalog(section: str, spec: CatalogSection, rows: List[Any],
+                      errors: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], Tuple[str, ...]]:
+    columns = spec.model.__table__.c
+    allowed = spec.required + spec.optional
+    present = [field for field in spec.optional if any(isinstance(row, dict) and field in row for row in rows)]
+    prepared = []
+    seen: Set[str] = set()
+
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(_error(section, number, None, 'La fila debe ser un objeto'))
+            continue
+        for field in row:
+            if field not in allowed:
+                errors.append(_error(section, number, field, 'Campo desconocido'))
+
+        values: Dict[str, Any] = {}
+        for field in spec.required + tuple(present):
+            raw = row.get(field)
+            if field == 'is_active':
+                value, message = (True, None) if raw is None else _flag(raw)
+            else:
+                value, message = _text(raw, getattr(columns[field].type, 'length', None))
+                if message is None and value is None and field in spec.required:
+                    message = 'Campo requerido'
+            if message:
+                errors.append(_error(section, number, field, message))
+            values[field] = value
+
+        code = values.get('code')
+        if code is not None:
+            if code in seen:
+                errors.append(_error(section, number, 'code', f'Código duplicado en el paquete: {code}'))
+            seen.add(code)
+        prepared.append(values)
+
+    return prepared, spec.required + tuple(present)
+
+
+def _validate_association(section: str, spec: AssociationSection, rows: List[Any],
+                          errors: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    allowed = ('disease_code', spec.code_field, 'weight')
+    prepared = []
+    seen: Set[Tuple[str, str]] = set()
+
+    for number, row in enumerate(rows, start=1):
+        if not isinstance(row, dict):
+            errors.append(_error(section, number, None, 'La fila debe ser un objeto'))
+            continue
+        for field in row:
+            if field not in allowed:
+                errors.append(_error(section, number, field, 'Campo desconocido'))
+
+        values: Dict[str, Any] = {}
+        for field, key in (('disease_code', 'disease_code'), (spec.code_field, 'item_code')):
+            value, message = _text(row.get(field), 20)
+            if message is None and value is None:
+                message = 'Campo requerido'
+            if message:
+                errors.append(_error(section, number, field, message))
+            values[key] = value
+        values['weight'], message = _weight(row.get('weight'))
+        if message:
+            errors.append(_error(section, number, 'weight', message))
+
+        pair = (values['disease_code'], values['item_code'])
+        if None not in pair:
+            if pair in seen:
+                errors.append(_error(section, number, None, f'Asociación duplicada en el paquete: {pair[0]}–{pair[1]}'))
+            seen.add(pair)
+        values['row'] = number
+        prepared.append(values)
+
+    return prepared
+
+
+def validate_pack(pack: Pack) -> _PreparedPack:
+    """Valida el paquete completo contra sí mismo y la base de datos; lanza `CatalogImportError`."""
+    errors: List[Dict[str, Any]] = []
+    catalog, columns, associations = {}, {}, {}
+
+    for section, spec in CATALOG_SECTIONS.items():
+        if section in pack:
+            catalog[section], columns[section] = _validate_catalog(section, spec, pack[section], errors)
+    for section, spec in ASSOCIATION_SECTIONS.items():
+        if section in pack:
+            associations[section] = _validate_association(section, spec, pack[section], errors)
+
+    if not any(catalog.values()) and not any(associations.values()):
+        errors.append(_error(None, None, None, f"El paquete está vacío. Secciones: {', '.join(SECTIONS)}"))
+        raise CatalogImportError(errors)
+
+    # Códigos del paquete y existentes, por sección del catálogo
+    summary: Dict[str, Dict[str, int]] = {}
+    known: Dict[str, Set[str]] = {}
+    for section, spec in CATALOG_SECTIONS.items():
+        packed = {row['code'] for row in catalog.get(section, [])} - {None}
+        referenced = set()
+        if section == 'diseases':
+            referenced = {row['disease_code'] for rows in associations.values() for row in rows}
+        for assoc_section, assoc in ASSOCIATION_SECTIONS.items():
+            if assoc.catalog == section:
+                referenced.update(row['item_code'] for row in associations.get(assoc_section, []))
+        existing = _existing_codes(spec.model, packed | (referenced - {None}))
+        known[section] = packed | set(existing)
+        if section in catalog:
+            restored = {code for code in packed if existing.get(code)}
+            summary[section] = {
+                'inserted': len(packed - set(existing)),
+                'updated': len(packed & set(existing)) - len(restored),
+                'restored': len(restored),
+            }
+
+    for section, spec in ASSOCIATION_SECTIONS.items():
+        rows = associations.get(section)
+        if rows is None:
+            continue
+        for row in rows:
+            if row['disease_code'] not in known['diseases'] | {None}:
+                errors.append(_error(section, row['row'], 'disease_code',
+                                     f"Enfermedad no encontrada: {row['disease_code']}"))
+            if row['item_code'] not in known[spec.catalog] | {None}:
+                errors.append(_error(section, row['row'], spec.code_field,
+                                     f"Código no encontrado: {row['item_code']}"))
+        existing = _existing_pairs(spec, {row['disease_code'] for row in rows} - {None})
+        updated = sum(1 for row in rows if (row['disease_code'], row['item_code']) in existing)
+        summary[section] = {'inserted': len(rows) - updated, 'updated': updated}
+
+    if errors:
+        raise CatalogImportError(errors)
+    return _PreparedPack(catalog, columns, associations, summary)
+
+
+# ==================== ESCRITURA ====================
+
+def _upsert(table, rows: List[Dict[str, Any]], keys: Sequence[str], update_columns: Sequence[str],
+            overrides: Optional[Dict[str, Callable[[Any], Any]]] = None) -> None:
+    """
+    Inserta o actualiza (por `keys`) todas las filas con una sola sentencia.
+    `overrides` da, por columna, la expresión del SET a partir del valor
+    nuevo; sus columnas del lado derecho ven la fila existente, por lo que
+    deben ir en `update_columns` antes de las que modifican (MySQL asigna en orden).
+    """
+    if not rows:
+        return
+    overrides = overrides or {}
+
+    def assignments(new_value):
+        return {
+            column: overrides[column](new_value(column)) if column in overrides else new_value(column)
+            for column in update_columns
+        }
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite.insert if dialect == 'sqlite' else postgresql.insert)(table)
+        statement = insert.on_conflict_do_update(
+            index_elements=list(keys), set_=assignments(lambda column: insert.excluded[column])
+        )
+        db.session.execute(statement, rows)
+        return
+    if dialect in ('mysql', 'mariadb'):
+        insert = mysql.insert(table)
+        statement = insert.on_duplicate_key_update(assignments(lambda column: insert.inserted[column]))
+        db.session.execute(statement, rows)
+        return
+
+    # Otros motores: UPDATE de las filas existentes e INSERT del resto
+    existing = set()
+    for chunk in _chunks(rows):
+        condition = [table.c[key].in_({row[key] for row in chunk}) for key in keys]
+        existing.update(db.session.execute(select(*(table.c[key] for key in keys)).where(and_(*condition))).tuples())
+    new_rows = [row for row in rows if tuple(row[key] for key in keys) not in existing]
+    old_rows = [
+        {f'_{column}': value for column, value in row.items()}
+        for row in rows if tuple(row[key] for key in keys) in existing
+    ]
+    if new_rows:
+        db.session.execute(table.insert(), new_rows)
+    if old_rows:
+        db.session.execute(
+            table.update()
+            .where(and_(*(table.c[key] == bindparam(f'_{key}') for key in keys)))
+            .values(assignments(lambda column: bindparam(f'_{column}'))),
+            old_rows
+        )
+
+
+def _item_ids(model: type, codes: Iterable[str]) -> Dict[str, int]:
+    codes = sorted(set(codes))
+    ids: Dict[str, int] = {}
+    for chunk in _chunks(codes):
+        ids.update(db.session.execute(select(model.code, model.id).where(model.code.in_(chunk))).all())
+    return ids
+
+
+def _write_pack(prepared: _PreparedPack) -> Set[str]:
+    """Escribe el paquete validado en la sesión actual; retorna las tablas modificadas."""
+    now = datetime.utcnow()
+    tables: Set[str] = set()
+
+    for section, rows in prepared.catalog.items():
+        model = CATALOG_SECTIONS[section].model
+        folded = folded_columns(model)
+        records = []
+        for row in rows:
+            record = dict(row, created_at=now, updated_at=now, deleted_at=None)
+            for source, target in folded:
+                record[target] = fold_text(row[source])
+            records.append(record)
+        update_columns = [c for c in prepared.columns[section] if c != 'code']
+        update_columns += [target for _, target in folded] + ['updated_at']
+        overrides = {}
+        if 'is_active' not in update_columns:
+            # Sin is_active en el paquete: solo se reactivan los eliminados (antes de limpiar deleted_at)
+            table = model.__table__
+            update_columns.append('is_active')
+            overrides['is_active'] = lambda new: case((table.c.deleted_at.isnot(None), true()),
+                                                      else_=table.c.is_active)
+        update_columns.append('deleted_at')
+        _upsert(model.__table__, records, ['code'], update_columns, overrides)
+        if records:
+            tables.add(model.__tablename__)
+
+    touched_diseases: Set[str] = set()
+    for section, rows in prepared.associations.items():
+        if not rows:
+            continue
+        spec = ASSOCIATION_SECTIONS[section]
+        ids = _item_ids(CATALOG_SECTIONS[spec.catalog].model, (row['item_code'] for row in rows))
+        records = [
+            {'disease_code': row['disease_code'], spec.item_column: ids[row['item_code']],
+             'weight': row['weight'], 'created_at': now}
+            for row in rows
+        ]
+        _upsert(spec.table, records, ['disease_code', spec.item_column], ['weight'])
+        touched_diseases.update(row['disease_code'] for row in rows)
+        tables.add(spec.table.name)
+
+    # Un cambio de pesos modifica la enfermedad: actualiza su updated_at (validadores ETag/Last-Modified)
+    touched_diseases -= {row['code'] for row in prepared.catalog.get('diseases', [])}
+    diseases = Disease.__table__
+    for chunk in _chunks(sorted(touched_diseases)):
+        db.session.execute(diseases.update().where(diseases.c.code.in_(chunk)).values(updated_at=now))
+    if touched_diseases:
+        tables.add(diseases.name)
+
+    return tables
+
+
+def import_catalog(pack: Pack, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Valida e importa el paquete en una transacción. Retorna, por sección,
+    cuántas filas se insertan, se actualizan y (en el catálogo) se restauran
+    tras haber sido eliminadas. Con `dry_run` solo valida.
+    """
+    prepared = validate_pack(pack)
+    if dry_run:
+        db.session.rollback()
+        return prepared.summary
+
+    try:
+        tables = _write_pack(prepared)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Las sentencias masivas no pasan por los eventos del ORM: invalidación explícita, una vez.
+    # Solo en este proceso; los demás siguen la huella del catálogo (ver el docstring del módulo)
+    count_cache.invalidate_tables(tables)
+    response_cache.invalidate(*CATALOG_SECTIONS)
+    invalidate_knowledge_base()
+    return prepared.summary
@@ -0,0 +1,141 @@
+"""
+Peticiones Condicionales (ETag / Last-Modified)
+===============================================
+
+Validadores baratos para responder `304 Not Modified` sin cargar ni serializar
+filas:
+
+- Catálogos: `table_versions(...)` obtiene en una sola consulta el máximo
+  `updated_at` (o `created_at` en tablas sin él, como las de asociación) y el
+  número de filas de cada tabla de la que depende la respuesta. El conteo
+  detecta borrados, que no dejan rastro en `updated_at`.
+- Detalles: la ruta arma el validador con los `updated_at` de las filas que
+  ya cargó para verificar permisos.
+
+El ETag (débil) combina el validador con la ruta y los parámetros de la
+petición, porque distintos filtros producen cuerpos distintos. Se prefiere
+`If-None-Match`; `If-Modified-Since` solo se usa si el cliente no envía ETag.
+Las respuestas llevan `Cache-Control: private, no-cache` para que el navegador
+las guarde y las revalide en cada uso.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+from flask import request, current_app
+from sqlalchemy import func, inspect, select
+from app.extensions import db
+
+Validator = Tuple[Sequence[Any], Optional[datetime]]
+
+
+def table_versions(*tables) -> Validator:
+    """
+    (partes del validador, última modificación) de las tablas o modelos dados,
+    en una sola consulta. Cada elemento puede ser también un par
+    (tabla, condición) para considerar solo las filas que la cumplen.
+    """
+    columns = []
+    for table in tables:
+        table, condition = table if isinstance(table, tuple) else (table, None)
+        table = getattr(table, '__table__', table)
+        stamp = table.c.updated_at if 'updated_at' in table.c else table.c.created_at
+        latest = select(func.max(stamp))
+        count = select(func.count()).select_from(table)
+        if condition is not None:
+            latest, count = latest.where(condition), count.where(condition)
+        columns.extend((latest.scalar_subquery(), count.scalar_subquery()))
+    row = db.session.execute(select(*columns)).one()
+    stamps = [value for value in row[0::2] if value is not None]
+    return tuple(row), max(stamps) if stamps else None
+
+
+def combine(*validators: Validator) -> Validator:
+    """Une varios validadores en uno."""
+    parts = tuple(part for validator in validators for part in validator[0])
+    stamps = [validator[1] for validator in validators if validator[1] is not None]
+    return parts, max(stamps) if stamps else None
+
+
+def row_versions(*rows) -> Validator:
+    """Validador a partir de filas ya cargadas (clave primaria + updated_at)."""
+    parts: List[Any] = []
+    stamps = []
+    for row in rows:
+        if row is None:
+            parts.append(None)
+            continue
+        stamp = getattr(row, 'updated_at', None)
+        parts.extend((type(row).__name__, inspect(row).identity, stamp))
+        if stamp is not None:
+            stamps.append(stamp)
+    return tuple(parts), max(stamps) if stamps else None
+
+
+def make_etag(parts: Iterable[Any]) -> str:
+    """ETag para el validador y la petición actual (ruta + parámetros normalizados)."""
+    args = sorted(request.args.items(multi=True))
+    raw = repr((request.path, args, tuple(parts)))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _as_http_datetime(value: Optional[datetime]) -> Optional[datetime]:
+    """Las fechas se guardan en UTC sin zona; Last-Modified tiene resolución de segundos."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=timezone.utc, microsecond=0)
+
+
+def is_not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """True si los validadores del cliente coinciden con los actuales."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return bool(since and last_modified and last_modified <= since)
+
+
+def set_validators(response, etag: str, last_modified: Optional[datetime]):
+    """Agrega ETag, Last-Modified y Cache-Control a una respuesta."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime]):
+    response = current_app.response_class(status=304)
+    return set_validators(response, etag, last_modified)
+
+
+def conditional_response(validator: Validator, build: Callable[[], Any]):
+    """
+    Responde 304 si el cliente tiene la versión actual; si no, construye la
+    respuesta con `build()` y le agrega los validadores (solo si es 200).
+    """
+    parts, last_modified = validator
+    etag = make_etag(parts)
+    last_modified = _as_http_datetime(last_modified)
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+
+    response = current_app.make_response(build())
+    if response.status_code == 200:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def conditional_on_tables(*tables):
+    """
+    Decorador para vistas cuya respuesta depende solo de `tables`: el validador
+    se calcula antes de ejecutar la vista, que no corre si la respuesta es 304.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return conditional_response(table_versions(*tables), lambda: view(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -0,0 +1,199 @@
+"""
+Caché de Conteos de Listados
+============================
+
+Caché en proceso de los `total_count` de los listados paginados. La clave es la
+consulta de conteo ya compilada (SQL + parámetros), de modo que el alcance del
+usuario (p. ej. `doctor_id`) y el conjunto de filtros forman parte de ella sin
+que cada ruta tenga que construirla.
+
+Cada entrada guarda la "generación" de las tablas que consulta. Una escritura
+en cualquiera de esas tablas incrementa su generación y deja la entrada
+obsoleta; también queda obsoleta al vencer `COUNT_CACHE_TTL`. Las entradas
+obsoletas no se usan para conteos exactos, pero siguen sirviendo como
+estimación (`count=estimate`) hasta que el LRU las desaloja.
+
+Invalidación por eventos de SQLAlchemy (mismo esquema que `evidence_cache`):
+- `after_flush`: se invalidan las tablas de los objetos nuevos, modificados o
+  eliminados, y se recuerdan en la sesión.
+- `after_commit`: se invalidan de nuevo, por si otra sesión contó entre el
+  flush y el commit.
+
+Las escrituras que no pasan por la unidad de trabajo del ORM (SQL directo,
+`executemany`) deben llamar a `count_cache.invalidate_tables`.
+
+Configuración (ver `BaseConfig`):
+    COUNT_CACHE_TTL: Segundos que un conteo se considera exacto; 0 desactiva el caché.
+    COUNT_CACHE_SIZE: Máximo de conteos en caché.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+logger = logging.getLogger(__name__)
+
+# Clave de `session.info` con las tablas modificadas en la transacción
+PENDING_TABLES_KEY = 'count_pending_tables'
+
+CountKey = Tuple[str, Tuple[Tuple[str, Any], ...]]
+
+
+class _CachedCount(NamedTuple):
+    count: int
+    stored_at: float
+    generations: Tuple[Tuple[str, int], ...]
+
+
+class CountCache:
+    """LRU de conteos por consulta compilada, con TTL e invalidación por tabla."""
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 2048):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: 'OrderedDict[CountKey, _CachedCount]' = OrderedDict()
+        self._table_generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _snapshot(self, tables: Iterable[str]) -> Tuple[Tuple[str, int], ...]:
+        return tuple(sorted((t, self._table_generations.get(t, 0)) for t in tables))
+
+    def _is_fresh(self, entry: _CachedCount) -> bool:
+        if time.monotonic() - entry.stored_at >= self.ttl:
+            return False
+        return all(self._table_generations.get(t, 0) == g for t, g in entry.generations)
+
+    def count(self, query, estimate: bool = False,
+              estimator: Optional[Callable[[Any], Optional[int]]] = None) -> Tuple[int, bool]:
+        """
+        Total de filas de `query`, desde el caché si es posible.
+
+        Con `estimate`, se acepta un conteo obsoleto o la estimación de
+        `estimator(query)` antes de contar. Retorna (total, es_estimado).
+        """
+        if self.ttl <= 0 or self.max_size <= 0:
+            return query.count(), False
+
+        statement = query.statement
+        compiled = statement.compile(dialect=query.session.get_bind().dialect)
+        key: CountKey = (str(compiled), tuple(sorted(compiled.params.items())))
+        tables = {t.name for t in find_tables(statement, include_joins=True)}
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if self._is_fresh(entry):
+                    self.hits += 1
+                    return entry.count, False
+                if estimate:
+                    self.hits += 1
+                    return entry.count, True
+            self.misses += 1
+            # Tomada antes de contar: una escritura concurrente deja la entrada obsoleta
+            generations = self._snapshot(tables)
+
+        if estimate and estimator is not None:
+            estimated = estimator(query)
+            if estimated is not None:
+                return estimated, True
+
+        total = query.count()
+        with self._lock:
+            self._entries[key] = _CachedCount(total, time.monotonic(), generations)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return total, False
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        """Deja obsoletos los conteos que consultan alguna de las tablas."""
+        with self._lock:
+            for table in tables:
+                self._table_generations[table] = self._table_generations.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def planner_estimate(query) -> Optional[int]:
+    """
+    Filas estimadas por el planificador para `query` (solo PostgreSQL, vía
+    `EXPLAIN`). None si el motor no lo soporta o la estimación falla.
+    """
+    bind = query.session.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return None
+    try:
+        compiled = query.statement.compile(dialect=bind.dialect)
+        plan = query.session.connection().exec_driver_sql(
+            'EXPLAIN (FORMAT JSON) ' + str(compiled), compiled.params
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        logger.debug("No se pudo estimar el conteo con EXPLAIN", exc_info=True)
+        return None
+
+
+# Caché del proceso (TTL y tamaño se ajustan en `init_count_cache`)
+count_cache = CountCache()
+
+
+def init_count_cache(app) -> CountCache:
+    """Configura el caché de conteos y lo registra en `app.extensions['count_cache']`."""
+    count_cache.ttl = app.config.get('COUNT_CACHE_TTL', 30.0)
+    count_cache.max_size = app.config.get('COUNT_CACHE_SIZE', 2048)
+    count_cache.clear()
+    app.extensions['count_cache'] = count_cache
+    return count_cache
+
+
+# ==================== INVALIDACIÓN POR EVENTOS ====================
+
+@event.listens_for(Session, 'after_flush')
+def _track_table_changes(session, flush_context):
+    """Invalida los conteos de las tablas escritas en el flush."""
+    tables = {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, '__table__')
+    }
+    if tables:
+        session.info.setdefault(PENDING_TABLES_KEY, set()).update(tables)
+        count_cache.invalidate_tables(tables)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_counts_on_commit(session):
+    tables = session.info.pop(PENDING_TABLES_KEY, None)
+    if tables:
+        count_cache.invalidate_tables(tables)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_tables(session):
+    session.info.pop(PENDING_TABLES_KEY, None)
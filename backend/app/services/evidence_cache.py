@@ -0,0 +1,187 @@
+"""
+Caché de Evidencia por Paciente
+===============================
+
+Caché en proceso, acotado (LRU), de la evidencia compilada (`PatientEvidence`)
+por (paciente, visita). Evita reconstruir la evidencia desde los logs atómicos
+en cada inferencia o explicación.
+
+Invalidación por eventos de SQLAlchemy:
+- `after_flush`: cualquier log de síntomas, signos o laboratorios nuevo,
+  modificado o eliminado invalida las entradas de su paciente y marca al
+  paciente como pendiente en la sesión. Mientras la transacción no se confirme,
+  las lecturas de ese paciente en esa sesión no usan ni llenan el caché (verían
+  logs que otras sesiones aún no ven).
+- `after_commit`: se invalida de nuevo, por si otra sesión guardó la versión
+  anterior entre el flush y el commit.
+- `after_rollback`: se descartan los pacientes pendientes.
+
+Estos eventos solo alcanzan al proceso que escribió. Para que otros workers no
+sirvan evidencia obsoleta, cada entrada guarda la huella de los logs del
+paciente con la que se cargó (`patient_evidence_version`: última creación y
+número de filas de las tres tablas de logs, en una sola consulta indexada por
+`patient_id`), y un acierto solo se usa si la huella actual coincide.
+
+Las evidencias en caché se comparten entre peticiones: son de solo lectura.
+
+Configuración (ver `BaseConfig`):
+    EVIDENCE_CACHE_SIZE: Máximo de entradas (paciente, visita); 0 lo desactiva.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple, Callable
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.medical_knowledge import PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog
+from app.modules.evidence import PatientEvidence
+from app.services.conditional import table_versions
+
+# Modelos cuyo cambio invalida la evidencia del paciente
+EVIDENCE_MODELS = (PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog)
+
+# Clave de `session.info` con los pacientes cuyos logs cambiaron en la transacción
+PENDING_PATIENTS_KEY = 'evidence_pending_patients'
+
+CacheKey = Tuple[int, Optional[str]]
+
+
+class EvidenceCache:
+    """LRU de `PatientEvidence` por (patient_id, visit_id), seguro entre hilos."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        # Clave -> (huella de los logs al cargar, evidencia)
+        self._entries: 'OrderedDict[CacheKey, Tuple[Any, PatientEvidence]]' = OrderedDict()
+        self._keys_by_patient: Dict[int, Set[CacheKey]] = {}
+        self._lock = threading.Lock()
+        # Se incrementa en cada invalidación: una carga que empezó antes de una
+        # invalidación no se guarda (podría traer datos ya obsoletos)
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, patient_id: int, visit_id: Optional[str],
+                    loader: Callable[[], PatientEvidence],
+                    version: Optional[Callable[[], Any]] = None) -> PatientEvidence:
+        """
+        Retorna la evidencia en caché o la carga con `loader` y la guarda.
+
+        `version` calcula la huella actual de los datos del paciente; una
+        entrada guardada con otra huella se descarta y se vuelve a cargar.
+        """
+        if self.max_size <= 0:
+            return loader()
+
+        key = (patient_id, visit_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+
+        # La huella se toma antes de cargar: un cambio posterior deja la entrada obsoleta
+        current = version() if version is not None else None
+        with self._lock:
+            if entry is not None and entry[0] == current and self._entries.get(key) is entry:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        evidence = loader()
+
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, (current, evidence))
+        return evidence
+
+    def _store(self, key: CacheKey, entry: Tuple[Any, PatientEvidence]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._keys_by_patient.setdefault(key[0], set()).add(key)
+        while len(self._entries) > self.max_size:
+            old_key, _ = self._entries.popitem(last=False)
+            self._forget_key(old_key)
+
+    def _forget_key(self, key: CacheKey) -> None:
+        keys = self._keys_by_patient.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_patient[key[0]]
+
+    def invalidate_patients(self, patient_ids) -> None:
+        """Elimina todas las visitas en caché de los pacientes indicados."""
+        with self._lock:
+            self._generation += 1
+            for patient_id in patient_ids:
+                for key in self._keys_by_patient.pop(patient_id, ()):
+                    self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_patient.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Caché del proceso (el tamaño se ajusta en `init_evidence_cache`)
+evidence_cache = EvidenceCache()
+
+
+def init_evidence_cache(app) -> EvidenceCache:
+    """Configura el tamaño del caché y lo registra en `app.extensions['evidence_cache']`."""
+    evidence_cache.max_size = app.config.get('EVIDENCE_CACHE_SIZE', 1024)
+    if evidence_cache.max_size <= 0:
+        evidence_cache.clear()
+    app.extensions['evidence_cache'] = evidence_cache
+    return evidence_cache
+
+
+def patient_evidence_version(patient_id: int) -> Tuple[Any, ...]:
+    """Huella de los logs del paciente (última creación y filas por tabla), en una consulta."""
+    parts, _ = table_versions(*((model, model.patient_id == patient_id) for model in EVIDENCE_MODELS))
+    return parts
+
+
+def has_pending_evidence(session, patient_id: int) -> bool:
+    """True si la sesión tiene cambios sin confirmar en los logs del paciente."""
+    return patient_id in session.info.get(PENDING_PATIENTS_KEY, ())
+
+
+# ==================== INVALIDACIÓN POR EVENTOS ====================
+
+@event.listens_for(Session, 'after_flush')
+def _track_evidence_changes(session, flush_context):
+    """Invalida la evidencia de los pacientes cuyos logs cambiaron en el flush."""
+    patient_ids = {
+        obj.patient_id
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if isinstance(obj, EVIDENCE_MODELS)
+    }
+    if patient_ids:
+        session.info.setdefault(PENDING_PATIENTS_KEY, set()).update(patient_ids)
+        evidence_cache.invalidate_patients(patient_ids)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    patient_ids = session.info.pop(PENDING_PATIENTS_KEY, None)
+    if patient_ids:
+        evidence_cache.invalidate_patients(patient_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_evidence(session):
+    session.info.pop(PENDING_PATIENTS_KEY, None)
@@ -0,0 +1,127 @@
+"""
+Exportaciones en Streaming
+==========================
+
+Extractos completos de pacientes, diagnósticos y logs atómicos en NDJSON o CSV.
+
+Las filas se leen como tuplas de columnas (sin instanciar modelos ni llenar el
+identity map) con `yield_per`, que en PostgreSQL/MySQL usa un cursor del lado
+del servidor, y se emiten en bloques de `EXPORT_CHUNK_ROWS` filas. La memoria
+del proceso no depende del número de filas exportadas.
+
+Alcance: un administrador exporta todo; un doctor, solo lo de sus pacientes.
+En ambos casos se excluyen los pacientes inactivos y, en los demás recursos,
+las filas de esos pacientes.
+"""
+
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, NamedTuple, Optional, Sequence
+from flask import current_app
+from sqlalchemy import select
+from app.extensions import db
+from app.models.diagnosis import Diagnosis
+from app.models.folding import FOLDED_FROM
+from app.models.patient import Patient
+from app.models.medical_knowledge import PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog
+
+# Filas por lote leído de la base de datos y por bloque de la respuesta
+EXPORT_YIELD_PER = 1000
+EXPORT_CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+class ExportSpec(NamedTuple):
+    model: type
+    date_column: Any  # Columna usada por date_from / date_to
+    patient_column: Any  # Columna con el id del paciente (alcance y filtro patient_id)
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    'patients': ExportSpec(Patient, Patient.created_at, Patient.id),
+    'diagnoses': ExportSpec(Diagnosis, Diagnosis.diagnosis_date, Diagnosis.patient_id),
+    'symptoms-logs': ExportSpec(PatientSymptomsLog, PatientSymptomsLog.recorded_at, PatientSymptomsLog.patient_id),
+    'signs-logs': ExportSpec(PatientSignsLog, PatientSignsLog.recorded_at, PatientSignsLog.patient_id),
+    'lab-results-logs': ExportSpec(PatientLabResultsLog, PatientLabResultsLog.recorded_at,
+                                   PatientLabResultsLog.patient_id),
+}
+
+
+def build_export_query(resource: str, doctor_id: Optional[int] = None, patient_id: Optional[int] = None,
+                       date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    """
+    SELECT de las columnas de la tabla del recurso (sin las normalizadas para
+    búsqueda), de pacientes activos, con el alcance del usuario (`doctor_id`
+    None = administrador) y los filtros opcionales, ordenado por clave primaria.
+    """
+    spec = EXPORTS[resource]
+    table = spec.model.__table__
+    query = select(*(c for c in table.columns if FOLDED_FROM not in c.info))
+
+    # Solo pacientes activos, en todos los recursos, para que los extractos sean consistentes entre sí
+    if spec.model is not Patient:
+        query = query.join(Patient, Patient.id == spec.patient_column)
+    query = query.where(Patient.is_active == True)
+    if doctor_id is not None:
+        query = query.where(Patient.doctor_id == doctor_id)
+
+    if patient_id is not None:
+        query = query.where(spec.patient_column == patient_id)
+    if date_from is not None:
+        query = query.where(spec.date_column >= date_from)
+    if date_to is not None:
+        query = query.where(spec.date_column <= date_to)
+    return query.order_by(*table.primary_key.columns)
+
+
+def iter_row_batches(query) -> Iterator[Sequence[Any]]:
+    """Filas de `query` en lotes de hasta `EXPORT_CHUNK_ROWS`, leídas con `yield_per`."""
+    result = db.session.execute(query.execution_options(yield_per=EXPORT_YIELD_PER))
+    try:
+        while True:
+            rows = result.fetchmany(EXPORT_CHUNK_ROWS)
+            if not rows:
+                break
+            yield rows
+    finally:
+        result.close()
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunks(query) -> Iterator[bytes]:
+    """Una línea JSON por fila; un bloque de bytes por lote."""
+    names = list(query.selected_columns.keys())
+    dumps = current_app.json.dumps
+    for rows in iter_row_batches(query):
+        yield ''.join(dumps(dict(zip(names, row))) + '\n' for row in rows).encode('utf-8')
+
+
+def csv_chunks(query) -> Iterator[bytes]:
+    """CSV con encabezado; un bloque de bytes por lote."""
+    names = list(query.selected_columns.keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in iter_row_batches(query):
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+EXPORT_WRITERS: Dict[str, Callable[[Any], Iterator[bytes]]] = {
+    'ndjson': ndjson_chunks,
+    'csv': csv_chunks,
+}
@@ -0,0 +1,314 @@
+"""
+Servicio de Inferencia
+======================
+
+Adaptadores entre la aplicación Flask y el motor de inferencia independiente
+(`app.modules`). Aquí vive todo lo que depende de `db.session` o del contexto
+de aplicación:
+
+- Una `KnowledgeBase` por proceso, cargada una sola vez y recargada cuando
+  cambia la versión del catálogo: de inmediato tras un commit propio que
+  toque enfermedades, síntomas, signos o pruebas de laboratorio, y para los
+  cambios de otros procesos al detectar que cambió la huella del catálogo en
+  la base de datos (revisada cada `KB_VERSION_CHECK_INTERVAL` segundos).
+- Recuperación de evidencia del paciente con la sesión de la petición, a
+  través del caché por (paciente, visita) de `app.services.evidence_cache`.
+- Recomendación de la siguiente prueba por ganancia de información.
+- Normalización de unidades y codificación de resultados cualitativos de
+  signos y laboratorios antes de registrarlos.
+- Recomendaciones de tratamiento.
+"""
+
+import heapq
+import threading
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from flask import current_app, has_app_context
+from app.extensions import db
+from app.models.medical_knowledge import (
+    Disease, Symptom, Sign, LabTest, disease_symptoms, disease_signs, disease_lab_tests
+)
+from app.modules.evidence import PatientEvidence
+from app.modules.inference_engine import InferenceEngine
+from app.modules.information_gain import rank_next_tests
+from app.modules.knowledge_base import KnowledgeBase
+from app.modules.loaders import load_knowledge_base, load_patient_evidence
+from app.services.conditional import table_versions
+from app.services.evidence_cache import evidence_cache, has_pending_evidence, patient_evidence_version
+
+# Modelos cuyo cambio invalida la base de conocimiento compilada
+KNOWLEDGE_MODELS = (Disease, Symptom, Sign, LabTest)
+# Tablas cuya huella (última modificación + filas) comparten todos los procesos
+KNOWLEDGE_TABLES = KNOWLEDGE_MODELS + (disease_symptoms, disease_signs, disease_lab_tests)
+
+_kb_lock = threading.Lock()
+_version_lock = threading.Lock()
+_kb_version = 0
+_kb_fingerprint: Optional[tuple] = None
+_kb_checked_at = float('-inf')
+_knowledge_base: Optional[KnowledgeBase] = None
+
+
+def _sync_shared_version() -> None:
+    """
+    Compara la huella del catálogo en la base de datos con la última vista por
+    este proceso, a lo sumo cada `KB_VERSION_CHECK_INTERVAL` segundos, e
+    incrementa la versión local si otro proceso (otro worker, la CLI) cambió
+    el catálogo. Un proceso ve los cambios ajenos con ese retraso máximo.
+    """
+    global _kb_version, _kb_fingerprint, _kb_checked_at
+    if not has_app_context():
+        return
+    interval = current_app.config.get('KB_VERSION_CHECK_INTERVAL', 5.0)
+    if time.monotonic() - _kb_checked_at < interval:
+        return
+
+    with _version_lock:
+        if time.monotonic() - _kb_checked_at < interval:
+            return
+        fingerprint, _ = table_versions(*KNOWLEDGE_TABLES)
+        if _kb_fingerprint is not None and fingerprint != _kb_fingerprint:
+            _kb_version += 1
+        _kb_fingerprint = fingerprint
+        _kb_checked_at = time.monotonic()
+
+
+def get_kb_version() -> int:
+    """
+    Versión actual del catálogo en este proceso; incluye los cambios de otros
+    procesos con a lo sumo `KB_VERSION_CHECK_INTERVAL` segundos de retraso.
+    """
+    _sync_shared_version()
+    return _kb_version
+
+
+def invalidate_knowledge_base() -> None:
+    """
+    Fuerza la recarga de la base de conocimiento en la próxima inferencia.
+
+    La huella se vuelve a registrar (sin otro incremento) en la próxima
+    consulta de la versión, antes de recargar, para que el cambio propio no
+    provoque una segunda recarga.
+    """
+    global _kb_version, _kb_fingerprint, _kb_checked_at
+    with _version_lock:
+        _kb_version += 1
+        _kb_fingerprint = None
+        _kb_checked_at = float('-inf')
+
+
+def get_knowledge_base() -> KnowledgeBase:
+    """
+    Retorna la base de conocimiento del proceso, cargándola si no existe o si
+    la versión del catálogo cambió desde la última carga.
+    """
+    global _knowledge_base
+    version = get_kb_version()
+    kb = _knowledge_base
+    if kb is not None and kb.version == version:
+        return kb
+
+    with _kb_lock:
+        version = _kb_version
+        if _knowledge_base is None or _knowledge_base.version != version:
+            _knowledge_base = load_knowledge_base(db.session, version=version)
+        return _knowledge_base
+
+
+def get_engine() -> InferenceEngine:
+    """Retorna un motor de inferencia sobre la base de conocimiento vigente."""
+    return InferenceEngine(get_knowledge_base())
+
+
+def get_patient_evidence(patient_id: int, visit_id: Optional[str] = None) -> PatientEvidence:
+    """
+    Recupera la evidencia del paciente usando la sesión de la petición actual
+    (incluye logs añadidos con flush pero aún no confirmados).
+
+    Si la sesión no tiene cambios pendientes en los logs del paciente, la
+    evidencia se sirve desde el caché del proceso, siempre que la huella de
+    sus logs no haya cambiado (escrituras de otros workers).
+    """
+    session = db.session()
+    if has_pending_evidence(session, patient_id):
+        return load_patient_evidence(session, patient_id, visit_id)
+    return evidence_cache.get_or_load(
+        patient_id, visit_id,
+        lambda: load_patient_evidence(session, patient_id, visit_id),
+        lambda: patient_evidence_version(patient_id)
+    )
+
+
+def normalize_measurement(kind: str, item_id: int, value_numeric: Optional[float],
+                          unit: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Convierte un valor de signo o laboratorio a la unidad canónica del catálogo
+    para guardarlo ya normalizado.
+
+    Args:
+        kind: 'signs' o 'labs'
+        item_id: ID del signo o de la prueba de laboratorio
+        value_numeric: Valor informado
+        unit: Unidad informada (vacía = unidad del catálogo)
+
+    Returns:
+        Tupla (valor, unidad) a guardar en el log
+
+    Raises:
+        UnitConversionError: Si la unidad no es convertible a la del catálogo
+    """
+    entry = getattr(get_knowledge_base(), kind).get(item_id)
+    if entry is None:
+        return value_numeric, unit
+    return entry.to_canonical(value_numeric, unit)
+
+
+def encode_qualitative(kind: str, item_id: int, value_text: Optional[str]) -> Optional[int]:
+    """
+    Codifica un resultado cualitativo de signo o laboratorio a su grado entero
+    (ver `app.modules.qualitative`) para guardarlo junto al texto.
+
+    Args:
+        kind: 'signs' o 'labs'
+        item_id: ID del signo o de la prueba de laboratorio
+        value_text: Resultado informado
+
+    Returns:
+        Grado entero, o None si no hay texto o no figura en el libro de códigos
+    """
+    entry = getattr(get_knowledge_base(), kind).get(item_id)
+    if entry is None:
+        return None
+    return entry.encode_qualitative(value_text)
+
+
+def diagnose_patient(patient_id: int, visit_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Recupera la evidencia del paciente y ejecuta el motor de inferencia.
+
+    Si la evaluación en sombra está activa y la petición cae en la muestra, el
+    motor candidato se encola en segundo plano con la misma evidencia.
+    """
+    evidence = get_patient_evidence(patient_id, visit_id)
+    knowledge_base = get_knowledge_base()
+
+    started = time.perf_counter()
+    result = InferenceEngine(knowledge_base).diagnose(evidence)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+    shadow = current_app.extensions.get('shadow_evaluator')
+    if shadow is not None and shadow.should_sample():
+        shadow.submit(knowledge_base, evidence, result, elapsed_ms)
+
+    return result
+
+
+def explain_disease(patient_id: int, visit_id: Optional[str], disease_code: str) -> Optional[Dict[str, Any]]:
+    """
+    Explica el score de una enfermedad frente a la evidencia de una visita.
+    Retorna None si la enfermedad no está activa en la base de conocimiento.
+    """
+    evidence = get_patient_evidence(patient_id, visit_id)
+    explanation = get_engine().explain(disease_code, evidence)
+    if explanation is not None:
+        explanation['patient_id'] = patient_id
+        explanation['visit_id'] = visit_id
+    return explanation
+
+
+def build_evidence(patient_id: Optional[int], symptoms: List[Dict[str, Any]],
+                   signs: List[Dict[str, Any]], lab_results: List[Dict[str, Any]]) -> PatientEvidence:
+    """
+    Construye evidencia sin registrarla, a partir del mismo formato de cuerpo
+    que `POST /api/diagnoses`, con las unidades normalizadas y los resultados
+    cualitativos codificados igual que al guardarlos.
+
+    Raises:
+        UnitConversionError: Si alguna unidad no es convertible a la del catálogo
+    """
+    evidence = PatientEvidence(patient_id=patient_id, symptoms=(s['symptom_id'] for s in symptoms))
+    for kind, items, id_field, observed in (('signs', signs, 'sign_id', evidence.signs),
+                                            ('labs', lab_results, 'lab_test_id', evidence.labs)):
+        for item in items:
+            item_id = item[id_field]
+            value_numeric, unit = normalize_measurement(kind, item_id, item.get('value_numeric'), item.get('unit'))
+            value_text = item.get('value_text')
+            observed.add(item_id, value_numeric, value_text, unit, encode_qualitative(kind, item_id, value_text))
+    return evidence
+
+
+def recommend_next_tests(evidence: PatientEvidence, top_k: int = 5, limit: int = 10) -> Dict[str, Any]:
+    """
+    Ordena los signos y laboratorios no observados por la reducción esperada de
+    entropía entre los `top_k` diagnósticos candidatos (ver
+    `app.modules.information_gain`).
+    """
+    knowledge_base = get_knowledge_base()
+    started = time.perf_counter()
+    candidates = heapq.nlargest(
+        top_k, InferenceEngine(knowledge_base).score_candidates(evidence), key=lambda c: round(c[1], 2)
+    )
+    result = rank_next_tests(knowledge_base, evidence, candidates, limit=limit)
+    result['elapsed_ms'] = round((time.perf_counter() - started) * 1000.0, 3)
+    result['patient_id'] = evidence.patient_id
+    result['visit_id'] = evidence.visit_id
+    return result
+
+
+def get_treatment_recommendation(disease_code: str) -> Optional[Dict[str, str]]:
+    """
+    Obtiene las recomendaciones de tratamiento y prevención para una enfermedad.
+
+    Args:
+        disease_code: Código de la enfermedad (ej. 'RESP03')
+
+    Returns:
+        Diccionario con:
+        {
+            'disease_code': 'RESP03',
+            'disease_name': 'Neumonía bacteriana',
+            'treatment_recommendations': 'Antibióticos...',
+            'prevention_measures': 'Vacunación...',
+            'severity': 'grave'
+        }
+        O None si no se encuentra la enfermedad
+    """
+    disease = Disease.query.filter_by(code=disease_code, is_active=True).first()
+
+    if not disease:
+        return None
+
+    return {
+        'disease_code': disease.code,
+        'disease_name': disease.name,
+        'treatment_recommendations': disease.treatment_recommendations,
+        'prevention_measures': disease.prevention_measures,
+        'severity': disease.severity,
+        'category': disease.category,
+        'description': disease.description
+    }
+
+
+# ==================== INVALIDACIÓN POR EVENTOS ====================
+
+@event.listens_for(Session, 'after_flush')
+def _track_knowledge_changes(session, flush_context):
+    """Marca la sesión si el flush tocó algún modelo del catálogo."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, KNOWLEDGE_MODELS):
+            session.info['knowledge_changed'] = True
+            return
+
+
+@event.listens_for(Session, 'after_commit')
+def _bump_version_on_commit(session):
+    """Incrementa la versión del catálogo una vez confirmada la transacción."""
+    if session.info.pop('knowledge_changed', False):
+        invalidate_knowledge_base()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_changes(session):
+    session.info.pop('knowledge_changed', None)
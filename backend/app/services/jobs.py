@@ -0,0 +1,309 @@
+"""
+Trabajos en Segundo Plano
+=========================
+
+Ejecutor en proceso, sin broker externo, para el trabajo pesado que no debe
+correr dentro de una petición (scoring por lotes, evaluación retrospectiva...).
+
+- Los trabajos se registran en la tabla `jobs` (ver `app.models.job`): estado,
+  progreso, resultado y error sobreviven a la petición que los creó y pueden
+  consultarse desde cualquier proceso.
+- Se ejecutan en un `ThreadPoolExecutor` con `JOBS_MAX_WORKERS` hilos, cada uno
+  con su propio contexto de aplicación y su propia sesión.
+- Límite de concurrencia: como máximo `JOBS_MAX_WORKERS + JOBS_MAX_PENDING`
+  trabajos en curso o en cola por proceso, y `JOBS_MAX_PER_USER` trabajos
+  activos por usuario; el excedente se rechaza en lugar de encolarse.
+- Cancelación: un trabajo en cola se cancela de inmediato; uno en ejecución se
+  detiene en su siguiente reporte de progreso (`JobContext.progress`).
+
+Los tipos de trabajo se registran con `@register_job('tipo')`; el manejador
+recibe un `JobContext` y los parámetros, y retorna un resultado serializable en
+JSON. Un validador opcional (`@register_job('tipo', validator=...)`) revisa y
+normaliza los parámetros al encolar: un parámetro inválido se rechaza en la
+petición (`JobParamsError`) en lugar de producir un trabajo fallido. Ver
+`app.services.batch_jobs`.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from typing import Dict, Any, Callable, Optional
+from flask import current_app
+from sqlalchemy import text
+from app.extensions import db
+from app.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+# {job_type: manejador(ctx, params) -> resultado}
+JOB_HANDLERS: Dict[str, Callable[['JobContext', Dict[str, Any]], Any]] = {}
+
+# {job_type: validador(params) -> params normalizados}; lanza JobParamsError
+JOB_VALIDATORS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {}
+
+# Intervalo mínimo entre escrituras de progreso en la base de datos
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+def register_job(job_type: str, validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+    """
+    Decorador que registra el manejador de un tipo de trabajo y, si se indica,
+    el validador de sus parámetros.
+    """
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        if validator is not None:
+            JOB_VALIDATORS[job_type] = validator
+        return func
+    return decorator
+
+
+class JobCancelled(Exception):
+    """Se lanza dentro del manejador cuando se solicitó cancelar el trabajo."""
+
+
+class JobParamsError(ValueError):
+    """Los parámetros del trabajo no son válidos para su tipo."""
+
+
+class JobQueueFull(Exception):
+    """No hay capacidad para aceptar más trabajos."""
+
+
+def current_worker() -> str:
+    """Identificador 'host:pid' del proceso actual."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobContext:
+    """Acceso del manejador a su trabajo: usuario, progreso y cancelación."""
+
+    def __init__(self, job_id: str, user_id: int, is_admin: bool):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.is_admin = is_admin
+        self._last_write = 0.0
+
+    def progress(self, done: int, total: int, message: Optional[str] = None, force: bool = False) -> None:
+        """
+        Reporta el avance (`done` de `total`). Las escrituras se espacian
+        `PROGRESS_INTERVAL_SECONDS`; en cada escritura se comprueba si se pidió
+        cancelar y, en ese caso, se lanza `JobCancelled`.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_write = now
+        fraction = min(1.0, done / total) if total else 0.0
+
+        # Conexión propia: no interfiere con la sesión que usa el manejador
+        with db.engine.begin() as conn:
+            conn.execute(
+                text("UPDATE jobs SET progress = :progress, progress_message = :message, updated_at = :now "
+                     "WHERE id = :id"),
+                {'progress': fraction, 'message': (message or f'{done}/{total}')[:200],
+                 'now': datetime.utcnow(), 'id': self.job_id}
+            )
+            cancel_requested = conn.execute(
+                text("SELECT cancel_requested FROM jobs WHERE id = :id"), {'id': self.job_id}
+            ).scalar()
+        if cancel_requested:
+            raise JobCancelled()
+
+
+class JobRunner:
+    """Pool de hilos que ejecuta los trabajos registrados en la tabla `jobs`."""
+
+    def __init__(self, app, max_workers: int = 2, max_pending: int = 20, max_per_user: int = 3):
+        self.app = app
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_per_user = max_per_user
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-runner')
+
+    def submit(self, job_type: str, params: Dict[str, Any], user_id: int, is_admin: bool = False) -> Job:
+        """
+        Registra el trabajo y lo encola.
+
+        Raises:
+            ValueError: Si el tipo de trabajo no existe
+            JobParamsError: Si los parámetros no son válidos para el tipo
+            JobQueueFull: Si se alcanzó el límite de concurrencia
+        """
+        if job_type not in JOB_HANDLERS:
+            raise ValueError(f"Tipo de trabajo no válido: {job_type}")
+        validator = JOB_VALIDATORS.get(job_type)
+        if validator is not None:
+            params = validator(params)
+
+        active = Job.query.filter(
+            Job.created_by == user_id,
+            Job.status.in_([Job.PENDING, Job.RUNNING])
+        ).count()
+        if active >= self.max_per_user:
+            raise JobQueueFull(f"Límite de {self.max_per_user} trabajos activos por usuario alcanzado")
+
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFull("La cola de trabajos está llena, intente más tarde")
+
+        try:
+            job = Job(
+                id=str(uuid.uuid4()),
+                job_type=job_type,
+                status=Job.PENDING,
+                params=json.dumps(params),
+                created_by=user_id,
+                worker=current_worker()
+            )
+            db.session.add(job)
+            db.session.commit()
+
+            future = self._executor.submit(self._run, job.id, user_id, is_admin)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._futures[job.id] = future
+        future.add_done_callback(lambda _: self._release(job.id))
+        return job
+
+    def _release(self, job_id: str) -> None:
+        with self._lock:
+            self._futures.pop(job_id, None)
+        self._slots.release()
+
+    def cancel(self, job: Job) -> Job:
+        """
+        Cancela un trabajo: si sigue en la cola de este proceso se descarta de
+        inmediato; si no, se marca `cancel_requested` y el manejador se detiene
+        en su siguiente reporte de progreso.
+        """
+        if job.is_finished:
+            return job
+
+        with self._lock:
+            future = self._futures.get(job.id)
+        if future is not None and future.cancel():
+            job.status = Job.CANCELLED
+            job.finished_at = datetime.utcnow()
+        job.cancel_requested = True
+        db.session.commit()
+        return job
+
+    def _run(self, job_id: str, user_id: int, is_admin: bool) -> None:
+        with self.app.app_context():
+            try:
+                job = db.session.get(Job, job_id)
+                if job is None:
+                    return
+                if job.cancel_requested:
+                    self._finish(job, Job.CANCELLED)
+                    return
+
+                job.status = Job.RUNNING
+                job.started_at = datetime.utcnow()
+                job.worker = current_worker()
+                db.session.commit()
+
+                params = json.loads(job.params) if job.params else {}
+                handler = JOB_HANDLERS[job.job_type]
+                result = handler(JobContext(job_id, user_id, is_admin), params)
+
+                job = db.session.get(Job, job_id)
+                job.result = json.dumps(result, default=str)
+                job.progress = 1.0
+                self._finish(job, Job.SUCCEEDED)
+            except JobCancelled:
+                db.session.rollback()
+                self._finish(db.session.get(Job, job_id), Job.CANCELLED)
+            except Exception as e:
+                logger.exception(f"❌ Error en trabajo {job_id}")
+                db.session.rollback()
+                job = db.session.get(Job, job_id)
+                if job is not None:
+                    job.error = f"{type(e).__name__}: {e}"
+                    self._finish(job, Job.FAILED)
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def _finish(job: Optional[Job], status: str) -> None:
+        if job is None:
+            return
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    def recover_orphans(self) -> int:
+        """
+        Marca como fallidos los trabajos pendientes o en ejecución de procesos
+        de este host que ya no existen (p. ej. tras reiniciar el servidor).
+        """
+        hostname = socket.gethostname()
+        orphans = 0
+        for job in Job.query.filter(Job.status.in_([Job.PENDING, Job.RUNNING])).all():
+            host, _, pid = (job.worker or '').rpartition(':')
+            if host != hostname or not pid.isdigit() or _process_alive(int(pid)):
+                continue
+            job.status = Job.FAILED
+            job.error = 'Trabajo interrumpido: el proceso que lo ejecutaba terminó'
+            job.finished_at = datetime.utcnow()
+            orphans += 1
+        db.session.commit()
+        return orphans
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def get_job_runner() -> JobRunner:
+    """Ejecutor de trabajos de la aplicación actual."""
+    return current_app.extensions['job_runner']
+
+
+def init_job_runner(app) -> JobRunner:
+    """Crea el ejecutor de trabajos y lo registra en `app.extensions['job_runner']`."""
+    # Registra los tipos de trabajo incluidos en la aplicación
+    from app.services import batch_jobs  # noqa: F401
+
+    runner = JobRunner(
+        app,
+        max_workers=app.config.get('JOBS_MAX_WORKERS', 2),
+        max_pending=app.config.get('JOBS_MAX_PENDING', 20),
+        max_per_user=app.config.get('JOBS_MAX_PER_USER', 3)
+    )
+    app.extensions['job_runner'] = runner
+
+    # Las tablas pueden no existir todavía (p. ej. al ejecutar create_db.py)
+    with app.app_context():
+        try:
+            orphans = runner.recover_orphans()
+            if orphans:
+                app.logger.warning(f"⚠️  {orphans} trabajos interrumpidos marcados como fallidos")
+        except Exception:
+            db.session.rollback()
+        finally:
+            db.session.remove()
+    return runner
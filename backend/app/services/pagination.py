@@ -0,0 +1,175 @@
+"""
+Paginación por Cursor
+=====================
+
+Cursores opacos para paginación keyset: el cursor codifica los valores de la
+clave de orden de la última fila entregada (p. ej. fecha + id), de modo que la
+página siguiente se obtiene con un `WHERE (fecha, id) < (...)` sobre un índice,
+con costo constante sin importar la profundidad de la página.
+
+Los listados del catálogo y de pacientes usan `read_page_request` + `paginate`,
+que ofrecen ambos contratos:
+
+- `page` / `page_size`: paginación por número de página (OFFSET), como siempre.
+- `cursor`: paginación keyset; `cursor=` vacío pide la primera página y cada
+  respuesta trae `pagination.next_cursor` para la siguiente.
+- `count`: `true` (exacto), `estimate` (aproximado) o `false` (sin
+  `total_count`); por defecto se cuenta en modo página y no en modo cursor.
+  Los conteos se sirven desde `app.services.count_cache`.
+"""
+
+import base64
+import json
+from datetime import datetime, date
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from flask import request
+from sqlalchemy import and_, or_
+from app.services.count_cache import count_cache, planner_estimate
+
+
+class InvalidCursor(ValueError):
+    """El cursor recibido no es válido."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Codifica los valores de la clave de orden en un cursor opaco (base64 URL-safe)."""
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decodifica un cursor de `encode_cursor`.
+
+    Raises:
+        InvalidCursor: Si el cursor está mal formado o no tiene `size` valores
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Cursor inválido') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Cursor inválido')
+    return values
+
+
+def parse_datetime_param(value: Optional[str], end_of_day: bool = False) -> Optional[datetime]:
+    """
+    Parsea un parámetro de fecha ISO 8601 ('2025-01-31' o '2025-01-31T10:00:00').
+    Con `end_of_day`, una fecha sin hora se interpreta como el final de ese día.
+
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+
+def parse_page_size(value: Optional[int], default: Optional[int], maximum: int) -> Optional[int]:
+    """Acota el tamaño de página a [1, maximum]; None/ausente retorna `default`."""
+    if value is None:
+        return default
+    return min(max(value, 1), maximum)
+
+
+def split_page(rows: List[Any], page_size: Optional[int]) -> Tuple[List[Any], bool]:
+    """
+    Separa una consulta hecha con `limit(page_size + 1)` en (filas de la página,
+    hay_más).
+    """
+    if page_size is None or len(rows) <= page_size:
+        return rows, False
+    return rows[:page_size], True
+
+
+class PageRequest(NamedTuple):
+    """Parámetros de paginación de la petición."""
+    page: int
+    page_size: int
+    cursor: Optional[str]  # None: modo página; '' o token: modo cursor
+    count_mode: str  # 'exact', 'estimate' o 'none'
+
+
+def read_page_request(default_page_size: int = 10, max_page_size: int = 1000) -> PageRequest:
+    """Lee page, page_size, cursor y count de la query string."""
+    page = request.args.get('page', 1, type=int)
+    page_size = request.args.get('page_size', default_page_size, type=int)
+
+    # Validar parámetros
+    if page < 1:
+        page = 1
+    if page_size < 1 or page_size > max_page_size:
+        page_size = default_page_size
+
+    cursor = request.args.get('cursor')
+    count = (request.args.get('count') or '').lower()
+    if not count:
+        count_mode = 'exact' if cursor is None else 'none'
+    elif count == 'estimate':
+        count_mode = 'estimate'
+    elif count in ('0', 'false', 'no', 'none'):
+        count_mode = 'none'
+    else:
+        count_mode = 'exact'
+    return PageRequest(page, page_size, cursor, count_mode)
+
+
+def _after(sort_columns: Sequence, values: Sequence) -> Any:
+    """Condición `(c1, c2, ...) > (v1, v2, ...)` en orden lexicográfico."""
+    clauses = []
+    for i, column in enumerate(sort_columns):
+        equal = [sort_columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, column > values[i]))
+    return or_(*clauses)
+
+
+def paginate(query, sort_columns: Sequence, page_request: PageRequest,
+             rank: Optional[Any] = None) -> Tuple[List[Any], Dict[str, Any]]:
+    """
+    Ordena `query` por `sort_columns` (ascendente; la última debe ser única) y
+    retorna (filas de la página, dict `pagination` para la respuesta).
+
+    `rank`: expresión de relevancia (menor = más relevante) de una búsqueda de
+    texto. En modo página se ordena primero por ella y no se entrega
+    `next_cursor`; el modo cursor conserva el orden por `sort_columns`.
+
+    Raises:
+        InvalidCursor: Si el cursor no es válido
+    """
+    page_size = page_request.page_size
+
+    # El total se calcula sobre el conjunto filtrado completo, antes del cursor
+    total_count, estimated = None, False
+    if page_request.count_mode != 'none':
+        total_count, estimated = count_cache.count(
+            query, estimate=page_request.count_mode == 'estimate', estimator=planner_estimate
+        )
+
+    ranked = rank is not None and page_request.cursor is None
+    query = query.order_by(rank, *sort_columns) if ranked else query.order_by(*sort_columns)
+
+    if page_request.cursor is None:
+        query = query.offset((page_request.page - 1) * page_size)
+    elif page_request.cursor:
+        query = query.filter(_after(sort_columns, decode_cursor(page_request.cursor, len(sort_columns))))
+
+    rows, has_more = split_page(query.limit(page_size + 1).all(), page_size)
+    next_cursor = encode_cursor(*(getattr(rows[-1], c.key) for c in sort_columns)) if has_more and not ranked else None
+
+    pagination: Dict[str, Any] = {
+        'page_size': page_size,
+        'total_count': total_count,
+        'total_count_estimated': estimated,
+        'has_more': has_more,
+        'next_cursor': next_cursor
+    }
+    if page_request.cursor is None:
+        pagination['page'] = page_request.page
+        pagination['total_pages'] = (total_count + page_size - 1) // page_size if total_count is not None else None
+    return rows, pagination
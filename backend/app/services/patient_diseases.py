@@ -0,0 +1,96 @@
+"""
+Índice Paciente–Enfermedad
+==========================
+
+Mantiene la tabla `patient_diseases`: un par (disease_code, patient_id) por
+cada combinación con al menos un diagnóstico. El filtro `enfermedad` de
+`GET /api/patients` la usa como semi-join sobre su clave primaria, en lugar de
+unir `diagnoses` con `diseases` y aplicar `DISTINCT`.
+
+Mantenimiento por eventos de SQLAlchemy (`after_flush`): los pares de los
+diagnósticos nuevos, eliminados o con `patient_id`/`disease_code` modificados
+se recalculan desde `diagnoses` en la misma transacción. Las escrituras en
+`diagnoses` que no pasan por la unidad de trabajo del ORM deben llamar a
+`refresh_patient_diseases` (o `rebuild_patient_diseases`).
+"""
+
+from typing import Dict, Iterable, Set, Tuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app.models.diagnosis import Diagnosis, patient_diseases
+from app.models.patient import Patient
+from app.services.count_cache import PENDING_TABLES_KEY, count_cache
+
+Pair = Tuple[int, str]  # (patient_id, disease_code)
+
+
+def patients_with_diseases(disease_codes):
+    """Condición: el paciente tiene algún diagnóstico de `disease_codes` (semi-join sobre el índice)."""
+    return Patient.id.in_(
+        select(patient_diseases.c.patient_id).where(patient_diseases.c.disease_code.in_(disease_codes))
+    )
+
+
+def refresh_patient_diseases(connection, pairs: Iterable[Pair]) -> None:
+    """Recalcula desde `diagnoses` las filas de `patient_diseases` de los pares indicados."""
+    # Agrupado por paciente (sin `(a, b) IN (...)`, que SQL Server no admite)
+    by_patient: Dict[int, Set[str]] = {}
+    for patient_id, disease_code in pairs:
+        if patient_id is not None and disease_code is not None:
+            by_patient.setdefault(patient_id, set()).add(disease_code)
+
+    for patient_id, disease_codes in by_patient.items():
+        disease_codes = sorted(disease_codes)
+        existing = connection.execute(
+            select(Diagnosis.disease_code).distinct().where(
+                Diagnosis.patient_id == patient_id,
+                Diagnosis.disease_code.in_(disease_codes)
+            )
+        ).scalars().all()
+        connection.execute(patient_diseases.delete().where(
+            patient_diseases.c.patient_id == patient_id,
+            patient_diseases.c.disease_code.in_(disease_codes)
+        ))
+        if existing:
+            connection.execute(patient_diseases.insert(), [
+                {'patient_id': patient_id, 'disease_code': disease_code} for disease_code in existing
+            ])
+
+
+def rebuild_patient_diseases(connection) -> None:
+    """Reconstruye `patient_diseases` completa desde `diagnoses`."""
+    connection.execute(patient_diseases.delete())
+    connection.execute(patient_diseases.insert().from_select(
+        ['patient_id', 'disease_code'],
+        select(Diagnosis.patient_id, Diagnosis.disease_code).distinct()
+    ))
+
+
+def _changed_pairs(session) -> Set[Pair]:
+    """Pares (paciente, enfermedad) afectados por los diagnósticos del flush, antes y después."""
+    pairs: Set[Pair] = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, Diagnosis):
+            continue
+        attrs = inspect(obj).attrs
+        patient_history = attrs.patient_id.history
+        disease_history = attrs.disease_code.history
+        if obj in session.dirty and not (patient_history.has_changes() or disease_history.has_changes()):
+            continue
+        pairs.add((obj.patient_id, obj.disease_code))
+        old_patient = (patient_history.deleted or [obj.patient_id])[0]
+        old_disease = (disease_history.deleted or [obj.disease_code])[0]
+        pairs.add((old_patient, old_disease))
+    return pairs
+
+
+# ==================== MANTENIMIENTO POR EVENTOS ====================
+
+@event.listens_for(Session, 'after_flush')
+def _refresh_on_flush(session, flush_context):
+    pairs = _changed_pairs(session)
+    if pairs:
+        refresh_patient_diseases(session.connection(), pairs)
+        # Los conteos de listados filtrados por enfermedad consultan esta tabla
+        session.info.setdefault(PENDING_TABLES_KEY, set()).add(patient_diseases.name)
+        count_cache.invalidate_tables([patient_diseases.name])
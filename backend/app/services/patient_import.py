@@ -0,0 +1,248 @@
+"""
+Importación Masiva de Pacientes
+===============================
+
+Alta de pacientes desde un CSV o NDJSON de cualquier tamaño, leído en
+streaming: el archivo nunca se carga completo en memoria.
+
+- Cada fila se valida al leerse (mismos campos que `POST /api/patients`); las
+  filas inválidas se reportan con su número de línea y no detienen la
+  importación.
+- Las filas válidas se acumulan en lotes de `PATIENT_IMPORT_BATCH_SIZE` y
+  cada lote se inserta con un solo `INSERT` ejecutado sobre todas sus filas
+  (executemany) y se confirma en su propia transacción. Si un lote falla en
+  la base de datos, se reintenta fila por fila: se insertan las filas válidas
+  y solo las rechazadas se reportan, con el error de la base de datos.
+- Las columnas normalizadas para búsqueda se calculan aquí, ya que las
+  inserciones no pasan por los eventos del ORM.
+"""
+
+import csv
+import io
+import json
+import math
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from flask import current_app
+from app.extensions import db
+from app.models.folding import fold_text, folded_columns
+from app.models.patient import Patient
+from app.services.count_cache import count_cache
+
+# Errores incluidos en el resumen (el total siempre se reporta)
+MAX_REPORTED_ERRORS = 1000
+
+# (número de línea, fila, mensaje de error de lectura)
+Record = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+REQUIRED_FIELDS = ('first_name', 'paternal_surname', 'date_of_birth', 'gender')
+TEXT_FIELDS = (
+    'first_name', 'second_name', 'paternal_surname', 'maternal_surname', 'gender', 'email', 'phone',
+    'address', 'allergies', 'chronic_conditions', 'smoking_status', 'alcohol_consumption'
+)
+FLOAT_FIELDS = ('height', 'weight', 'bmi')
+# Campo entero -> valores permitidos
+INT_FIELDS = {'blood_type_abo': range(0, 4), 'blood_type_rh': range(0, 2)}
+FIELDS = TEXT_FIELDS + FLOAT_FIELDS + tuple(INT_FIELDS) + ('date_of_birth',)
+_TEXT_LENGTHS = {field: Patient.__table__.c[field].type.length for field in TEXT_FIELDS}
+
+
+# ==================== LECTURA ====================
+
+def _text_stream(stream) -> io.TextIOBase:
+    """Vista de texto UTF-8 (con o sin BOM) de un flujo binario, leída por bloques."""
+    if not isinstance(stream, io.BufferedIOBase):
+        stream = io.BufferedReader(stream)
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+
+def iter_csv_records(stream) -> Iterator[Record]:
+    """Filas de un CSV con encabezado; las celdas vacías se toman como ausentes."""
+    reader = csv.DictReader(_text_stream(stream))
+    for row in reader:
+        yield reader.line_num, {
+            field.strip(): value for field, value in row.items() if field and value not in (None, '')
+        }, None
+
+
+def iter_ndjson_records(stream) -> Iterator[Record]:
+    """Un objeto JSON por línea; las líneas vacías se ignoran."""
+    for number, line in enumerate(_text_stream(stream), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, None, f'JSON inválido: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield number, None, 'La línea debe ser un objeto JSON'
+            continue
+        yield number, record, None
+
+
+IMPORT_FORMATS: Dict[str, Callable[[Any], Iterator[Record]]] = {
+    'csv': iter_csv_records,
+    'ndjson': iter_ndjson_records,
+}
+
+
+# ==================== VALIDACIÓN ====================
+
+def validate_patient(record: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Tuple[Optional[str], str]]]:
+    """(valores de la fila, errores [(campo, mensaje)])."""
+    values: Dict[str, Any] = {}
+    errors: List[Tuple[Optional[str], str]] = []
+
+    for field in record:
+        if field not in FIELDS:
+            errors.append((field, 'Campo desconocido'))
+
+    for field in TEXT_FIELDS:
+        value = record.get(field)
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+                errors.append((field, 'Debe ser texto'))
+                continue
+            value = str(value).strip() or None
+            length = _TEXT_LENGTHS[field]
+            if value and length and len(value) > length:
+                errors.append((field, f'Excede {length} caracteres'))
+                continue
+        values[field] = value
+
+    for field in FLOAT_FIELDS:
+        value = record.get(field)
+        if value is not None:
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                errors.append((field, 'Debe ser un número'))
+                continue
+            if isinstance(record[field], bool) or not math.isfinite(value) or value <= 0:
+                errors.append((field, 'Debe ser un número positivo'))
+                continue
+        values[field] = value
+
+    for field, allowed in INT_FIELDS.items():
+        value = record.get(field)
+        if value is not None:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = None
+            if value not in allowed:
+                errors.append((field, f'Debe ser un entero entre {allowed.start} y {allowed.stop - 1}'))
+                continue
+        values[field] = value
+
+    value = record.get('date_of_birth')
+    if value is not None:
+        try:
+            value = datetime.fromisoformat(str(value).strip()).date()
+        except ValueError:
+            errors.append(('date_of_birth', 'Fecha inválida, use ISO 8601 (AAAA-MM-DD)'))
+            value = None
+    values['date_of_birth'] = value
+
+    for field in REQUIRED_FIELDS:
+        if values.get(field) is None and not any(name == field for name, _ in errors):
+            errors.append((field, 'Campo requerido'))
+
+    return values, errors
+
+
+# ==================== IMPORTACIÓN ====================
+
+class PatientImport:
+    """Importación en curso: acumula lotes, los inserta y lleva el resumen."""
+
+    def __init__(self, doctor_id: int, batch_size: int):
+        self.doctor_id = doctor_id
+        self.batch_size = max(1, batch_size)
+        self.total_rows = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.error_count = 0
+        self._batch: List[Tuple[int, Dict[str, Any]]] = []
+        self._folded = folded_columns(Patient)
+
+    def _error(self, row: Optional[int], field: Optional[str], message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'field': field, 'message': message})
+
+    def add(self, number: int, record: Optional[Dict[str, Any]], message: Optional[str]) -> None:
+        """Valida una fila y la agrega al lote actual (o la reporta como fallida)."""
+        self.total_rows += 1
+        errors = [(None, message)] if message else []
+        if record is not None:
+            values, errors = validate_patient(record)
+        if errors:
+            self.failed += 1
+            for field, text in errors:
+                self._error(number, field, text)
+            return
+
+        now = datetime.utcnow()
+        values.update(doctor_id=self.doctor_id, is_active=True, created_at=now, updated_at=now)
+        for source, target in self._folded:
+            values[target] = fold_text(values[source])
+        self._batch.append((number, values))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Inserta el lote actual en su propia transacción; si falla, lo reintenta fila por fila."""
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
+        insert = Patient.__table__.insert()
+        try:
+            db.session.execute(insert, [values for _, values in batch])
+            db.session.commit()
+            self.inserted += len(batch)
+        except Exception:
+            db.session.rollback()
+            # Aislar las filas que la base de datos rechaza; las demás se insertan
+            for number, values in batch:
+                try:
+                    db.session.execute(insert, values)
+                    db.session.commit()
+                    self.inserted += 1
+                except Exception as e:
+                    db.session.rollback()
+                    self.failed += 1
+                    self._error(number, None, f'Rechazada por la base de datos: {getattr(e, "orig", e)}')
+        count_cache.invalidate_tables([Patient.__tablename__])
+
+    def abort(self, message: str) -> None:
+        """Registra un error que impide seguir leyendo el archivo."""
+        self._error(None, None, message)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'total_rows': self.total_rows,
+            'inserted': self.inserted,
+            'failed': self.failed,
+            'errors': self.errors,
+            'total_errors': self.error_count,
+        }
+
+
+def import_patients(records: Iterator[Record], doctor_id: int, batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """Importa las filas de `records` asignadas a `doctor_id`; retorna el resumen."""
+    if batch_size is None:
+        batch_size = current_app.config.get('PATIENT_IMPORT_BATCH_SIZE', 1000)
+    job = PatientImport(doctor_id, batch_size)
+    try:
+        for number, record, message in records:
+            job.add(number, record, message)
+    except (csv.Error, UnicodeDecodeError) as e:
+        # Archivo ilegible a partir de este punto: se conserva lo ya leído
+        job.flush()
+        job.abort(f'Lectura interrumpida después de {job.total_rows} filas: {e}')
+        return job.summary()
+    job.flush()
+    return job.summary()
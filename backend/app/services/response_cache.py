@@ -0,0 +1,239 @@
+"""
+Caché de Respuestas de Catálogos
+================================
+
+Caché en proceso, acotado en bytes (LRU), de las respuestas `GET` de los
+catálogos (enfermedades, categorías, síntomas, signos y pruebas de
+laboratorio). Estas respuestas no dependen del usuario: dos peticiones con la
+misma ruta y los mismos parámetros (normalizados: ordenados, con valores
+repetidos) producen el mismo cuerpo.
+
+- Solo se guardan respuestas 200, con su cuerpo y sus encabezados (incluidos
+  `ETag` / `Last-Modified`): un acierto con `If-None-Match` responde 304 sin
+  tocar la base de datos.
+- Fallos concurrentes de la misma clave se agrupan: la primera petición
+  construye la respuesta y las demás esperan su resultado, de modo que una
+  ráfaga de peticiones idénticas ejecuta las consultas una sola vez.
+- Invalidación por blueprint: cada respuesta se asocia a los blueprints cuyas
+  escrituras la afectan (p. ej. `/api/diseases` incluye nombres de síntomas,
+  signos y pruebas). Un `POST`/`PUT`/`PATCH`/`DELETE` atendido por uno de esos
+  blueprints elimina sus respuestas. Las escrituras fuera de esas rutas deben
+  llamar a `response_cache.invalidate`.
+
+El caché es por proceso: con varios workers, una escritura solo invalida el
+caché del worker que la atendió y los demás ven el cambio al vencer
+`RESPONSE_CACHE_TTL`.
+
+Configuración (ver `BaseConfig`):
+    RESPONSE_CACHE_TTL: Segundos de validez de una respuesta; 0 desactiva el caché.
+    RESPONSE_CACHE_MAX_BYTES: Tamaño máximo de los cuerpos en caché.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from flask import current_app, request
+
+# Métodos que invalidan las respuestas del blueprint que los atiende
+WRITE_METHODS = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+
+# Encabezados de la respuesta original que se guardan junto al cuerpo
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+# Segundos que una petición espera la respuesta de otra con la misma clave
+COALESCE_TIMEOUT = 30.0
+
+ResponseKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class _CachedResponse(NamedTuple):
+    body: bytes
+    headers: List[Tuple[str, str]]
+    groups: Tuple[str, ...]
+    stored_at: float
+
+
+class _InFlight:
+    """Construcción en curso de una clave; las peticiones seguidoras esperan `done`."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[_CachedResponse] = None
+
+
+class ResponseCache:
+    """LRU de respuestas por (ruta, parámetros), acotado en bytes, con TTL e invalidación por grupo."""
+
+    def __init__(self, ttl: float = 60.0, max_bytes: int = 32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[ResponseKey, _CachedResponse]' = OrderedDict()
+        self._in_flight: Dict[ResponseKey, _InFlight] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        # Se incrementa al invalidar un grupo: una construcción que empezó antes
+        # de la invalidación no se guarda (podría traer datos ya obsoletos)
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_bytes > 0
+
+    def _snapshot(self, groups: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(g, 0) for g in groups)
+
+    def _lookup(self, key: ResponseKey) -> Optional[_CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at >= self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remove(self, key: ResponseKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+    def _store(self, key: ResponseKey, entry: _CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._size += len(entry.body)
+        while self._size > self.max_bytes:
+            old_key = next(iter(self._entries))
+            self._remove(old_key)
+
+    def get_or_build(self, key: ResponseKey, groups: Tuple[str, ...], build: Callable[[], Any]):
+        """
+        Respuesta en caché para `key` o, si no la hay, la construida por
+        `build()`. Si otra petición ya construye la misma clave, espera su
+        resultado en lugar de ejecutar `build()`.
+        """
+        if not self.enabled:
+            return build()
+
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return _replay(entry, 'HIT')
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _InFlight()
+                generations = self._snapshot(groups)
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait(COALESCE_TIMEOUT)
+            if flight.entry is not None:
+                return _replay(flight.entry, 'HIT')
+            # La petición líder no produjo una respuesta reutilizable (error o 304)
+            return build()
+
+        try:
+            response = current_app.make_response(build())
+            if response.status_code == 200 and not response.direct_passthrough:
+                headers = [(name, response.headers[name]) for name in STORED_HEADERS if name in response.headers]
+                flight.entry = _CachedResponse(response.get_data(), headers, groups, time.monotonic())
+                with self._lock:
+                    if generations == self._snapshot(groups):
+                        self._store(key, flight.entry)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, *groups: str) -> None:
+        """Elimina las respuestas asociadas a alguno de los grupos (blueprints)."""
+        with self._lock:
+            for group in groups:
+                self._generations[group] = self._generations.get(group, 0) + 1
+            stale = [key for key, entry in self._entries.items() if set(entry.groups).intersection(groups)]
+            for key in stale:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for group in list(self._generations):
+                self._generations[group] += 1
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _replay(entry: _CachedResponse, status: str):
+    """Nueva respuesta a partir de una entrada, evaluando los validadores del cliente."""
+    response = current_app.response_class(entry.body, status=200, headers=entry.headers)
+    response.headers['X-Cache'] = status
+    return response.make_conditional(request)
+
+
+def request_key() -> ResponseKey:
+    """Clave de la petición actual: ruta + parámetros normalizados."""
+    return request.path, tuple(sorted(request.args.items(multi=True)))
+
+
+# Caché del proceso (TTL y tamaño se ajustan en `init_response_cache`)
+response_cache = ResponseCache()
+
+
+def cached_response(*groups: str):
+    """
+    Decorador para vistas GET cuya respuesta es igual para todos los usuarios.
+
+    `groups`: blueprints cuyas escrituras invalidan la respuesta (además del
+    blueprint de la propia vista). Va después de `@jwt_required()`, para que
+    la autenticación se verifique también en los aciertos.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            view_groups = tuple(dict.fromkeys((request.blueprint,) + groups))
+            return response_cache.get_or_build(request_key(), view_groups, lambda: view(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _invalidate_after_write(response):
+    """Invalida las respuestas del blueprint que atendió una escritura."""
+    if request.method in WRITE_METHODS and request.blueprint:
+        response_cache.invalidate(request.blueprint)
+    return response
+
+
+def init_response_cache(app) -> ResponseCache:
+    """Configura el caché de respuestas y lo registra en `app.extensions['response_cache']`."""
+    response_cache.ttl = app.config.get('RESPONSE_CACHE_TTL', 60.0)
+    response_cache.max_bytes = app.config.get('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+    response_cache.clear()
+    app.after_request(_invalidate_after_write)
+    app.extensions['response_cache'] = response_cache
+    return response_cache
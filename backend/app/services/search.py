@@ -0,0 +1,220 @@
+"""
+Búsqueda de Texto Indexada
+==========================
+
+Filtros de texto (subcadena, sin distinguir mayúsculas ni acentos) de los
+listados de pacientes y del catálogo, respondidos desde un índice en lugar de
+recorrer la tabla con `ilike('%término%')`.
+
+Los nombres se buscan en sus columnas normalizadas (`*_folded`, ver
+`app.models.folding`) con el término normalizado igual: "Garcia" encuentra
+"García". Las descripciones se buscan tal cual.
+
+- SQLite: una tabla virtual FTS5 con tokenizador `trigram` por tabla indexada
+  (`SEARCH_INDEXES`), de contenido externo y sincronizada por triggers
+  `AFTER INSERT/UPDATE/DELETE`. Los triggers cubren también las escrituras
+  masivas que no pasan por el ORM (que deben incluir las columnas
+  normalizadas).
+- PostgreSQL: índices GIN `gin_trgm_ops` (extensión `pg_trgm`) sobre las
+  mismas columnas, que el planificador usa directamente para `LIKE`.
+- Otros motores: `LIKE` sobre las columnas normalizadas, sin índice.
+
+Los términos de menos de `MIN_TERM_LENGTH` caracteres no forman trigramas y se
+buscan con `LIKE` sobre las columnas normalizadas. Con `prefijo=true` los
+nombres se buscan como prefijo de su columna normalizada: un rango sobre su
+índice B-tree.
+
+Relevancia: `apply_text_search` retorna una expresión de orden (menor = más
+relevante): `bm25` en SQLite y `-similarity` en PostgreSQL.
+
+Los índices se crean en la migración `20261019_add_search_indexes` y, con
+`db.create_all()`, al crear cada tabla. Si el índice no existe (p. ej. SQLite
+sin FTS5), se usa `ilike`.
+"""
+
+import weakref
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from flask import request
+from sqlalchemy import and_, event, func, literal_column, or_, select, text
+from sqlalchemy.sql import column, table
+from app.extensions import db
+from app.models.folding import fold_text, folded_columns
+from app.models.patient import Patient
+from app.models.medical_knowledge import Disease, Symptom, Sign, LabTest
+
+# Longitud mínima de un término para buscarlo en el índice de trigramas
+MIN_TERM_LENGTH = 3
+
+
+class SearchIndex(NamedTuple):
+    name: str  # Tabla FTS5
+    table: str  # Tabla de origen
+    rowid: str  # Columna entera que identifica la fila de origen ('rowid' si la clave no es entera)
+    columns: Tuple[str, ...]
+
+
+SEARCH_INDEXES: Dict[type, SearchIndex] = {
+    Patient: SearchIndex('patients_fts', 'patients', 'id', (
+        'first_name_folded', 'second_name_folded', 'paternal_surname_folded', 'maternal_surname_folded'
+    )),
+    Disease: SearchIndex('diseases_fts', 'diseases', 'rowid', ('name_folded', 'description')),
+    Symptom: SearchIndex('symptoms_fts', 'symptoms', 'id', ('name_folded', 'description')),
+    Sign: SearchIndex('signs_fts', 'signs', 'id', ('name_folded', 'description')),
+    LabTest: SearchIndex('lab_tests_fts', 'lab_tests', 'id', ('name_folded', 'description')),
+}
+
+
+# ==================== DDL (SQLite) ====================
+
+def sqlite_index_ddl(index: SearchIndex) -> List[str]:
+    """Sentencias que crean la tabla FTS5, sus triggers y la llenan con las filas existentes."""
+    cols = ', '.join(index.columns)
+    new = ', '.join(f'new.{c}' for c in index.columns)
+    old = ', '.join(f'old.{c}' for c in index.columns)
+    delete = f"INSERT INTO {index.name}({index.name}, rowid, {cols}) VALUES ('delete', old.{index.rowid}, {old});"
+    insert = f"INSERT INTO {index.name}(rowid, {cols}) VALUES (new.{index.rowid}, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.name} USING fts5("
+        f"{cols}, content='{index.table}', content_rowid='{index.rowid}', tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ai AFTER INSERT ON {index.table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ad AFTER DELETE ON {index.table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_au AFTER UPDATE ON {index.table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {index.name}({index.name}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_ddl(index: SearchIndex) -> List[str]:
+    return [f"DROP TRIGGER IF EXISTS {index.name}_{suffix}" for suffix in ('ai', 'ad', 'au')] + [
+        f"DROP TABLE IF EXISTS {index.name}"
+    ]
+
+
+def _create_sqlite_index(index: SearchIndex):
+    def listener(target, connection, **kw):
+        if connection.dialect.name == 'sqlite':
+            for statement in sqlite_index_ddl(index):
+                connection.exec_driver_sql(statement)
+    return listener
+
+
+def _drop_sqlite_index(index: SearchIndex):
+    def listener(target, connection, **kw):
+        if connection.dialect.name == 'sqlite':
+            for statement in sqlite_drop_ddl(index):
+                connection.exec_driver_sql(statement)
+    return listener
+
+
+for _model, _index in SEARCH_INDEXES.items():
+    event.listen(_model.__table__, 'after_create', _create_sqlite_index(_index))
+    event.listen(_model.__table__, 'before_drop', _drop_sqlite_index(_index))
+
+
+# ==================== CONSULTAS ====================
+
+# Índices FTS5 presentes por motor (se consulta una vez por índice)
+_available: 'weakref.WeakKeyDictionary[Any, Dict[str, bool]]' = weakref.WeakKeyDictionary()
+
+
+def _has_fts_index(index: SearchIndex) -> bool:
+    engine = db.engine
+    known = _available.setdefault(engine, {})
+    if index.name not in known:
+        known[index.name] = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': index.name}
+        ).first() is not None
+    return known[index.name]
+
+
+def _search_columns(model: type, columns: Sequence[str], term: str) -> List[Tuple[str, str]]:
+    """(columna a consultar, término) por columna: la normalizada si existe, con el término normalizado."""
+    folded = dict(folded_columns(model))
+    return [(folded[c], fold_text(term)) if c in folded else (c, term) for c in columns]
+
+
+def _fts_query(targets: Sequence[Tuple[str, str]]) -> str:
+    """Consulta FTS5 `(col1 : "término" OR col2 : "término")` (frases literales, sin operadores)."""
+    return '(%s)' % ' OR '.join('%s : "%s"' % (c, t.replace('"', '""')) for c, t in targets)
+
+
+def _substring(model: type, targets: Sequence[Tuple[str, str]]):
+    return or_(*(
+        getattr(model, c).contains(t, autoescape=True) if c.endswith('_folded') else getattr(model, c).ilike(f'%{t}%')
+        for c, t in targets
+    ))
+
+
+def _prefix(model: type, targets: Sequence[Tuple[str, str]]):
+    """Prefijo de las columnas normalizadas (rango sobre su índice); subcadena en las demás."""
+    conditions = []
+    for c, t in targets:
+        attr = getattr(model, c)
+        if not c.endswith('_folded'):
+            conditions.append(attr.ilike(f'%{t}%'))
+        elif db.engine.dialect.name == 'postgresql':
+            conditions.append(attr.startswith(t, autoescape=True))
+        else:
+            conditions.append(and_(attr >= t, attr < t[:-1] + chr(ord(t[-1]) + 1)))
+    return or_(*conditions)
+
+
+def read_prefix_flag() -> bool:
+    """Parámetro `prefijo` de la query string (búsqueda por prefijo del nombre)."""
+    return (request.args.get('prefijo') or '').lower() in ('1', 'true', 'si', 'sí', 'yes')
+
+
+def apply_text_search(query, model: type, filters: Dict[Tuple[str, ...], str],
+                      prefix: bool = False) -> Tuple[Any, Optional[Any]]:
+    """
+    Aplica a `query` los filtros de texto `{(columnas...): término}` sobre
+    `model` (cada término debe aparecer en alguna de sus columnas; todos los
+    filtros deben cumplirse). Las columnas se indican por su nombre de origen
+    (p. ej. 'name'); se consulta su versión normalizada si existe. Con
+    `prefix`, los nombres deben comenzar con el término.
+
+    Retorna (query filtrada, expresión de relevancia o None si el motor no la
+    ofrece o no hay filtros por índice).
+    """
+    filters = {columns: term.strip() for columns, term in filters.items() if term and term.strip()}
+    if not filters:
+        return query, None
+
+    index = SEARCH_INDEXES[model]
+    dialect = db.engine.dialect.name
+    indexed = {}
+    for columns, term in filters.items():
+        # Un término que solo tiene diacríticos queda vacío al normalizarse
+        targets = [(c, t) for c, t in _search_columns(model, columns, term) if t]
+        if not targets:
+            continue
+        if prefix:
+            query = query.filter(_prefix(model, targets))
+        elif min(len(t) for _, t in targets) < MIN_TERM_LENGTH:
+            query = query.filter(_substring(model, targets))
+        else:
+            indexed[columns] = targets
+    if not indexed:
+        return query, None
+
+    if dialect == 'sqlite' and _has_fts_index(index):
+        fts = table(index.name, column('rowid'))
+        match = ' AND '.join(_fts_query(targets) for targets in indexed.values())
+        search = select(
+            fts.c.rowid.label('rowid'),
+            func.bm25(literal_column(index.name)).label('rank')
+        ).where(literal_column(index.name).op('MATCH')(match)).subquery(f'{index.name}_match')
+        source_rowid = literal_column(f'{index.table}.{index.rowid}')
+        return query.join(search, search.c.rowid == source_rowid), search.c.rank
+
+    for targets in indexed.values():
+        query = query.filter(_substring(model, targets))
+    if dialect == 'postgresql':
+        similarity = [func.similarity(getattr(model, c), t) for targets in indexed.values() for c, t in targets]
+        return query, -func.greatest(*similarity) if len(similarity) > 1 else -similarity[0]
+    return query, None
+
+
+def matching_keys(model: type, key_column, filters: Dict[Tuple[str, ...], str]):
+    """SELECT de `key_column` de las filas de `model` que cumplen los filtros (para semi-joins con `in_`)."""
+    query, _ = apply_text_search(db.session.query(key_column), model, filters)
+    return query.statement
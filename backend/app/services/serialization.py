@@ -0,0 +1,160 @@
+"""
+Serialización de Respuestas JSON
+================================
+
+- `FastJSONProvider`: proveedor JSON de Flask que usa `orjson` si está
+  instalado (y la librería estándar si no). Todas las respuestas de `jsonify`
+  pasan por él. `datetime` y `date` se serializan en ISO 8601, igual que
+  `isoformat()`, por lo que los serializadores pueden entregar los valores tal
+  cual.
+- Serializadores precompilados por modelo (`compile_serializer`): reemplazan
+  los diccionarios escritos a mano en las rutas. Cada uno lee todos sus campos
+  sin pasar por los descriptores de SQLAlchemy.
+"""
+
+from datetime import date, datetime
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Sequence, Union
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import inspect as sa_inspect
+from app.models.diagnosis import Diagnosis
+from app.models.patient import Patient
+from app.models.user import User
+from app.models.medical_knowledge import (
+    Disease, Symptom, Sign, LabTest, PostmortemTest,
+    PatientSymptomsLog, PatientSignsLog, PatientLabResultsLog
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+Serializer = Callable[[Any], Dict[str, Any]]
+
+
+# ==================== PROVEEDOR JSON ====================
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Proveedor JSON con `orjson` (claves ordenadas, fechas en ISO 8601)."""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if self.sort_keys:
+                option |= orjson.OPT_SORT_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except TypeError:
+                # Tipos que orjson no admite (p. ej. enteros de más de 64 bits)
+                pass
+        kwargs = {'indent': 2} if indent else {'separators': (',', ':')}
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs or orjson is None:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        if kwargs or orjson is None:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+# ==================== SERIALIZADORES POR MODELO ====================
+
+def compile_serializer(model: type, fields: Sequence[str]) -> Serializer:
+    """
+    Crea un serializador `obj -> {campo: obj.campo}` para los atributos de
+    `model` indicados (columnas o propiedades).
+
+    Las columnas ya cargadas se leen directamente del `__dict__` de la
+    instancia, sin pasar por los descriptores instrumentados de SQLAlchemy; si
+    alguna no está cargada (p. ej. tras un commit) se leen con `getattr`, que
+    la carga.
+    """
+    column_names = set(sa_inspect(model).column_attrs.keys())
+    columns = tuple(f for f in fields if f in column_names)
+    properties = tuple(f for f in fields if f not in column_names)
+    from_dict = itemgetter(*columns) if len(columns) > 1 else (lambda d: (d[columns[0]],))
+    from_attrs = attrgetter(*columns) if len(columns) > 1 else (lambda o: (getattr(o, columns[0]),))
+    get_properties = attrgetter(*properties) if len(properties) > 1 else (lambda o: (getattr(o, properties[0]),))
+
+    def serialize(obj: Any) -> Dict[str, Any]:
+        try:
+            data = dict(zip(columns, from_dict(obj.__dict__)))
+        except KeyError:
+            data = dict(zip(columns, from_attrs(obj)))
+        if properties:
+            data.update(zip(properties, get_properties(obj)))
+        return data
+
+    return serialize
+
+
+_TIMESTAMPS = ('created_at', 'updated_at')
+
+# Forma de `to_dict()` de cada modelo
+DISEASE_FIELDS = ('code', 'name', 'description', 'category', 'severity', 'treatment_recommendations',
+                  'prevention_measures', 'is_active') + _TIMESTAMPS + ('deleted_at',)
+SYMPTOM_FIELDS = ('code', 'name', 'description', 'category', 'is_active') + _TIMESTAMPS + ('deleted_at',)
+SIGN_FIELDS = ('code', 'name', 'description', 'category', 'measurement_unit', 'normal_range',
+               'is_active') + _TIMESTAMPS + ('deleted_at',)
+LAB_TEST_FIELDS = ('code', 'name', 'description', 'category', 'normal_range', 'unit',
+                   'is_active') + _TIMESTAMPS + ('deleted_at',)
+POSTMORTEM_TEST_FIELDS = ('code', 'autopsy_date', 'death_cause', 'disease_diagnosis', 'macro_findings', 'histology',
+                          'toxicology_results', 'genetic_results', 'pathologic_correlation', 'observations',
+                          'is_active') + _TIMESTAMPS + ('deleted_at',)
+_LOG_CONTEXT = ('recorded_at', 'visit_id', 'diagnosis_id', 'followup_id', 'note', 'created_at')
+SYMPTOM_LOG_FIELDS = ('id', 'patient_id', 'symptom_id') + _LOG_CONTEXT
+SIGN_LOG_FIELDS = ('id', 'patient_id', 'sign_id', 'value_numeric', 'value_text', 'value_code', 'unit') + _LOG_CONTEXT
+LAB_RESULT_LOG_FIELDS = ('id', 'patient_id', 'lab_test_id', 'value_numeric', 'value_text', 'value_code',
+                         'unit') + _LOG_CONTEXT
+
+MODEL_SERIALIZERS: Dict[type, Serializer] = {
+    Disease: compile_serializer(Disease, DISEASE_FIELDS),
+    Symptom: compile_serializer(Symptom, SYMPTOM_FIELDS),
+    Sign: compile_serializer(Sign, SIGN_FIELDS),
+    LabTest: compile_serializer(LabTest, LAB_TEST_FIELDS),
+    PostmortemTest: compile_serializer(PostmortemTest, POSTMORTEM_TEST_FIELDS),
+    PatientSymptomsLog: compile_serializer(PatientSymptomsLog, SYMPTOM_LOG_FIELDS),
+    PatientSignsLog: compile_serializer(PatientSignsLog, SIGN_LOG_FIELDS),
+    PatientLabResultsLog: compile_serializer(PatientLabResultsLog, LAB_RESULT_LOG_FIELDS),
+}
+
+
+def serializer_for(model: type) -> Serializer:
+    """Serializador con la forma de `model.to_dict()`."""
+    return MODEL_SERIALIZERS[model]
+
+
+# Formas propias de las rutas
+serialize_patient = compile_serializer(Patient, (
+    'id', 'first_name', 'second_name', 'paternal_surname', 'maternal_surname', 'full_name', 'date_of_birth',
+    'age', 'gender', 'blood_type_abo', 'blood_type_rh', 'height', 'weight', 'bmi', 'smoking_status',
+    'alcohol_consumption', 'email', 'phone', 'address', 'allergies', 'chronic_conditions', 'doctor_id',
+    'is_active') + _TIMESTAMPS)
+serialize_patient_summary = compile_serializer(Patient, ('id', 'first_name', 'paternal_surname'))
+serialize_doctor_summary = compile_serializer(User, ('id', 'username', 'first_name', 'paternal_surname'))
+serialize_disease_summary = compile_serializer(Disease, ('code', 'name', 'description'))
+serialize_diagnosis = compile_serializer(Diagnosis, (
+    'id', 'patient_id', 'doctor_id', 'disease_code', 'diagnosis_date', 'visit_id', 'confidence_score',
+    'inference_details', 'alternative_diseases', 'treatment', 'treatment_start_date', 'treatment_end_date',
+    'notes', 'status', 'follow_up_date') + _TIMESTAMPS)
+serialize_symptom = compile_serializer(Symptom, ('id',) + SYMPTOM_FIELDS[:-1])
+serialize_sign = compile_serializer(Sign, ('id',) + SIGN_FIELDS[:-1])
+serialize_lab_test = compile_serializer(LabTest, ('id',) + LAB_TEST_FIELDS[:-1])
@@ -0,0 +1,172 @@
+"""
+Evaluación en Sombra de Motores Candidatos
+==========================================
+
+Ejecuta un motor de inferencia candidato sobre una muestra configurable de las
+peticiones `POST /api/diagnoses`, fuera del camino de la petición, y registra
+en un CSV compacto las discrepancias de ranking y la diferencia de latencia
+respecto al motor de producción.
+
+Configuración (ver `BaseConfig`):
+    SHADOW_ENGINE: Ruta 'paquete.modulo:Clase' del motor candidato. La clase se
+        construye con la `KnowledgeBase` vigente y debe exponer
+        `diagnose(evidence)` con el mismo formato de salida que `InferenceEngine`.
+    SHADOW_SAMPLE_RATE: Fracción de peticiones evaluadas (0.0 - 1.0).
+    SHADOW_LOG_PATH: Archivo CSV donde se registran las comparaciones.
+    SHADOW_MAX_PENDING: Máximo de evaluaciones en cola; el excedente se descarta.
+
+La petición principal solo paga el sorteo de la muestra y un `submit` no
+bloqueante: si la cola está llena la evaluación se descarta en lugar de esperar.
+"""
+
+import csv
+import os
+import random
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from importlib import import_module
+from typing import Dict, Any, List, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+SHADOW_LOG_FIELDS = [
+    'timestamp', 'patient_id', 'visit_id', 'kb_version',
+    'primary_top', 'candidate_top', 'top1_agree',
+    'primary_top_rank_in_candidate', 'rank_disagreements', 'compared',
+    'primary_ms', 'candidate_ms', 'delta_ms', 'error'
+]
+
+
+def import_engine(path: str) -> Callable:
+    """Importa una clase de motor a partir de 'paquete.modulo:Clase'."""
+    module_name, _, attr = path.partition(':')
+    if not attr:
+        module_name, _, attr = path.rpartition('.')
+    return getattr(import_module(module_name), attr)
+
+
+def ranked_codes(result: Dict[str, Any]) -> List[str]:
+    """Lista de códigos de enfermedad en el orden retornado por un motor."""
+    codes = []
+    if result.get('primary_diagnosis'):
+        codes.append(result['primary_diagnosis']['disease_code'])
+    codes.extend(alt['disease_code'] for alt in result.get('alternative_diagnoses', []))
+    return codes
+
+
+def compare_rankings(primary: List[str], candidate: List[str]) -> Dict[str, Any]:
+    """
+    Compara dos rankings de diagnósticos.
+
+    Returns:
+        Diccionario con el top de cada motor, si coinciden, la posición del top
+        de producción en el ranking candidato (-1 si no aparece) y cuántas
+        posiciones del ranking de producción difieren en el candidato.
+    """
+    candidate_rank = {code: i for i, code in enumerate(candidate)}
+    disagreements = sum(
+        1 for i, code in enumerate(primary) if candidate_rank.get(code) != i
+    )
+    primary_top = primary[0] if primary else None
+    candidate_top = candidate[0] if candidate else None
+    return {
+        'primary_top': primary_top,
+        'candidate_top': candidate_top,
+        'top1_agree': int(primary_top == candidate_top),
+        'primary_top_rank_in_candidate': candidate_rank.get(primary_top, -1),
+        'rank_disagreements': disagreements,
+        'compared': len(primary),
+    }
+
+
+class ShadowEvaluator:
+    """Ejecuta el motor candidato en un hilo de fondo y registra la comparación."""
+
+    def __init__(self, engine_class: Callable, sample_rate: float, log_path: str, max_pending: int = 100):
+        self.engine_class = engine_class
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.log_path = log_path
+        self.max_pending = max_pending
+        self._pending = threading.BoundedSemaphore(max_pending)
+        self._write_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-engine')
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def submit(self, knowledge_base, evidence, primary_result: Dict[str, Any], primary_ms: float) -> bool:
+        """
+        Encola la evaluación del candidato. Nunca bloquea: retorna False si la
+        cola está llena.
+        """
+        if not self._pending.acquire(blocking=False):
+            return False
+        try:
+            self._executor.submit(self._evaluate, knowledge_base, evidence, ranked_codes(primary_result), primary_ms)
+        except RuntimeError:
+            self._pending.release()
+            return False
+        return True
+
+    def _evaluate(self, knowledge_base, evidence, primary_codes: List[str], primary_ms: float) -> None:
+        row = {
+            'timestamp': datetime.utcnow().isoformat(),
+            'patient_id': evidence.patient_id,
+            'visit_id': evidence.visit_id,
+            'kb_version': getattr(knowledge_base, 'version', None),
+            'primary_ms': round(primary_ms, 3),
+            'error': ''
+        }
+        try:
+            started = time.perf_counter()
+            candidate_result = self.engine_class(knowledge_base).diagnose(evidence)
+            candidate_ms = (time.perf_counter() - started) * 1000.0
+            row.update(compare_rankings(primary_codes, ranked_codes(candidate_result)))
+            row['candidate_ms'] = round(candidate_ms, 3)
+            row['delta_ms'] = round(candidate_ms - primary_ms, 3)
+        except Exception as e:
+            logger.warning(f"⚠️  Error en motor candidato (sombra): {e}")
+            row['error'] = f"{type(e).__name__}: {e}"
+        finally:
+            self._pending.release()
+
+        try:
+            self._write_row(row)
+        except OSError as e:
+            logger.warning(f"⚠️  No se pudo registrar la evaluación en sombra: {e}")
+
+    def _write_row(self, row: Dict[str, Any]) -> None:
+        with self._write_lock:
+            is_new = not os.path.exists(self.log_path) or os.path.getsize(self.log_path) == 0
+            with open(self.log_path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.DictWriter(f, fieldnames=SHADOW_LOG_FIELDS)
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(row)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+def init_shadow_mode(app) -> Optional[ShadowEvaluator]:
+    """
+    Registra el evaluador en sombra en `app.extensions['shadow_evaluator']` si
+    hay un motor candidato configurado y una tasa de muestreo mayor a cero.
+    """
+    engine_path = app.config.get('SHADOW_ENGINE')
+    sample_rate = app.config.get('SHADOW_SAMPLE_RATE', 0.0)
+    if not engine_path or sample_rate <= 0:
+        return None
+
+    evaluator = ShadowEvaluator(
+        engine_class=import_engine(engine_path),
+        sample_rate=sample_rate,
+        log_path=app.config.get('SHADOW_LOG_PATH', 'shadow_eval.csv'),
+        max_pending=app.config.get('SHADOW_MAX_PENDING', 100)
+    )
+    app.extensions['shadow_evaluator'] = evaluator
+    app.logger.info(f"🌓 Evaluación en sombra activa: {engine_path} ({sample_rate:.0%} de las peticiones)")
+    return evaluator
@@ -0,0 +1,22 @@
+"""Add (patient_id, diagnosis_date, id) index to diagnoses
+
+Revision ID: 20261019_add_diagnoses_patient_date_index
+Revises: 20261019_add_jobs_table
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_diagnoses_patient_date_index'
+down_revision = '20261019_add_jobs_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Soporta la paginación keyset del historial de diagnósticos del paciente
+    op.create_index('ix_diagnoses_patient_date', 'diagnoses', ['patient_id', 'diagnosis_date', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_diagnoses_patient_date', table_name='diagnoses')
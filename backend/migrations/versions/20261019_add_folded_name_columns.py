@@ -0,0 +1,140 @@
+"""Add accent- and case-folded name columns for search
+
+Adds indexed *_folded copies of patient and catalog names, backfills them and
+rebuilds the search indexes over the folded columns.
+
+Revision ID: 20261019_add_folded_name_columns
+Revises: 20261019_add_search_indexes
+Create Date: 2026-10-19 00:00:00.000000
+"""
+import unicodedata
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_folded_name_columns'
+down_revision = '20261019_add_search_indexes'
+branch_labels = None
+depends_on = None
+
+# tabla -> (clave primaria, [(columna de origen, longitud)])
+FOLDED_COLUMNS = {
+    'patients': ('id', [('first_name', 100), ('second_name', 100), ('paternal_surname', 100),
+                        ('maternal_surname', 100)]),
+    'diseases': ('code', [('name', 200)]),
+    'symptoms': ('id', [('name', 200)]),
+    'signs': ('id', [('name', 200)]),
+    'lab_tests': ('id', [('name', 200)]),
+}
+
+# (tabla FTS5, tabla de origen, rowid de origen, columnas antes, columnas después)
+SEARCH_INDEXES = [
+    ('patients_fts', 'patients', 'id',
+     ['first_name', 'second_name', 'paternal_surname', 'maternal_surname'],
+     ['first_name_folded', 'second_name_folded', 'paternal_surname_folded', 'maternal_surname_folded']),
+    ('diseases_fts', 'diseases', 'rowid', ['name', 'description'], ['name_folded', 'description']),
+    ('symptoms_fts', 'symptoms', 'id', ['name', 'description'], ['name_folded', 'description']),
+    ('signs_fts', 'signs', 'id', ['name', 'description'], ['name_folded', 'description']),
+    ('lab_tests_fts', 'lab_tests', 'id', ['name', 'description'], ['name_folded', 'description']),
+]
+
+
+def fold_text(value):
+    # Copia de app.models.folding.fold_text (la migración no depende del código de la aplicación)
+    if value is None:
+        return None
+    decomposed = unicodedata.normalize('NFKD', value)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def _drop_sqlite_fts(name):
+    for suffix in ('ai', 'ad', 'au'):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {name}")
+
+
+def _create_sqlite_fts(name, table, rowid, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    delete = f"INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old});"
+    insert = f"INSERT INTO {name}(rowid, {cols}) VALUES (new.{rowid}, {new});"
+    op.execute(f"CREATE VIRTUAL TABLE {name} USING fts5("
+               f"{cols}, content='{table}', content_rowid='{rowid}', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER {name}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER {name}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+    op.execute(f"CREATE TRIGGER {name}_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+    op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def _backfill(bind, table_name, key, sources):
+    table = sa.table(table_name, sa.column(key), *(sa.column(c) for c in sources),
+                     *(sa.column(f'{c}_folded') for c in sources))
+    rows = bind.execute(sa.select(table.c[key], *(table.c[c] for c in sources))).all()
+    if not rows:
+        return
+    statement = table.update().where(table.c[key] == sa.bindparam('_key')).values(
+        {f'{c}_folded': sa.bindparam(f'_{c}') for c in sources}
+    )
+    bind.execute(statement, [
+        dict({'_key': row[0]}, **{f'_{c}': fold_text(value) for c, value in zip(sources, row[1:])})
+        for row in rows
+    ])
+
+
+def upgrade():
+    bind = op.get_bind()
+    dialect = bind.dialect.name
+
+    # Los índices de búsqueda se reconstruyen sobre las columnas nuevas
+    if dialect == 'sqlite':
+        for name, *_ in SEARCH_INDEXES:
+            _drop_sqlite_fts(name)
+    elif dialect == 'postgresql':
+        for _, table, _, before, _ in SEARCH_INDEXES:
+            for column in before:
+                op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+
+    for table, (key, columns) in FOLDED_COLUMNS.items():
+        for column, length in columns:
+            op.add_column(table, sa.Column(f'{column}_folded', sa.String(length), nullable=True))
+        _backfill(bind, table, key, [column for column, _ in columns])
+        for column, _ in columns:
+            op.create_index(f'ix_{table}_{column}_folded', table, [f'{column}_folded'])
+
+    if dialect == 'sqlite':
+        for name, table, rowid, _, after in SEARCH_INDEXES:
+            _create_sqlite_fts(name, table, rowid, after)
+    elif dialect == 'postgresql':
+        for _, table, _, _, after in SEARCH_INDEXES:
+            for column in after:
+                op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for name, *_ in SEARCH_INDEXES:
+            _drop_sqlite_fts(name)
+    elif dialect == 'postgresql':
+        for _, table, _, _, after in SEARCH_INDEXES:
+            for column in after:
+                op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+
+    for table, (_, columns) in FOLDED_COLUMNS.items():
+        for column, _ in columns:
+            op.drop_index(f'ix_{table}_{column}_folded', table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            for column, _ in columns:
+                batch_op.drop_column(f'{column}_folded')
+
+    if dialect == 'sqlite':
+        for name, table, rowid, before, _ in SEARCH_INDEXES:
+            _create_sqlite_fts(name, table, rowid, before)
+    elif dialect == 'postgresql':
+        for _, table, _, before, _ in SEARCH_INDEXES:
+            for column in before:
+                op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
@@ -0,0 +1,39 @@
+"""Add jobs table for background jobs
+
+Revision ID: 20261019_add_jobs_table
+Revises: 20261019_add_value_code_to_log_tables
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_jobs_table'
+down_revision = '20261019_add_value_code_to_log_tables'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.String(length=36), primary_key=True),
+        sa.Column('job_type', sa.String(length=50), nullable=False, index=True),
+        sa.Column('status', sa.String(length=20), nullable=False, index=True),
+        sa.Column('params', sa.Text(), nullable=True),
+        sa.Column('progress', sa.Float(), nullable=False),
+        sa.Column('progress_message', sa.String(length=200), nullable=True),
+        sa.Column('result', sa.Text(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('cancel_requested', sa.Boolean(), nullable=False),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id'), nullable=False, index=True),
+        sa.Column('worker', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('jobs')
@@ -0,0 +1,38 @@
+"""Add patient_diseases index table
+
+One row per (disease_code, patient_id) with at least one diagnosis, used by
+the enfermedad filter of the patient listing. Backfilled from diagnoses.
+
+Revision ID: 20261019_add_patient_diseases_table
+Revises: 20261019_add_folded_name_columns
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_patient_diseases_table'
+down_revision = '20261019_add_folded_name_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'patient_diseases',
+        sa.Column('disease_code', sa.String(length=20), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['disease_code'], ['diseases.code'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['patient_id'], ['patients.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('disease_code', 'patient_id')
+    )
+    op.create_index('ix_patient_diseases_patient_id', 'patient_diseases', ['patient_id'])
+    op.execute(
+        'INSERT INTO patient_diseases (disease_code, patient_id) '
+        'SELECT DISTINCT disease_code, patient_id FROM diagnoses'
+    )
+
+
+def downgrade():
+    op.drop_index('ix_patient_diseases_patient_id', table_name='patient_diseases')
+    op.drop_table('patient_diseases')
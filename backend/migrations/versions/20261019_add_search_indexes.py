@@ -0,0 +1,65 @@
+"""Add full-text search indexes for patients and the medical catalog
+
+SQLite: FTS5 (trigram) external-content tables kept in sync by triggers.
+PostgreSQL: pg_trgm GIN indexes on the same columns.
+
+Revision ID: 20261019_add_search_indexes
+Revises: 20261019_add_diagnoses_patient_date_index
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_search_indexes'
+down_revision = '20261019_add_diagnoses_patient_date_index'
+branch_labels = None
+depends_on = None
+
+# (tabla FTS5, tabla de origen, rowid de origen, columnas)
+SEARCH_INDEXES = [
+    ('patients_fts', 'patients', 'id', ['first_name', 'second_name', 'paternal_surname', 'maternal_surname']),
+    ('diseases_fts', 'diseases', 'rowid', ['name', 'description']),
+    ('symptoms_fts', 'symptoms', 'id', ['name', 'description']),
+    ('signs_fts', 'signs', 'id', ['name', 'description']),
+    ('lab_tests_fts', 'lab_tests', 'id', ['name', 'description']),
+]
+
+
+def _sqlite_upgrade(name, table, rowid, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    delete = f"INSERT INTO {name}({name}, rowid, {cols}) VALUES ('delete', old.{rowid}, {old});"
+    insert = f"INSERT INTO {name}(rowid, {cols}) VALUES (new.{rowid}, {new});"
+    op.execute(f"CREATE VIRTUAL TABLE {name} USING fts5("
+               f"{cols}, content='{table}', content_rowid='{rowid}', tokenize='trigram')")
+    op.execute(f"CREATE TRIGGER {name}_ai AFTER INSERT ON {table} BEGIN {insert} END")
+    op.execute(f"CREATE TRIGGER {name}_ad AFTER DELETE ON {table} BEGIN {delete} END")
+    op.execute(f"CREATE TRIGGER {name}_au AFTER UPDATE ON {table} BEGIN {delete} {insert} END")
+    op.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name, table, rowid, columns in SEARCH_INDEXES:
+            _sqlite_upgrade(name, table, rowid, columns)
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for _, table, _, columns in SEARCH_INDEXES:
+            for column in columns:
+                op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                                postgresql_using='gin', postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name, _, _, _ in SEARCH_INDEXES:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {name}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {name}")
+    elif dialect == 'postgresql':
+        for _, table, _, columns in SEARCH_INDEXES:
+            for column in columns:
+                op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
@@ -0,0 +1,32 @@
+"""Add value_code (qualitative grade) to patient_signs_log and patient_lab_results_log
+
+Revision ID: 20261019_add_value_code_to_log_tables
+Revises: 20251112_add_patient_logs_and_basals
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20261019_add_value_code_to_log_tables'
+down_revision = '20251112_add_patient_logs_and_basals'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los registros existentes quedan con value_code NULL: el motor los
+    # codifica al puntuar a partir de value_text
+    with op.batch_alter_table('patient_signs_log') as batch_op:
+        batch_op.add_column(sa.Column('value_code', sa.SmallInteger(), nullable=True))
+
+    with op.batch_alter_table('patient_lab_results_log') as batch_op:
+        batch_op.add_column(sa.Column('value_code', sa.SmallInteger(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('patient_lab_results_log') as batch_op:
+        batch_op.drop_column('value_code')
+
+    with op.batch_alter_table('patient_signs_log') as batch_op:
+        batch_op.drop_column('value_code')
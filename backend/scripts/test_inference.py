@@ -12,9 +12,10 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app import create_app
-from app.modules.inference_engine import (
+from app.modules.inference_engine import InferenceEngine
+from app.services.inference import (
+    get_knowledge_base,
     get_patient_evidence,
-    InferenceEngine,
     get_treatment_recommendation
 )
 from app.models.medical_knowledge import Patient
@@ -72,36 +73,37 @@ def test_inference_engine(patient_id=None, visit_id=None):
             evidence = get_patient_evidence(patient_id, visit_id)
             
             print(f"\n✅ Evidencia recuperada:")
-            print(f"   • Síntomas: {len(evidence['symptoms'])} registrados")
-            print(f"   • Signos: {len(evidence['signs'])} registrados")
-            print(f"   • Laboratorios: {len(evidence['labs'])} registrados")
+            print(f"   • Síntomas: {len(evidence.symptoms)} registrados")
+            print(f"   • Signos: {len(evidence.signs)} registrados")
+            print(f"   • Laboratorios: {len(evidence.labs)} registrados")
             
-            # Mostrar detalle de evidencia
-            if evidence['symptoms']:
+            # Mostrar detalle de evidencia (nombres desde la base de conocimiento)
+            kb = get_knowledge_base()
+            
+            if evidence.symptoms:
                 print("\n📋 Síntomas registrados:")
-                from app.models.medical_knowledge import Symptom
-                for symptom_id in evidence['symptoms'][:10]:  # Mostrar máximo 10
-                    symptom = Symptom.query.get(symptom_id)
+                for symptom_id in sorted(evidence.symptoms)[:10]:  # Mostrar máximo 10
+                    symptom = kb.symptoms.get(symptom_id)
                     if symptom:
                         print(f"   - {symptom.name} ({symptom.code})")
             
-            if evidence['signs']:
+            if evidence.signs:
                 print("\n🔬 Signos clínicos registrados:")
-                for sign_id, sign_data in list(evidence['signs'].items())[:10]:
-                    name = sign_data.get('name', 'N/A')
-                    val = sign_data.get('value_numeric', sign_data.get('value_text', 'N/A'))
-                    unit = sign_data.get('unit', '')
-                    print(f"   - {name}: {val} {unit}")
+                for sign_id, (value_numeric, value_text, unit, _) in list(evidence.signs.items())[:10]:
+                    entry = kb.signs.get(sign_id)
+                    name = entry.name if entry else 'N/A'
+                    val = value_numeric if value_numeric is not None else (value_text or 'N/A')
+                    print(f"   - {name}: {val} {unit or ''}")
             
-            if evidence['labs']:
+            if evidence.labs:
                 print("\n🧪 Resultados de laboratorio:")
-                for lab_id, lab_data in list(evidence['labs'].items())[:10]:
-                    name = lab_data.get('name', 'N/A')
-                    val = lab_data.get('value_numeric', lab_data.get('value_text', 'N/A'))
-                    unit = lab_data.get('unit', '')
-                    print(f"   - {name}: {val} {unit}")
+                for lab_id, (value_numeric, value_text, unit, _) in list(evidence.labs.items())[:10]:
+                    entry = kb.labs.get(lab_id)
+                    name = entry.name if entry else 'N/A'
+                    val = value_numeric if value_numeric is not None else (value_text or 'N/A')
+                    print(f"   - {name}: {val} {unit or ''}")
             
-            if not evidence['symptoms'] and not evidence['signs'] and not evidence['labs']:
+            if evidence.is_empty():
                 print("\n⚠️  No se encontró evidencia para este paciente.")
                 print("   El motor de inferencia necesita datos en las tablas de logs.")
                 return
@@ -109,7 +111,7 @@ def test_inference_engine(patient_id=None, visit_id=None):
             # PASO 2: Ejecutar motor de inferencia
             print_separator("PASO 2: Ejecución del Motor de Inferencia")
             
-            engine = InferenceEngine()
+            engine = InferenceEngine(kb)
             result = engine.diagnose(evidence)
             
             print(f"\n✅ Análisis completado:")
@@ -0,0 +1,28 @@
+"""
+Fixtures comunes: aplicación con TestConfig (SQLite en memoria) y esquema creado.
+"""
+import os
+
+# ProdConfig exige las claves al importarse la configuración
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+os.environ.setdefault('JWT_SECRET_KEY', 'test-jwt-secret-key-with-enough-length')
+
+import pytest
+from app import create_app
+from app.config import TestConfig
+from app.extensions import db as _db
+
+
+@pytest.fixture
+def app():
+    app = create_app(TestConfig)
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+@pytest.fixture
+def db(app):
+    return _db
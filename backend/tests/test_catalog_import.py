@@ -0,0 +1,139 @@
+"""
+Importación masiva del catálogo (app.services.catalog_import)
+"""
+from datetime import datetime
+import pytest
+from sqlalchemy import select
+from app.models.medical_knowledge import Disease, Symptom, disease_symptoms
+from app.services.catalog_import import (
+    MAX_REPORTED_ERRORS, CatalogImportError, import_catalog, pack_from_csv
+)
+
+
+def _pack():
+    return {
+        'symptoms': [
+            {'code': 'S001', 'name': 'Fiebre', 'category': 'General'},
+            {'code': 'S002', 'name': 'Tos', 'category': 'Respiratorio'},
+        ],
+        'diseases': [{'code': 'RESP01', 'name': 'Resfriado común', 'category': 'Respiratoria'}],
+        'disease_symptoms': [
+            {'disease_code': 'RESP01', 'symptom_code': 'S001', 'weight': 0.4},
+            {'disease_code': 'RESP01', 'symptom_code': 'S002', 'weight': 0.8},
+        ],
+    }
+
+
+def _weights(db):
+    rows = db.session.execute(select(disease_symptoms.c.symptom_id, disease_symptoms.c.weight)).all()
+    return {db.session.get(Symptom, symptom_id).code: weight for symptom_id, weight in rows}
+
+
+def test_import_inserts_pack(db):
+    summary = import_catalog(_pack())
+
+    assert summary['symptoms'] == {'inserted': 2, 'updated': 0, 'restored': 0}
+    assert summary['diseases'] == {'inserted': 1, 'updated': 0, 'restored': 0}
+    assert summary['disease_symptoms'] == {'inserted': 2, 'updated': 0}
+    assert db.session.scalar(select(Symptom.name).where(Symptom.code == 'S002')) == 'Tos'
+    assert _weights(db) == {'S001': 0.4, 'S002': 0.8}
+
+
+def test_reimport_updates_existing_rows(db):
+    import_catalog(_pack())
+    pack = {
+        'symptoms': [{'code': 'S001', 'name': 'Fiebre alta', 'category': 'General'}],
+        'disease_symptoms': [{'disease_code': 'RESP01', 'symptom_code': 'S001', 'weight': 0.9}],
+    }
+
+    summary = import_catalog(pack)
+
+    assert summary['symptoms'] == {'inserted': 0, 'updated': 1, 'restored': 0}
+    assert summary['disease_symptoms'] == {'inserted': 0, 'updated': 1}
+    db.session.expire_all()
+    assert db.session.scalar(select(Symptom.name).where(Symptom.code == 'S001')) == 'Fiebre alta'
+    assert _weights(db) == {'S001': 0.9, 'S002': 0.8}
+
+
+def test_dry_run_validates_without_writing(db):
+    summary = import_catalog(_pack(), dry_run=True)
+
+    assert summary['symptoms']['inserted'] == 2
+    assert db.session.scalar(select(Symptom.id)) is None
+    assert db.session.scalar(select(Disease.code)) is None
+
+
+def test_reimport_restores_soft_deleted_rows(db):
+    import_catalog(_pack())
+    symptom = db.session.scalar(select(Symptom).where(Symptom.code == 'S001'))
+    symptom.is_active = False
+    symptom.deleted_at = datetime.utcnow()
+    inactive = db.session.scalar(select(Symptom).where(Symptom.code == 'S002'))
+    inactive.is_active = False
+    db.session.commit()
+
+    summary = import_catalog({'symptoms': _pack()['symptoms']})
+
+    assert summary['symptoms'] == {'inserted': 0, 'updated': 1, 'restored': 1}
+    db.session.expire_all()
+    restored = db.session.scalar(select(Symptom).where(Symptom.code == 'S001'))
+    assert restored.deleted_at is None and restored.is_active
+    # Un elemento inactivo pero no eliminado conserva su is_active
+    assert not db.session.scalar(select(Symptom.is_active).where(Symptom.code == 'S002'))
+
+
+def test_pack_is_active_applies_to_restored_rows(db):
+    import_catalog(_pack())
+    symptom = db.session.scalar(select(Symptom).where(Symptom.code == 'S001'))
+    symptom.is_active = False
+    symptom.deleted_at = datetime.utcnow()
+    db.session.commit()
+
+    import_catalog({'symptoms': [{'code': 'S001', 'name': 'Fiebre', 'category': 'General', 'is_active': 'false'}]})
+
+    db.session.expire_all()
+    restored = db.session.scalar(select(Symptom).where(Symptom.code == 'S001'))
+    assert restored.deleted_at is None and not restored.is_active
+
+
+def test_errors_are_reported_together_and_nothing_is_written(db):
+    pack = {
+        'symptoms': [
+            {'code': 'S001', 'name': 'Fiebre'},
+            {'code': 'S001', 'name': 'Fiebre', 'category': 'General'},
+        ],
+        'disease_symptoms': [{'disease_code': 'NOPE', 'symptom_code': 'S404', 'weight': 'alto'}],
+    }
+
+    with pytest.raises(CatalogImportError) as info:
+        import_catalog(pack)
+
+    located = {(error['section'], error['field']) for error in info.value.errors}
+    assert ('symptoms', 'category') in located
+    assert ('disease_symptoms', 'weight') in located
+    assert ('disease_symptoms', 'disease_code') in located
+    assert ('disease_symptoms', 'symptom_code') in located
+    assert info.value.total == len(info.value.errors)
+    assert db.session.scalar(select(Symptom.id)) is None
+
+
+def test_reported_errors_are_capped(db):
+    rows = [{'code': f'S{i:04d}', 'name': f'Síntoma {i}'} for i in range(MAX_REPORTED_ERRORS + 20)]
+
+    with pytest.raises(CatalogImportError) as info:
+        import_catalog({'symptoms': rows})
+
+    assert len(info.value.errors) == MAX_REPORTED_ERRORS
+    assert info.value.total == MAX_REPORTED_ERRORS + 20
+
+
+def test_empty_pack_is_rejected(db):
+    with pytest.raises(CatalogImportError):
+        import_catalog({})
+
+
+def test_csv_section(db):
+    pack = pack_from_csv('symptoms', 'code,name,category\nS010,Disnea,Respiratorio\n')
+
+    assert import_catalog(pack)['symptoms']['inserted'] == 1
+    assert db.session.scalar(select(Symptom.name).where(Symptom.code == 'S010')) == 'Disnea'
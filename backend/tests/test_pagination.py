@@ -0,0 +1,109 @@
+"""
+Paginación por cursor (app.services.pagination)
+"""
+import base64
+from datetime import date, datetime
+import pytest
+from app.models.medical_knowledge import Symptom
+from app.services.pagination import (
+    InvalidCursor, PageRequest, decode_cursor, encode_cursor, paginate, parse_datetime_param,
+    parse_page_size, split_page
+)
+
+
+@pytest.mark.parametrize('values', [
+    (42,),
+    ('RESP03',),
+    ('2025-01-31T10:00:00', 17),
+    ('Cardiovascular', 'Código con ñ y espacios', 3),
+    (None, 0, -1.5, True),
+])
+def test_cursor_round_trip(values):
+    cursor = encode_cursor(*values)
+
+    assert '=' not in cursor and '+' not in cursor and '/' not in cursor
+    assert decode_cursor(cursor, len(values)) == list(values)
+
+
+def test_cursor_encodes_dates_as_iso_strings():
+    stamp = datetime(2025, 1, 31, 10, 30, 5, 123456)
+
+    cursor = encode_cursor(stamp, date(2025, 2, 1), 9)
+
+    assert decode_cursor(cursor, 3) == [stamp.isoformat(), '2025-02-01', 9]
+
+
+@pytest.mark.parametrize('cursor', [
+    'no-es-base64!',
+    base64.urlsafe_b64encode(b'{"a": 1}').decode('ascii'),
+    base64.urlsafe_b64encode(b'no es json').decode('ascii'),
+    encode_cursor(1, 2),
+])
+def test_decode_cursor_rejects_invalid_cursors(cursor):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor, 1)
+
+
+def test_parse_datetime_param():
+    assert parse_datetime_param(None) is None
+    assert parse_datetime_param('2025-01-31') == datetime(2025, 1, 31)
+    assert parse_datetime_param('2025-01-31', end_of_day=True) == datetime(2025, 1, 31, 23, 59, 59, 999999)
+    assert parse_datetime_param('2025-01-31T10:00:00', end_of_day=True) == datetime(2025, 1, 31, 10)
+    with pytest.raises(ValueError):
+        parse_datetime_param('31/01/2025')
+
+
+def test_page_size_and_split():
+    assert parse_page_size(None, 20, 100) == 20
+    assert parse_page_size(0, 20, 100) == 1
+    assert parse_page_size(500, 20, 100) == 100
+    assert split_page([1, 2, 3], 2) == ([1, 2], True)
+    assert split_page([1, 2], 2) == ([1, 2], False)
+    assert split_page([1, 2], None) == ([1, 2], False)
+
+
+@pytest.fixture
+def symptoms(db):
+    rows = [
+        Symptom(code=f'S{i:03d}', name=f'Síntoma {i}', category=('General', 'Respiratorio', 'Digestivo')[i % 3])
+        for i in range(1, 24)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return rows
+
+
+def _walk(sort_columns, page_size=5):
+    seen, cursor = [], ''
+    while cursor is not None:
+        rows, pagination = paginate(Symptom.query, sort_columns, PageRequest(1, page_size, cursor, 'none'))
+        seen.extend(rows)
+        assert pagination['has_more'] == (pagination['next_cursor'] is not None)
+        cursor = pagination['next_cursor']
+    return seen
+
+
+def test_paginate_walks_every_row_once(symptoms):
+    seen = _walk([Symptom.id])
+
+    assert [s.id for s in seen] == sorted(s.id for s in symptoms)
+
+
+def test_paginate_with_composite_key(symptoms):
+    # Categorías repetidas: el id desempata dentro de cada categoría
+    seen = _walk([Symptom.category, Symptom.id], page_size=4)
+
+    assert [(s.category, s.id) for s in seen] == sorted((s.category, s.id) for s in symptoms)
+
+
+def test_paginate_page_mode_counts(symptoms):
+    rows, pagination = paginate(Symptom.query, [Symptom.id], PageRequest(3, 10, None, 'exact'))
+
+    assert len(rows) == 3
+    assert pagination['total_count'] == 23 and pagination['total_pages'] == 3
+    assert pagination['page'] == 3 and not pagination['has_more']
+
+
+def test_paginate_rejects_bad_cursor(symptoms):
+    with pytest.raises(InvalidCursor):
+        paginate(Symptom.query, [Symptom.id], PageRequest(1, 5, encode_cursor(1, 2), 'none'))
@@ -0,0 +1,98 @@
+"""
+Importación masiva de pacientes (app.services.patient_import)
+"""
+import io
+import pytest
+from sqlalchemy import func, select, text
+from app.models.patient import Patient
+from app.models.user import User
+from app.services.patient_import import (
+    PatientImport, import_patients, iter_csv_records, iter_ndjson_records, validate_patient
+)
+
+VALID = {'first_name': 'Ana', 'paternal_surname': 'Pérez', 'date_of_birth': '1990-05-01', 'gender': 'F'}
+
+
+@pytest.fixture
+def doctor(db):
+    user = User(username='doctor', email='doctor@example.com', role='doctor',
+                first_name='Luis', paternal_surname='Soto')
+    user.set_password('secreto')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def _csv(content):
+    return io.BytesIO(content.encode('utf-8'))
+
+
+def test_validate_patient_accepts_valid_row():
+    values, errors = validate_patient(dict(VALID, height='1.62', weight=58, blood_type_abo='2'))
+
+    assert errors == []
+    assert values['height'] == 1.62 and values['weight'] == 58.0
+    assert values['blood_type_abo'] == 2
+    assert values['date_of_birth'].isoformat() == '1990-05-01'
+
+
+@pytest.mark.parametrize('value', ['nan', 'inf', '-inf', float('nan'), 0, -70, True])
+def test_validate_patient_rejects_non_positive_or_non_finite_floats(value):
+    _, errors = validate_patient(dict(VALID, weight=value))
+
+    assert errors == [('weight', 'Debe ser un número positivo')]
+
+
+def test_validate_patient_reports_every_error():
+    _, errors = validate_patient({'first_name': 'Ana', 'height': 'alto', 'blood_type_rh': 5, 'color': 'azul'})
+
+    fields = {field for field, _ in errors}
+    assert fields == {'color', 'height', 'blood_type_rh', 'paternal_surname', 'date_of_birth', 'gender'}
+
+
+def test_csv_records_skip_empty_cells():
+    records = list(iter_csv_records(_csv('﻿first_name,second_name\nAna,\n')))
+
+    assert records == [(2, {'first_name': 'Ana'}, None)]
+
+
+def test_ndjson_records_report_invalid_lines():
+    records = list(iter_ndjson_records(_csv('{"first_name": "Ana"}\n\n[1]\n{roto\n')))
+
+    assert records[0] == (1, {'first_name': 'Ana'}, None)
+    assert records[1][0] == 3 and records[1][1] is None
+    assert records[2][0] == 4 and records[2][2].startswith('JSON inválido')
+
+
+def test_import_patients_inserts_valid_rows(db, doctor):
+    content = 'first_name,paternal_surname,date_of_birth,gender\nAna,Pérez,1990-05-01,F\nLuis,,1985-01-01,M\n'
+
+    summary = import_patients(iter_csv_records(_csv(content)), doctor.id, batch_size=1)
+
+    assert summary['total_rows'] == 2
+    assert summary['inserted'] == 1 and summary['failed'] == 1
+    assert summary['errors'] == [{'row': 3, 'field': 'paternal_surname', 'message': 'Campo requerido'}]
+    patient = db.session.scalar(select(Patient))
+    assert patient.doctor_id == doctor.id and patient.is_active
+    assert patient.first_name_folded == 'ana'
+
+
+def test_flush_retries_failed_batch_row_by_row(db, doctor):
+    db.session.execute(text(
+        "CREATE TRIGGER reject_patient BEFORE INSERT ON patients WHEN NEW.first_name = 'Rechazar' "
+        "BEGIN SELECT RAISE(ABORT, 'paciente rechazado'); END"
+    ))
+    db.session.commit()
+    job = PatientImport(doctor.id, batch_size=4)
+
+    for number, name in enumerate(['Ana', 'Rechazar', 'Luis', 'Eva', 'Rechazar', 'Sara'], start=2):
+        job.add(number, dict(VALID, first_name=name), None)
+    job.flush()
+
+    summary = job.summary()
+    assert summary['inserted'] == 4 and summary['failed'] == 2
+    assert [error['row'] for error in summary['errors']] == [3, 6]
+    assert all('paciente rechazado' in error['message'] for error in summary['errors'])
+    names = db.session.scalars(select(Patient.first_name).order_by(Patient.id)).all()
+    assert names == ['Ana', 'Luis', 'Eva', 'Sara']
+    assert db.session.scalar(select(func.count()).select_from(Patient)) == 4
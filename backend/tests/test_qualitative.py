@@ -0,0 +1,61 @@
+"""
+Codificación de resultados cualitativos (app.modules.qualitative)
+"""
+import pytest
+from app.modules.qualitative import (
+    QUAL_ABNORMAL, QUAL_INDETERMINATE, QUAL_NORMAL, compile_codebook, encode
+)
+
+
+@pytest.mark.parametrize('code, normal_range, text, expected', [
+    # Vocabulario general
+    (None, None, 'Negativo.', QUAL_NORMAL),
+    (None, None, ' POSITIVO ', QUAL_ABNORMAL),
+    (None, None, 'Dudoso', QUAL_INDETERMINATE),
+    (None, None, 'No', QUAL_NORMAL),
+    (None, None, 'Sin alteraciones', QUAL_NORMAL),
+    (None, None, 'Positivo para S. aureus', QUAL_ABNORMAL),
+    # Términos propios prevalecen sobre el vocabulario general
+    ('SG012', None, '2+ (normal)', QUAL_NORMAL),
+    ('SG012', None, '4+', QUAL_ABNORMAL),
+    ('SG022', None, 'Presentes', QUAL_NORMAL),
+    ('SG015', None, 'Isocóricas normorreactivas', QUAL_NORMAL),
+    # El rango normal del catálogo es normal para la entrada
+    ('LAB018', 'Sin desarrollo a las 48 h', 'sin desarrollo a las 48 h', QUAL_NORMAL),
+])
+def test_encode_known_terms(code, normal_range, text, expected):
+    assert encode(compile_codebook(code, normal_range), text) == expected
+
+
+@pytest.mark.parametrize('code, text, expected', [
+    # El término más largo al inicio decide, no la negación suelta
+    ('SG015', 'No reactivo bilateral', QUAL_ABNORMAL),
+    ('LAB018', 'Sin desarrollo', QUAL_NORMAL),
+    # Un calificativo anormal posterior agrava el resultado
+    ('SG015', 'Reactivo lento', QUAL_ABNORMAL),
+    ('SG015', 'Reactivo, lento', QUAL_ABNORMAL),
+    ('SG022', 'Presentes, disminuidos', QUAL_ABNORMAL),
+    # Un hallazgo negado no agrava
+    ('SG021', 'Rítmicos, sin soplo', QUAL_NORMAL),
+    ('SG021', 'Normal, sin soplo', QUAL_NORMAL),
+])
+def test_encode_negated_and_qualified_phrases(code, text, expected):
+    assert encode(compile_codebook(code, None), text) == expected
+
+
+@pytest.mark.parametrize('code, text', [
+    ('SG015', 'No valorable'),
+    ('LAB018', 'No hubo desarrollo'),
+    (None, 'Sin datos'),
+    (None, 'xyz positivo'),
+    (None, ''),
+    (None, None),
+])
+def test_encode_unknown_returns_none(code, text):
+    # None: el motor aplica el factor intermedio en lugar de tratarlo como normal
+    assert encode(compile_codebook(code, None), text) is None
+
+
+def test_numeric_normal_range_is_not_a_term():
+    assert compile_codebook(None, '< 5 mg/dL') is None
+    assert compile_codebook(None, 'Negativo') == {'negativo': QUAL_NORMAL}
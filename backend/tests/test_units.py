@@ -0,0 +1,69 @@
+"""
+Normalización de unidades (app.modules.units)
+"""
+import pytest
+from app.modules.units import UNIT_TABLE, compile_conversions, convert, unit_key
+
+
+@pytest.mark.parametrize('unit, expected', [
+    ('mg/dL', 'mg/dl'),
+    ('μmol/L', 'umol/l'),
+    ('µmol/L', 'umol/l'),
+    ('cm H2O', 'cmh2o'),
+    ('ºC', '°c'),
+    ('seg.', 'seg'),
+    (None, ''),
+    ('', ''),
+])
+def test_unit_key(unit, expected):
+    assert unit_key(unit) == expected
+
+
+@pytest.mark.parametrize('code, canonical, value, unit, expected', [
+    ('LAB002', 'mg/dL', 5.5, 'mmol/L', 99.088),
+    ('LAB002', 'mmol/L', 99.088, 'mg/dL', 5.5),
+    ('LAB004', 'mg/dL', 88.42, 'µmol/L', 1.0),
+    ('LAB003', '%', 48.0, 'mmol/mol', 6.54304),
+    ('SG001', '°C', 98.6, '°F', 37.0),
+    ('SG001', '°C', 310.15, 'K', 37.0),
+    ('SG001', '°F', 37.0, '°C', 98.6),
+    ('SG007', 'kg', 154.0, 'lb', 69.853225),
+    ('SG010', 'cm', 1.75, 'm', 175.0),
+])
+def test_convert_to_canonical_unit(code, canonical, value, unit, expected):
+    conversions = compile_conversions(code, canonical)
+
+    assert convert(value, conversions[unit_key(unit)]) == pytest.approx(expected, abs=1e-6)
+
+
+def test_canonical_unit_is_identity():
+    conversions = compile_conversions('LAB002', 'mmol/L')
+
+    assert conversions[unit_key('mmol/L')] == (1.0, 0.0)
+    assert convert(5.123456789, conversions[unit_key('mmol/L')]) == 5.123456789
+
+
+def test_converted_values_are_rounded():
+    conversions = compile_conversions('LAB017', 'mmol/L')
+
+    assert convert(1.0, conversions[unit_key('mg/dL')]) == round(1 / 9.008, 6)
+
+
+@pytest.mark.parametrize('code', sorted(UNIT_TABLE))
+def test_round_trip_between_every_pair_of_units(code):
+    units = list(UNIT_TABLE[code])
+    for canonical in units:
+        to_canonical = compile_conversions(code, canonical)
+        for unit in units:
+            back = compile_conversions(code, unit)[unit_key(canonical)]
+            value = convert(convert(12.5, to_canonical[unit_key(unit)]), back)
+            assert value == pytest.approx(12.5, rel=1e-5), (code, unit, canonical)
+
+
+@pytest.mark.parametrize('code, canonical', [
+    (None, 'mg/dL'),
+    ('LAB999', 'mg/dL'),
+    ('LAB002', 'mEq/L'),
+])
+def test_compile_conversions_without_table(code, canonical):
+    assert compile_conversions(code, canonical) is None